@@ -1,13 +1,40 @@
 import streamlit as st
 import pandas as pd
-import google.generativeai as genai
+import numpy as np
 from langchain_community.tools.tavily_search import TavilySearchResults
 import re
-from typing import List, Dict, Optional
+from typing import List, Dict, NamedTuple, Optional, Tuple
 import json
 import os
+import time
 from dotenv import load_dotenv
 import urllib.parse
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError, as_completed
+from background import submit_background
+from caches import get_spec_cache, normalize_software_name, recommendation_cache
+from catalog import ProductIndex, get_catalog, add_spec_features, has_spec_features
+from gemini_client import (
+    GEMINI_CALL_TIMEOUT_SECONDS,
+    get_available_models,
+    generate_text,
+    initialize_gemini_model,
+    is_quota_error,
+    parse_json_response,
+    stream_text,
+    submit_generation,
+    submit_task,
+)
+from recommender import MAX_BUDGET_RATIO, prefilter_stages, score_products, select_recommendations
+from semantic_cache import answer_cache, product_set_key
+from spec_parser import (
+    extract_highlight_features,
+    extract_requirements_from_text,
+    parse_required_cpu,
+    parse_required_gpu,
+    spec_parse_cache,
+)
+from metrics import cache_entries, cache_hit_ratio, chat_turns, registry, start_metrics_server, tavily_requests
+from tracing import bind_turn, new_turn, span
 
 # .env 파일에서 환경 변수 로드
 load_dotenv()
@@ -19,6 +46,13 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')  # 환경 변수 또는 .env에서 읽기
 TAVILY_API_KEY = os.getenv('TAVILY_API_KEY', '')  # 환경 변수 또는 .env에서 읽기
 GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')  # 기본 모델
+# 답변과 상품 설명을 한 번의 Gemini 호출(JSON 응답)로 생성할지 여부
+GEMINI_BATCHED_RESPONSE = os.getenv('GEMINI_BATCHED_RESPONSE', 'false').lower() in ('1', 'true', 'yes')
+# Gemini 답변을 생성되는 대로 화면에 표시할지 여부
+GEMINI_STREAMING = os.getenv('GEMINI_STREAMING', 'true').lower() in ('1', 'true', 'yes')
+PRODUCTS_CSV_PATH = os.getenv('PRODUCTS_CSV_PATH', 'electronics_data.csv')  # 상품 데이터 파일
+# 미리 시작한 시스템 요구사항 검색을 추천 단계에서 기다리는 최대 시간 (초, 실패 시 다시 검색하는 시간도 포함)
+SPEC_PREFETCH_WAIT_SECONDS = float(os.getenv('SPEC_PREFETCH_WAIT_SECONDS', '20'))
 
 # 방법 3: 환경 변수가 없으면 여기에 직접 입력 (보안 주의!)
 # GEMINI_API_KEY = 'your-gemini-api-key-here'
@@ -100,34 +134,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# 상품 데이터 자동 로드 함수
-def load_products_data():
-    """상품 데이터를 CSV 파일에서 자동으로 로드"""
-    try:
-        if os.path.exists('electronics_data.csv'):
-            df = pd.read_csv('electronics_data.csv', encoding='utf-8-sig')
-            # 컬럼명 정리 (가격 -> 최저가, 스펙 -> 상세스펙)
-            column_mapping = {}
-            if '가격' in df.columns:
-                column_mapping['가격'] = '최저가'
-            if '스펙' in df.columns:
-                column_mapping['스펙'] = '상세스펙'
-            if '상품 상세 URL' in df.columns:
-                column_mapping['상품 상세 URL'] = 'URL'
-            
-            if column_mapping:
-                df = df.rename(columns=column_mapping)
-            
-            # 최저가가 없는 경우 가격 컬럼 확인
-            if '최저가' not in df.columns and '가격' in df.columns:
-                df['최저가'] = df['가격']
-            
-            return df
-        else:
-            return None
-    except Exception as e:
-        return None
-
 # 세션 상태 초기화
 if 'conversation_state' not in st.session_state:
     st.session_state.conversation_state = 'idle'  # idle, usage_asked, software_asked, budget_asked, weight_asked, portable_asked, products_recommended
@@ -147,11 +153,10 @@ if 'recommended_products' not in st.session_state:
     st.session_state.recommended_products = []
 if 'spec_info' not in st.session_state:
     st.session_state.spec_info = None  # 시스템 요구사항 정보 저장
+if 'spec_prefetch' not in st.session_state:
+    st.session_state.spec_prefetch = None  # (소프트웨어 이름, 미리 시작한 요구사항 검색 Future)
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
-if 'products_df' not in st.session_state:
-    # 앱 시작 시 상품 데이터 자동 로드
-    st.session_state.products_df = load_products_data()
 if 'gemini_model' not in st.session_state:
     st.session_state.gemini_model = 'gemini-2.5-flash'
 
@@ -163,71 +168,6 @@ if 'tavily_api_key' not in st.session_state:
 if 'gemini_model' not in st.session_state:
     st.session_state.gemini_model = GEMINI_MODEL
 
-# 함수 정의 (사이드바에서 사용하기 위해 먼저 정의)
-def get_available_models(gemini_api_key: str) -> List[str]:
-    """사용 가능한 Gemini 모델 목록 가져오기"""
-    try:
-        genai.configure(api_key=gemini_api_key)
-        models = genai.list_models()
-        available = []
-        for model in models:
-            if 'generateContent' in model.supported_generation_methods:
-                model_name = model.name.replace('models/', '')
-                available.append(model_name)
-        return available
-    except Exception as e:
-        return ['gemini-2.5-flash', 'gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-pro']
-
-def initialize_gemini_model(gemini_api_key: str, preferred_model: str = 'gemini-2.5-flash'):
-    """Gemini 모델 초기화 (여러 방법 시도)"""
-    if not gemini_api_key:
-        return None, "API 키가 설정되지 않았습니다."
-    
-    genai.configure(api_key=gemini_api_key)
-    
-    # 시도할 모델 이름 목록 (우선순위 순)
-    model_names_to_try = [
-        preferred_model,
-        f'models/{preferred_model}',
-        'gemini-2.5-flash',
-        'models/gemini-2.5-flash',
-        'gemini-1.5-flash',
-        'models/gemini-1.5-flash',
-        'gemini-1.5-pro',
-        'models/gemini-1.5-pro',
-        'gemini-pro',
-        'models/gemini-pro',
-    ]
-    
-    # 중복 제거
-    model_names_to_try = list(dict.fromkeys(model_names_to_try))
-    
-    last_error = None
-    for model_name in model_names_to_try:
-        try:
-            model = genai.GenerativeModel(model_name)
-            return model, None
-        except Exception as e:
-            last_error = e
-            continue
-    
-    # 모든 모델 시도 실패 시, 사용 가능한 모델 목록 확인
-    try:
-        available_models = get_available_models(gemini_api_key)
-        if available_models:
-            # 사용 가능한 첫 번째 모델 시도
-            for available_model in available_models:
-                try:
-                    model = genai.GenerativeModel(available_model)
-                    return model, None
-                except:
-                    continue
-    except:
-        pass
-    
-    error_msg = f"모델을 초기화할 수 없습니다. 시도한 모델: {', '.join(model_names_to_try[:3])}... 마지막 오류: {str(last_error)}"
-    return None, error_msg
-
 # 사이드바 - 설정 (챗봇 위젯 모드에서는 숨김)
 # with st.sidebar:
 if False:  # 사이드바 비활성화
@@ -276,29 +216,34 @@ if False:  # 사이드바 비활성화
         with load_status:
             st.info("📂 **데이터를 로드하는 중입니다...**")
         try:
-            df = pd.read_csv('electronics_data.csv', encoding='utf-8-sig')
-            # 컬럼명 정리 (가격 -> 최저가, 스펙 -> 상세스펙)
-            column_mapping = {}
-            if '가격' in df.columns:
-                column_mapping['가격'] = '최저가'
-            if '스펙' in df.columns:
-                column_mapping['스펙'] = '상세스펙'
-            if '상품 상세 URL' in df.columns:
-                column_mapping['상품 상세 URL'] = 'URL'
-            
-            if column_mapping:
-                df = df.rename(columns=column_mapping)
-            
-            # 최저가가 없는 경우 가격 컬럼 확인
-            if '최저가' not in df.columns and '가격' in df.columns:
-                df['최저가'] = df['가격']
-            
-            st.session_state.products_df = df
+            # 공유 카탈로그를 강제로 다시 로드 (모든 세션에 반영됨)
+            catalog = get_catalog(PRODUCTS_CSV_PATH, force_reload=True)
+            if catalog is None:
+                raise FileNotFoundError(PRODUCTS_CSV_PATH)
             load_status.empty()
-            st.success(f"✅ {len(df)}개의 상품 데이터가 로드되었습니다!")
+            st.success(f"✅ {len(catalog)}개의 상품 데이터가 로드되었습니다!")
         except Exception as e:
             load_status.empty()
             st.error(f"데이터 로드 실패: {e}")
+    
+    st.divider()
+    
+    # 캐시 적중률 (프로세스 전체 기준)
+    recommendation_stats = recommendation_cache.stats()
+    answer_stats = answer_cache.stats()
+    parse_stats = spec_parse_cache.stats()
+    st.caption(
+        f"📈 추천 결과 캐시 적중률: {recommendation_stats['hit_rate']:.0%} "
+        f"({recommendation_stats['hits']}/{recommendation_stats['hits'] + recommendation_stats['misses']})"
+    )
+    st.caption(
+        f"📈 후속 질문 캐시 적중률: {answer_stats['hit_rate']:.0%} "
+        f"({answer_stats['hits']}/{answer_stats['hits'] + answer_stats['misses']}, 저장된 질문 {answer_stats['entries']}개)"
+    )
+    st.caption(
+        f"📈 스펙 파싱 캐시 적중률: {parse_stats['hit_rate']:.0%} "
+        f"({parse_stats['hits']}/{parse_stats['hits'] + parse_stats['misses']}, {parse_stats['size']}개 저장)"
+    )
 
 def format_price(price):
     """가격을 원 단위로 포맷팅 (3자리마다 콤마)"""
@@ -324,94 +269,96 @@ def escape_html(text: str) -> str:
 
 def generate_products_html(products: List[Dict], product_descriptions: Dict = None, user_software: str = None, user_usage: str = None) -> str:
     """제품 목록을 HTML로 변환"""
-    products_html = '<div style="margin-top: 1rem;"><h3 style="color: #6336FF; margin-bottom: 1rem;">🎯 추천 상품</h3>'
-    
-    for i, product in enumerate(products, 1):
-        # 제품명과 가격 이스케이프
-        product_name = escape_html(product.get("상품명", ""))
-        product_price = format_price(product.get("최저가", ""))
-        
-        products_html += f'<div class="product-card" style="margin-bottom: 1.5rem;">'
-        products_html += f'<div class="product-name">{i}. {product_name}</div>'
-        products_html += f'<div class="product-price">{product_price}</div>'
+    with span('render_html', products=len(products)) as trace:
+        products_html = '<div style="margin-top: 1rem;"><h3 style="color: #6336FF; margin-bottom: 1rem;">🎯 추천 상품</h3>'
         
-        # 상품 설명
-        if product_descriptions and i-1 in product_descriptions and product_descriptions[i-1]:
-            desc = escape_html(product_descriptions[i-1])
-            products_html += f'<div class="product-spec" style="margin: 1rem 0; padding: 1rem; background-color: #f8f9fa; border-radius: 8px; border-left: 4px solid #6336FF;">💡 <strong>추천 이유:</strong><br>{desc}</div>'
-        else:
-            # 스펙 기반 간단한 설명
-            spec_text = str(product.get('상세스펙', ''))
+        for i, product in enumerate(products, 1):
+            # 제품명과 가격 이스케이프
+            product_name = escape_html(product.get("상품명", ""))
+            product_price = format_price(product.get("최저가", ""))
+            
+            products_html += f'<div class="product-card" style="margin-bottom: 1.5rem;">'
+            products_html += f'<div class="product-name">{i}. {product_name}</div>'
+            products_html += f'<div class="product-price">{product_price}</div>'
+            
+            # 상품 설명
+            if product_descriptions and i-1 in product_descriptions and product_descriptions[i-1]:
+                desc = escape_html(product_descriptions[i-1])
+                products_html += f'<div class="product-spec" style="margin: 1rem 0; padding: 1rem; background-color: #f8f9fa; border-radius: 8px; border-left: 4px solid #6336FF;">💡 <strong>추천 이유:</strong><br>{desc}</div>'
+            else:
+                # 스펙 기반 간단한 설명
+                spec_text = str(product.get('상세스펙', ''))
+                if spec_text:
+                    # 같은 스펙 문자열은 캐시된 결과 사용 (화면을 다시 그릴 때마다 재검사하지 않음)
+                    highlights = extract_highlight_features(spec_text)
+                    key_features = []
+                    if highlights['discrete_gpu']:
+                        key_features.append("강력한 외장 그래픽카드")
+                    if highlights['ram_label']:
+                        key_features.append(f"{highlights['ram_label']} RAM")
+                    if highlights['ssd']:
+                        key_features.append("고속 SSD")
+                    
+                    if key_features:
+                        simple_desc = f"이 제품은 {', '.join(key_features)}를 갖추고 있어 {user_software or user_usage or '작업'}에 적합합니다."
+                        simple_desc = escape_html(simple_desc)
+                        products_html += f'<div class="product-spec" style="margin: 1rem 0; padding: 1rem; background-color: #f8f9fa; border-radius: 8px; border-left: 4px solid #6336FF;">💡 <strong>추천 이유:</strong><br>{simple_desc}</div>'
+            
+            # 핵심 스펙
+            spec_text = str(product.get('상세스펙', ''))[:200]
             if spec_text:
-                key_features = []
-                if '외장그래픽' in spec_text or 'RTX' in spec_text or 'GTX' in spec_text:
-                    key_features.append("강력한 외장 그래픽카드")
-                if '16GB' in spec_text or '32GB' in spec_text:
-                    ram_match = re.search(r'(\d+)\s*GB', spec_text)
-                    if ram_match:
-                        key_features.append(f"{ram_match.group(1)}GB RAM")
-                if 'SSD' in spec_text or 'M.2' in spec_text:
-                    key_features.append("고속 SSD")
-                
-                if key_features:
-                    simple_desc = f"이 제품은 {', '.join(key_features)}를 갖추고 있어 {user_software or user_usage or '작업'}에 적합합니다."
-                    simple_desc = escape_html(simple_desc)
-                    products_html += f'<div class="product-spec" style="margin: 1rem 0; padding: 1rem; background-color: #f8f9fa; border-radius: 8px; border-left: 4px solid #6336FF;">💡 <strong>추천 이유:</strong><br>{simple_desc}</div>'
-        
-        # 핵심 스펙
-        spec_text = str(product.get('상세스펙', ''))[:200]
-        if spec_text:
-            spec_text_escaped = escape_html(spec_text)
-            products_html += f'<div class="product-spec">📋 핵심 스펙: {spec_text_escaped}...</div>'
-        
-        # 별점 및 리뷰 수
-        if product.get('별점') and product.get('리뷰 수'):
-            rating = escape_html(str(product.get('별점', '')))
-            review_count = escape_html(str(product.get('리뷰 수', '')))
-            products_html += f'<div style="margin: 0.5rem 0; color: #666;">⭐ {rating}점 | 💬 리뷰 {review_count}개</div>'
-        
-        # 다나와 링크 (CSV 파일의 실제 URL 사용 - 항상 버튼 표시)
-        product_url = product.get('URL', '') or product.get('상품 상세 URL', '')
-        url_str = None
-        
-        # URL 값 정리 (NaN, None, 빈 문자열 처리)
-        if product_url:
-            product_url_str = str(product_url).strip()
-            # NaN, None, 빈 문자열 체크
-            if product_url_str and product_url_str.lower() not in ['nan', 'none', 'null', '']:
-                # URL이 유효한지 확인 (http 또는 https로 시작)
-                if product_url_str.startswith('http://') or product_url_str.startswith('https://'):
-                    url_str = product_url_str
-                elif product_url_str.startswith('/'):
-                    # 상대 경로인 경우 다나와 도메인 추가
-                    url_str = 'https://www.danawa.com' + product_url_str
-                elif 'danawa.com' in product_url_str:
-                    # danawa.com이 포함되어 있으면 https 추가
-                    url_str = 'https://' + product_url_str if not product_url_str.startswith('http') else product_url_str
+                spec_text_escaped = escape_html(spec_text)
+                products_html += f'<div class="product-spec">📋 핵심 스펙: {spec_text_escaped}...</div>'
+            
+            # 별점 및 리뷰 수
+            if product.get('별점') and product.get('리뷰 수'):
+                rating = escape_html(str(product.get('별점', '')))
+                review_count = escape_html(str(product.get('리뷰 수', '')))
+                products_html += f'<div style="margin: 0.5rem 0; color: #666;">⭐ {rating}점 | 💬 리뷰 {review_count}개</div>'
+            
+            # 다나와 링크 (CSV 파일의 실제 URL 사용 - 항상 버튼 표시)
+            product_url = product.get('URL', '') or product.get('상품 상세 URL', '')
+            url_str = None
+            
+            # URL 값 정리 (NaN, None, 빈 문자열 처리)
+            if product_url:
+                product_url_str = str(product_url).strip()
+                # NaN, None, 빈 문자열 체크
+                if product_url_str and product_url_str.lower() not in ['nan', 'none', 'null', '']:
+                    # URL이 유효한지 확인 (http 또는 https로 시작)
+                    if product_url_str.startswith('http://') or product_url_str.startswith('https://'):
+                        url_str = product_url_str
+                    elif product_url_str.startswith('/'):
+                        # 상대 경로인 경우 다나와 도메인 추가
+                        url_str = 'https://www.danawa.com' + product_url_str
+                    elif 'danawa.com' in product_url_str:
+                        # danawa.com이 포함되어 있으면 https 추가
+                        url_str = 'https://' + product_url_str if not product_url_str.startswith('http') else product_url_str
+                    else:
+                        # 그 외의 경우 다나와 도메인 추가
+                        url_str = 'https://www.danawa.com/' + product_url_str
+            
+            # URL이 없으면 제품명으로 다나와 검색 페이지로 연결
+            if not url_str:
+                product_name_for_search = product.get("상품명", "")
+                if product_name_for_search:
+                    # 제품명을 URL 인코딩하여 검색 URL 생성
+                    encoded_name = urllib.parse.quote(product_name_for_search)
+                    url_str = f'https://search.danawa.com/dsearch.php?query={encoded_name}'
                 else:
-                    # 그 외의 경우 다나와 도메인 추가
-                    url_str = 'https://www.danawa.com/' + product_url_str
-        
-        # URL이 없으면 제품명으로 다나와 검색 페이지로 연결
-        if not url_str:
-            product_name_for_search = product.get("상품명", "")
-            if product_name_for_search:
-                # 제품명을 URL 인코딩하여 검색 URL 생성
-                encoded_name = urllib.parse.quote(product_name_for_search)
-                url_str = f'https://search.danawa.com/dsearch.php?query={encoded_name}'
-            else:
-                # 제품명도 없으면 기본 검색 페이지
-                url_str = 'https://search.danawa.com/'
-        
-        # URL이 확실히 있는 경우에만 링크 버튼 표시
-        if url_str:
-            url_escaped = escape_html(url_str)
-            products_html += f'<a href="{url_escaped}" target="_blank" style="display: inline-block; margin-top: 0.5rem; padding: 0.5rem 1rem; background-color: #6336FF; color: white; text-decoration: none; border-radius: 8px; font-weight: 600;">🔗 다나와 최저가 확인</a>'
+                    # 제품명도 없으면 기본 검색 페이지
+                    url_str = 'https://search.danawa.com/'
+            
+            # URL이 확실히 있는 경우에만 링크 버튼 표시
+            if url_str:
+                url_escaped = escape_html(url_str)
+                products_html += f'<a href="{url_escaped}" target="_blank" style="display: inline-block; margin-top: 0.5rem; padding: 0.5rem 1rem; background-color: #6336FF; color: white; text-decoration: none; border-radius: 8px; font-weight: 600;">🔗 다나와 최저가 확인</a>'
+            
+            products_html += '</div>'
         
         products_html += '</div>'
-    
-    products_html += '</div>'
-    return products_html
+        trace.set(bytes=len(products_html.encode('utf-8')))
+        return products_html
 
 def detect_intent(user_input: str) -> Optional[str]:
     """사용자 입력에서 의도 감지"""
@@ -428,12 +375,27 @@ def detect_intent(user_input: str) -> Optional[str]:
                 return intent
     return None
 
-def search_system_requirements(software_name: str, tavily_api_key: str) -> Dict:
-    """Tavily를 사용하여 소프트웨어의 시스템 요구사항 검색"""
-    try:
-        search = TavilySearchResults(api_key=tavily_api_key, max_results=3)
-        query = f"{software_name} 시스템 요구사항 권장 사양 CPU RAM GPU"
-        results = search.invoke(query)
+def fetch_system_requirements(software_name: str, tavily_api_key: str) -> Dict:
+    """Tavily를 사용하여 소프트웨어의 시스템 요구사항 검색 (공유 캐시 우선, 세션 상태를 쓰지 않으므로 백그라운드 실행 가능, 실패 시 예외)"""
+    with span('tavily_search', software=software_name) as trace:
+        # 같은 소프트웨어(별칭 포함)를 이미 검색했으면 캐시된 결과 사용
+        spec_cache = get_spec_cache()
+        if spec_cache is not None:
+            cached_spec_info = spec_cache.get(software_name)
+            if cached_spec_info is not None:
+                trace.set(cache_hit=True)
+                return cached_spec_info
+        trace.set(cache_hit=False)
+        
+        results = None
+        try:
+            search = TavilySearchResults(api_key=tavily_api_key, max_results=3)
+            query = f"{software_name} 시스템 요구사항 권장 사양 CPU RAM GPU"
+            results = search.invoke(query)
+            tavily_requests.inc(result='ok')
+        except Exception:
+            tavily_requests.inc(result='error')
+            raise
         
         # 검색 결과에서 사양 정보 추출
         spec_info = {
@@ -448,467 +410,190 @@ def search_system_requirements(software_name: str, tavily_api_key: str) -> Dict:
             content = result.get('content', '')
             spec_info['description'] += content + " "
             
-            # CPU 정보 추출
-            cpu_patterns = [
-                r'(?:CPU|프로세서)[:\s]*([A-Za-z0-9\s\-]+?)(?:GHz|코어|core|RAM|GPU|$)',
-                r'(인텔|AMD|Intel|라이젠|코어|Core)[\s\w\-]+(?:GHz|코어|core)',
-            ]
-            for pattern in cpu_patterns:
-                match = re.search(pattern, content, re.IGNORECASE)
-                if match and not spec_info['cpu']:
-                    spec_info['cpu'] = match.group(0)[:100]
-            
-            # RAM 정보 추출
-            ram_patterns = [
-                r'(\d+)\s*GB\s*(?:RAM|램|메모리)',
-                r'RAM[:\s]*(\d+)\s*GB',
-            ]
-            for pattern in ram_patterns:
-                match = re.search(pattern, content, re.IGNORECASE)
-                if match and not spec_info['ram']:
-                    spec_info['ram'] = int(match.group(1))
-            
-            # GPU 정보 추출
-            gpu_patterns = [
-                r'(?:GPU|그래픽|비디오)[:\s]*([A-Za-z0-9\s\-]+?)(?:RAM|GB|$|메모리)',
-                r'(RTX|GTX|Radeon|NVIDIA|AMD)[\s\w\d]+',
-            ]
-            for pattern in gpu_patterns:
-                match = re.search(pattern, content, re.IGNORECASE)
-                if match and not spec_info['gpu']:
-                    spec_info['gpu'] = match.group(0)[:100]
+            # CPU/RAM/GPU 정보 추출 (미리 컴파일된 패턴, 앞선 검색 결과에서 찾은 값 우선)
+            requirements = extract_requirements_from_text(content)
+            for key in ('cpu', 'ram', 'gpu'):
+                if requirements[key] and not spec_info[key]:
+                    spec_info[key] = requirements[key]
+        trace.set(results=len(results), chars=len(spec_info['description']))
+        
+        # 검색 결과가 있는 경우에만 캐시에 저장 (일시적인 빈 결과는 저장하지 않음)
+        if spec_cache is not None and spec_info['description'].strip():
+            spec_cache.set(software_name, spec_info)
         
         return spec_info
-    except Exception as e:
-        st.error(f"웹 검색 오류: {e}")
-        return {}
-
-def extract_cpu_from_spec(spec_text: str) -> Optional[Dict]:
-    """스펙 텍스트에서 CPU 정보 추출"""
-    spec_lower = spec_text.lower()
-    cpu_info = {'brand': None, 'model': None, 'generation': None, 'score': 0}
-    
-    # 인텔 CPU 추출
-    intel_patterns = [
-        r'(?:인텔|intel)[\s/]*코어[\s/]*(?:i|울트라|ultra)?[\s/]*(\d+)[\s/]*(?:세대|gen)?[\s/]*(?:i|울트라|ultra)?[\s/]*(\d+)[\s/]*([a-z0-9]+)?',
-        r'코어[\s/]*(?:i|울트라|ultra)?[\s/]*(\d+)[\s/]*(?:세대|gen)?[\s/]*(?:i|울트라|ultra)?[\s/]*(\d+)[\s/]*([a-z0-9]+)?',
-        r'i(\d+)[\s/]*-[\s/]*(\d+)[\s/]*세대',
-        r'코어[\s/]*울트라[\s/]*(\d+)[\s/]*\([^)]*\)',
-    ]
-    for pattern in intel_patterns:
-        match = re.search(pattern, spec_lower, re.IGNORECASE)
-        if match:
-            cpu_info['brand'] = 'intel'
-            if len(match.groups()) >= 2:
-                cpu_info['generation'] = int(match.group(1)) if match.group(1).isdigit() else None
-                cpu_info['model'] = match.group(2) if len(match.groups()) > 1 else None
-            break
-    
-    # AMD CPU 추출
-    amd_patterns = [
-        r'(?:amd|라이젠|ryzen)[\s/]*(\d+)[\s/]*(?:zen[\s/]*(\d+))?[\s/]*([a-z0-9]+)?',
-        r'라이젠[\s/]*(\d+)[\s/]*\([^)]*\)',
-    ]
-    for pattern in amd_patterns:
-        match = re.search(pattern, spec_lower, re.IGNORECASE)
-        if match:
-            cpu_info['brand'] = 'amd'
-            if match.group(1).isdigit():
-                cpu_info['generation'] = int(match.group(1))
-            break
-    
-    # CPU 성능 점수 계산 (세대와 모델 번호 기반)
-    if cpu_info['generation']:
-        cpu_info['score'] = cpu_info['generation'] * 10
-        if cpu_info['model'] and cpu_info['model'].isdigit():
-            cpu_info['score'] += int(cpu_info['model'])
-    
-    return cpu_info if cpu_info['brand'] else None
 
-def extract_gpu_from_spec(spec_text: str) -> Optional[Dict]:
-    """스펙 텍스트에서 GPU 정보 추출"""
-    spec_lower = spec_text.lower()
-    gpu_info = {'type': None, 'model': None, 'score': 0}
-    
-    # RTX 추출
-    rtx_match = re.search(r'rtx[\s/]*(\d{4,5})', spec_lower, re.IGNORECASE)
-    if rtx_match:
-        gpu_info['type'] = 'rtx'
-        gpu_info['model'] = int(rtx_match.group(1))
-        gpu_info['score'] = 1000 + gpu_info['model']  # RTX는 높은 점수
-        return gpu_info
-    
-    # GTX 추출
-    gtx_match = re.search(r'gtx[\s/]*(\d{3,4})', spec_lower, re.IGNORECASE)
-    if gtx_match:
-        gpu_info['type'] = 'gtx'
-        gpu_info['model'] = int(gtx_match.group(1))
-        gpu_info['score'] = 500 + gpu_info['model']  # GTX는 중간 점수
-        return gpu_info
-    
-    # Radeon RX 추출
-    rx_match = re.search(r'rx[\s/]*(\d{4})', spec_lower, re.IGNORECASE)
-    if rx_match:
-        gpu_info['type'] = 'radeon'
-        gpu_info['model'] = int(rx_match.group(1))
-        gpu_info['score'] = 800 + gpu_info['model']
-        return gpu_info
-    
-    # 외장 그래픽 여부만 확인
-    if '외장그래픽' in spec_lower:
-        gpu_info['type'] = 'external'
-        gpu_info['score'] = 100
-        return gpu_info
-    
-    return None
+def start_requirements_prefetch(software_name: str, tavily_api_key: str) -> Optional[Future]:
+    """소프트웨어 이름을 받은 즉시 시스템 요구사항 검색을 백그라운드 스레드 풀에서 미리 시작 (추천 단계에서 결과 사용)"""
+    if not software_name or not tavily_api_key:
+        return None
+    return submit_background(bind_turn(fetch_system_requirements), software_name, tavily_api_key)
 
-def extract_ram_from_spec(spec_text: str) -> Optional[int]:
-    """스펙 텍스트에서 RAM 정보 추출 (GB)"""
-    ram_matches = re.findall(r'(\d+)\s*gb', spec_text, re.IGNORECASE)
-    if ram_matches:
-        # 가장 큰 RAM 값 반환
-        return max([int(m) for m in ram_matches])
-    return None
+def search_system_requirements(software_name: str, tavily_api_key: str, prefetch: Optional[Future] = None) -> Dict:
+    """시스템 요구사항 검색 (미리 시작한 검색 결과 우선, 실패 시 다시 검색하고 그래도 실패하면 오류 표시)
 
-def parse_required_cpu(cpu_text: str) -> Optional[Dict]:
-    """요구사항 CPU 텍스트 파싱"""
-    if not cpu_text:
-        return None
-    
-    cpu_lower = cpu_text.lower()
-    cpu_info = {'brand': None, 'model': None, 'generation': None, 'score': 0}
-    
-    # 인텔 CPU 파싱
-    intel_match = re.search(r'(?:intel|인텔)[\s/]*core[\s/]*(?:i|i-)?[\s/]*(\d+)[\s/]*-[\s/]*(\d+)([a-z]+)?', cpu_lower, re.IGNORECASE)
-    if intel_match:
-        cpu_info['brand'] = 'intel'
-        if intel_match.group(1).isdigit():
-            cpu_info['generation'] = int(intel_match.group(1))
-        if intel_match.group(2).isdigit():
-            cpu_info['model'] = int(intel_match.group(2))
-        if cpu_info['generation']:
-            cpu_info['score'] = cpu_info['generation'] * 10
-            if cpu_info['model']:
-                cpu_info['score'] += cpu_info['model']
-        return cpu_info
-    
-    # AMD CPU 파싱
-    amd_match = re.search(r'(?:amd|라이젠|ryzen)[\s/]*(\d+)[\s/]*(\d{4})?', cpu_lower, re.IGNORECASE)
-    if amd_match:
-        cpu_info['brand'] = 'amd'
-        if amd_match.group(1).isdigit():
-            cpu_info['generation'] = int(amd_match.group(1))
-        if cpu_info['generation']:
-            cpu_info['score'] = cpu_info['generation'] * 10
-        return cpu_info
+    미리 시작한 검색을 기다린 시간과 다시 검색하는 시간을 합쳐 SPEC_PREFETCH_WAIT_SECONDS를 넘지 않음
+    """
+    if prefetch is not None:
+        deadline = time.monotonic() + SPEC_PREFETCH_WAIT_SECONDS
+        with span('tavily_prefetch_wait', ready=prefetch.done()) as trace:
+            try:
+                return prefetch.result(timeout=SPEC_PREFETCH_WAIT_SECONDS)
+            except FuturesTimeoutError:
+                # 제한 시간을 모두 기다렸으므로 다시 검색하지 않음 (검색 결과 없이 추천)
+                trace.set(fallback='timeout')
+                prefetch.cancel()
+                st.warning("시스템 요구사항 검색이 지연되어 검색 결과 없이 추천합니다.")
+                return {}
+            except Exception as e:
+                # 미리 시작한 검색이 실패했으면 남은 시간 안에서만 다시 검색
+                trace.set(fallback=type(e).__name__)
+        
+        retry = submit_background(bind_turn(fetch_system_requirements), software_name, tavily_api_key)
+        try:
+            return retry.result(timeout=max(deadline - time.monotonic(), 0))
+        except FuturesTimeoutError:
+            retry.cancel()
+            st.warning("시스템 요구사항 검색이 지연되어 검색 결과 없이 추천합니다.")
+            return {}
+        except Exception as e:
+            st.error(f"웹 검색 오류: {e}")
+            return {}
     
-    return None
+    try:
+        return fetch_system_requirements(software_name, tavily_api_key)
+    except Exception as e:
+        st.error(f"웹 검색 오류: {e}")
+        return {}
 
-def parse_required_gpu(gpu_text: str) -> Optional[Dict]:
-    """요구사항 GPU 텍스트 파싱"""
-    if not gpu_text:
-        return None
-    
-    gpu_lower = gpu_text.lower()
-    gpu_info = {'type': None, 'model': None, 'score': 0}
-    
-    # RTX 추출
-    rtx_match = re.search(r'rtx[\s/]*(\d{4,5})', gpu_lower, re.IGNORECASE)
-    if rtx_match:
-        gpu_info['type'] = 'rtx'
-        gpu_info['model'] = int(rtx_match.group(1))
-        gpu_info['score'] = 1000 + gpu_info['model']
-        return gpu_info
-    
-    # GTX 추출
-    gtx_match = re.search(r'gtx[\s/]*(\d{3,4})', gpu_lower, re.IGNORECASE)
-    if gtx_match:
-        gpu_info['type'] = 'gtx'
-        gpu_info['model'] = int(gtx_match.group(1))
-        gpu_info['score'] = 500 + gpu_info['model']
-        return gpu_info
-    
-    # Radeon 추출
-    rx_match = re.search(r'(?:radeon|rx)[\s/]*(\d{4})', gpu_lower, re.IGNORECASE)
-    if rx_match:
-        gpu_info['type'] = 'radeon'
-        gpu_info['model'] = int(rx_match.group(1))
-        gpu_info['score'] = 800 + gpu_info['model']
-        return gpu_info
+def _product_to_dict(row: Dict, score: int) -> Dict:
+    """추천 결과로 반환할 상품 정보 딕셔너리 생성"""
+    # URL 가져오기 (여러 컬럼명 시도)
+    product_url = row.get('URL', '') or row.get('상품 상세 URL', '') or row.get('url', '')
+    # pandas Series의 경우 값이 NaN일 수 있으므로 체크
+    try:
+        if pd.isna(product_url):
+            product_url = ''
+    except:
+        # pd.isna가 없거나 에러가 나면 문자열로 변환 후 체크
+        product_url_str = str(product_url).strip()
+        if product_url_str.lower() in ['nan', 'none', 'null', '']:
+            product_url = ''
     
-    return None
+    return {
+        '상품명': str(row.get('상품명', '')),
+        '최저가': row.get('최저가', row.get('가격', '')),
+        '상세스펙': row.get('상세스펙', row.get('스펙', '')),
+        'URL': str(product_url) if product_url else '',
+        '별점': row.get('별점', ''),
+        '리뷰 수': row.get('리뷰 수', ''),
+        'score': score
+    }
 
-def match_products_by_spec(spec_info: Dict, products_df: pd.DataFrame, product_type: str, 
-                          budget: Optional[int] = None, weight_preference: Optional[str] = None, 
-                          portable_need: Optional[bool] = None) -> List[Dict]:
-    """시스템 사양에 맞는 상품 필터링 - 요구사항과 실제 스펙을 비교"""
-    if products_df is None or len(products_df) == 0:
-        return []
-    
-    # 제품 타입 필터링 (더 유연하게 - 상품명과 스펙 모두 확인)
-    if product_type == '노트북':
-        # 노트북만 포함하고, 데스크탑/PC는 제외
-        # 상품명 또는 스펙에 노트북 키워드가 있으면 포함
-        spec_col = products_df.get('상세스펙', products_df.get('스펙', pd.Series([''] * len(products_df))))
-        filtered_df = products_df[
-            (
-                products_df['상품명'].str.contains('노트북|랩탑|laptop', case=False, na=False) |
-                spec_col.str.contains('노트북|랩탑|laptop|인치|kg|배터리', case=False, na=False)
-            ) &
-            ~products_df['상품명'].str.contains('데스크탑|PC|컴퓨터|미니PC', case=False, na=False) &
-            ~spec_col.str.contains('데스크탑|미니PC', case=False, na=False)
-        ]
-    elif product_type in ['PC', '데스크탑']:
-        # 데스크탑/PC만 포함하고, 노트북은 제외
-        spec_col = products_df.get('상세스펙', products_df.get('스펙', pd.Series([''] * len(products_df))))
-        filtered_df = products_df[
-            (
-                products_df['상품명'].str.contains('데스크탑|PC|컴퓨터|미니PC', case=False, na=False) |
-                spec_col.str.contains('데스크탑|미니PC', case=False, na=False)
-            ) &
-            ~products_df['상품명'].str.contains('노트북|랩탑|laptop', case=False, na=False) &
-            ~spec_col.str.contains('노트북|랩탑|laptop|인치.*kg', case=False, na=False)
-        ]
-    else:
-        filtered_df = products_df
-    
-    if len(filtered_df) == 0:
-        return []
-    
+class MatchCandidates(NamedTuple):
+    """스펙 정보 없이 미리 거를 수 있는 매칭 후보 (제품 타입/예산/무게 조건, 조건 완화 단계별 후보 목록)"""
+    stages: List[pd.DataFrame]  # 제품 타입이 맞는 상품 후보 (prefilter_stages 결과)
+
+def _rank_products(stages: List[pd.DataFrame], spec_info: Dict, product_type: str, user_usage: Optional[str],
+                   budget: Optional[int], weight_preference: Optional[str], portable_need: Optional[bool],
+                   top_k: int = 3) -> List[Dict]:
+    """후보를 채점하여 상위 top_k개를 추천 결과 딕셔너리로 반환 (추천을 다 채우지 못하면 다음 단계 후보로 다시 채점)"""
     # 요구사항 파싱
     required_cpu = parse_required_cpu(spec_info.get('cpu', ''))
     required_ram = spec_info.get('ram')
     required_gpu = parse_required_gpu(spec_info.get('gpu', ''))
     
-    # 스펙 매칭 점수 계산
-    scored_products = []
-    
-    for idx, row in filtered_df.iterrows():
-        score = 0
-        spec_text = str(row.get('상세스펙', row.get('스펙', '')))
-        product_name = str(row.get('상품명', ''))
-        
-        # 스펙이 비어있거나 제품명과 동일한 경우, 제품명에서 스펙 정보 추출 시도
-        if not spec_text or spec_text == product_name or len(spec_text.strip()) < 10:
-            # 제품명에서 스펙 정보가 있는지 확인
-            if product_name and len(product_name) > len(spec_text):
-                spec_text = product_name  # 제품명을 스펙으로 사용
-        
-        # 제품 스펙 추출
-        product_cpu = extract_cpu_from_spec(spec_text)
-        product_ram = extract_ram_from_spec(spec_text)
-        product_gpu = extract_gpu_from_spec(spec_text)
-        
-        # CPU 매칭 (요구사항과 비교)
-        if required_cpu and product_cpu:
-            if required_cpu['brand'] == product_cpu['brand']:
-                score += 20  # 같은 브랜드
-                # 세대와 모델 비교
-                if product_cpu.get('generation') and required_cpu.get('generation'):
-                    if product_cpu['generation'] >= required_cpu['generation']:
-                        score += 30  # 요구사항 이상의 세대
-                        # 모델 번호 비교
-                        if product_cpu.get('model') and required_cpu.get('model'):
-                            if product_cpu['model'] >= required_cpu['model']:
-                                score += 20  # 요구사항 이상의 모델
-                            else:
-                                score += 10  # 모델은 낮지만 세대는 높음
-                    else:
-                        score += 5  # 세대가 낮지만 같은 브랜드
-            else:
-                # 다른 브랜드지만 성능 점수로 비교
-                if product_cpu.get('score', 0) >= required_cpu.get('score', 0):
-                    score += 15
-        elif required_cpu:
-            # CPU 요구사항은 있지만 제품 CPU를 못 찾은 경우, 키워드 매칭
-            cpu_keywords = ['인텔', 'amd', '라이젠', '코어', 'intel', 'ryzen', 'core']
-            for keyword in cpu_keywords:
-                if keyword.lower() in required_cpu.get('brand', '').lower() and keyword.lower() in spec_text.lower():
-                    score += 5
-                    break
+    for candidates_df in stages:
+        # 스펙 매칭 점수 계산 (컬럼 단위 벡터 연산)
+        scores = score_products(
+            candidates_df, required_cpu, required_ram, required_gpu, product_type,
+            user_usage, budget, weight_preference, portable_need
+        )
         
-        # RAM 매칭
-        if required_ram and product_ram:
-            if product_ram >= required_ram:
-                score += 30  # 요구사항 이상
-                if product_ram >= required_ram * 1.5:
-                    score += 10  # 여유 있음
-            else:
-                score += 5  # 부족하지만 있음
-        
-        # GPU 매칭 (가장 중요)
-        if required_gpu and product_gpu:
-            if required_gpu['type'] == product_gpu['type']:
-                score += 40  # 같은 타입 (RTX, GTX 등)
-                if product_gpu.get('model') and required_gpu.get('model'):
-                    if product_gpu['model'] >= required_gpu['model']:
-                        score += 30  # 요구사항 이상의 모델
-                    else:
-                        score += 10  # 모델은 낮지만 같은 타입
-            else:
-                # 다른 타입이지만 성능 점수로 비교
-                if product_gpu.get('score', 0) >= required_gpu.get('score', 0):
-                    score += 20
-        elif required_gpu:
-            # GPU 요구사항은 있지만 제품 GPU를 못 찾은 경우
-            if required_gpu['type'] == 'rtx' and 'rtx' in spec_text.lower():
-                score += 15
-            elif required_gpu['type'] == 'gtx' and 'gtx' in spec_text.lower():
-                score += 15
-            elif '외장그래픽' in spec_text.lower():
-                score += 10
-        elif product_gpu and product_gpu['type'] in ['rtx', 'gtx', 'radeon']:
-            # GPU 요구사항은 없지만 외장 그래픽이 있는 경우 (게임용)
-            if st.session_state.get('user_usage') == '게임용':
-                score += 20
-        
-        # 게임용/작업용인 경우 외장 그래픽 필수 체크
-        user_usage = st.session_state.get('user_usage')
-        if user_usage in ['게임용', '작업용']:
-            if product_gpu and product_gpu['type'] in ['rtx', 'gtx', 'radeon', 'external']:
-                score += 15  # 외장 그래픽 보너스
-            elif '내장그래픽' in spec_text.lower() and '외장그래픽' not in spec_text.lower():
-                # 내장 그래픽만 있으면 매우 큰 감점 (거의 제외)
-                score -= 100  # 내장 그래픽만 있으면 거의 제외
-        
-        # 예산 필터링 및 점수 조정
-        if budget:
-            try:
-                product_price = int(float(str(row.get('최저가', row.get('가격', '0'))).replace(',', '')))
-                if product_price <= budget:
-                    # 예산 내면 가산점 (예산에 가까울수록 높은 점수)
-                    price_ratio = product_price / budget
-                    if price_ratio >= 0.9:
-                        score += 10  # 예산의 90% 이상 사용
-                    elif price_ratio >= 0.7:
-                        score += 15  # 예산의 70-90%
-                    elif price_ratio >= 0.5:
-                        score += 20  # 예산의 50-70% (가성비 좋음)
-                    else:
-                        score += 10  # 예산의 50% 미만
-                else:
-                    # 예산 초과시 감점
-                    over_ratio = (product_price - budget) / budget
-                    if over_ratio <= 0.1:
-                        score -= 5  # 10% 이하 초과
-                    elif over_ratio <= 0.2:
-                        score -= 15  # 20% 이하 초과
-                    else:
-                        score -= 30  # 20% 이상 초과
-            except:
-                pass
+        # 상위 top_k개 선택 (게임용/작업용은 외장 그래픽 가능성이 높은 제품 우선)
+        positions = select_recommendations(candidates_df, scores, user_usage, top_k=top_k)
+        if len(positions) >= top_k:
+            break
+    
+    rows = candidates_df.iloc[positions].to_dict('records')
+    return [_product_to_dict(row, int(score)) for row, score in zip(rows, scores[positions])]
+
+def prepare_match_candidates(products_df: pd.DataFrame, product_type: str, user_usage: Optional[str],
+                             budget: Optional[int] = None, weight_preference: Optional[str] = None,
+                             product_index: Optional[ProductIndex] = None) -> Optional[MatchCandidates]:
+    """스펙 정보가 필요 없는 후보 준비 (제품 타입/예산/무게 - 웹 검색과 동시에 실행 가능, 세션 상태를 읽지 않음)"""
+    if products_df is None or len(products_df) == 0:
+        return None
+    
+    with span('match_prefilter', product_type=product_type, catalog_size=len(products_df)) as trace:
+        # 카탈로그 로드 시 계산된 스펙 피처 사용 (없으면 여기서 한 번 계산)
+        if not has_spec_features(products_df):
+            products_df = add_spec_features(products_df)
         
-        # 무게 필터링 (노트북만)
-        if weight_preference and product_type == '노트북':
-            weight_matches = re.findall(r'(\d+\.?\d*)\s*kg', spec_text, re.IGNORECASE)
-            if weight_matches:
-                try:
-                    product_weight = float(weight_matches[0])
-                    if weight_preference == '가벼운':
-                        if product_weight <= 1.5:
-                            score += 20
-                        elif product_weight <= 2.0:
-                            score += 10
-                        else:
-                            score -= 10
-                    elif weight_preference == '보통':
-                        if 1.5 <= product_weight <= 2.5:
-                            score += 10
-                    elif weight_preference == '무거워도됨':
-                        score += 5  # 무게 무관
-                except:
-                    pass
+        # 제품 타입 필터링 (카탈로그 색인이 있으면 미리 계산된 행 위치 사용, 없으면 is_laptop/is_desktop 컬럼)
+        if product_index is not None and product_index.size != len(products_df):
+            product_index = None
+        if product_index is not None:
+            type_positions = product_index.type_positions(product_type)
+            filtered_df = products_df.iloc[type_positions]
+        elif product_type == '노트북':
+            filtered_df = products_df[products_df['is_laptop']]
+        elif product_type in ['PC', '데스크탑']:
+            filtered_df = products_df[products_df['is_desktop']]
+        else:
+            filtered_df = products_df
         
-        # 휴대용 필요 여부 (노트북만)
-        if portable_need is not None and product_type == '노트북':
-            if portable_need:
-                # 가벼운 제품 선호
-                weight_matches = re.findall(r'(\d+\.?\d*)\s*kg', spec_text, re.IGNORECASE)
-                if weight_matches:
-                    try:
-                        product_weight = float(weight_matches[0])
-                        if product_weight <= 1.5:
-                            score += 15
-                        elif product_weight <= 2.0:
-                            score += 5
-                    except:
-                        pass
-            else:
-                # 휴대용 불필요하면 무게 무관
-                score += 5
+        if len(filtered_df) == 0:
+            return None
+        trace.set(candidates=len(filtered_df))
         
-        # URL 가져오기 (여러 컬럼명 시도)
-        product_url = row.get('URL', '') or row.get('상품 상세 URL', '') or row.get('url', '')
-        # pandas Series의 경우 값이 NaN일 수 있으므로 체크
-        try:
-            if pd.isna(product_url):
-                product_url = ''
-        except:
-            # pd.isna가 없거나 에러가 나면 문자열로 변환 후 체크
-            product_url_str = str(product_url).strip()
-            if product_url_str.lower() in ['nan', 'none', 'null', '']:
-                product_url = ''
+        # 예산 상한(예산의 MAX_BUDGET_RATIO배)을 넘는 상품은 가격 정렬 색인 이진 탐색으로 제외 (가격 미상 상품 포함)
+        # 예산 적합도는 채점에서 반영 (상한 아래 범위로 후보를 자르면 점수가 더 높은 상품이 빠질 수 있음)
+        within_budget = None
+        if budget and product_index is not None:
+            budget_positions = product_index.price_range_positions(
+                -np.inf, budget * MAX_BUDGET_RATIO, include_unknown=True, within=type_positions
+            )
+            within_budget = products_df.iloc[budget_positions]
+            trace.set(within_budget=len(budget_positions))
         
-        scored_products.append({
-            '상품명': product_name,
-            '최저가': row.get('최저가', row.get('가격', '')),
-            '상세스펙': row.get('상세스펙', row.get('스펙', '')),
-            'URL': str(product_url) if product_url else '',
-            '별점': row.get('별점', ''),
-            '리뷰 수': row.get('리뷰 수', ''),
-            'score': score
-        })
-    
-    # 점수 순으로 정렬
-    scored_products.sort(key=lambda x: x['score'], reverse=True)
+        return MatchCandidates(prefilter_stages(
+            filtered_df, product_type, user_usage, budget, weight_preference, within_budget=within_budget
+        ))
+
+def rank_match_candidates(candidates: Optional[MatchCandidates], spec_info: Dict, product_type: str,
+                          user_usage: Optional[str], budget: Optional[int] = None,
+                          weight_preference: Optional[str] = None,
+                          portable_need: Optional[bool] = None) -> List[Dict]:
+    """미리 준비한 후보를 시스템 사양 기준으로 채점하여 추천 상품 반환"""
+    if candidates is None:
+        return []
     
-    # 게임용/작업용인 경우 내장 그래픽만 있는 제품 제외
+    with span('match_scoring', product_type=product_type) as trace:
+        recommendations = _rank_products(
+            candidates.stages, spec_info, product_type, user_usage,
+            budget, weight_preference, portable_need
+        )
+        trace.set(results=len(recommendations))
+        return recommendations
+
+def match_products_by_spec(spec_info: Dict, products_df: pd.DataFrame, product_type: str, 
+                          budget: Optional[int] = None, weight_preference: Optional[str] = None, 
+                          portable_need: Optional[bool] = None,
+                          product_index: Optional[ProductIndex] = None) -> List[Dict]:
+    """시스템 사양에 맞는 상품 필터링 - 요구사항과 실제 스펙을 비교"""
     user_usage = st.session_state.get('user_usage')
-    if user_usage in ['게임용', '작업용']:
-        valid_products = []
-        for p in scored_products:
-            spec_text = str(p.get('상세스펙', '')).lower()
-            # 내장 그래픽만 있고 외장 그래픽이 없는 제품 제외
-            if '내장그래픽' in spec_text and '외장그래픽' not in spec_text:
-                continue
-            # 외장 그래픽이 있거나, GPU 정보가 없는 경우만 포함
-            if '외장그래픽' in spec_text or 'rtx' in spec_text or 'gtx' in spec_text or 'radeon' in spec_text or 'rx' in spec_text:
-                valid_products.append(p)
-            elif p['score'] > 50:  # 점수가 높으면 포함 (외장 그래픽이 있을 가능성)
-                valid_products.append(p)
-        
-        # 외장 그래픽이 있는 제품이 있으면 그것만 반환
-        if valid_products:
-            return valid_products[:3]
-        # 없으면 점수가 높은 것 중에서 선택 (하지만 내장 그래픽만 있는 것은 제외)
-        filtered_products = [p for p in scored_products if p['score'] > 0 and 
-                            not ('내장그래픽' in str(p.get('상세스펙', '')).lower() and 
-                                 '외장그래픽' not in str(p.get('상세스펙', '')).lower())]
-        return filtered_products[:3] if filtered_products else []
-    
-    # 상위 3개 반환 (점수가 0 이상인 것만)
-    valid_products = [p for p in scored_products if p['score'] > 0]
-    return valid_products[:3] if valid_products else scored_products[:3]
+    candidates = prepare_match_candidates(products_df, product_type, user_usage, budget, weight_preference, product_index)
+    return rank_match_candidates(candidates, spec_info, product_type, user_usage, budget, weight_preference, portable_need)
 
-def generate_response_with_gemini(
+def build_gemini_prompt(
     user_input: str,
     conversation_context: str,
     spec_info: Optional[Dict] = None,
-    recommended_products: Optional[List] = None,
-    gemini_api_key: str = None,
-    model_name: str = 'gemini-2.5-flash'
+    recommended_products: Optional[List] = None
 ) -> str:
-    """Gemini를 사용하여 응답 생성"""
-    if not gemini_api_key:
-        return "API 키가 설정되지 않았습니다."
-    
-    try:
-        # 모델 초기화
-        model, error = initialize_gemini_model(gemini_api_key, model_name)
-        if model is None:
-            return error or "모델을 초기화할 수 없습니다."
-        
-        prompt = f"""당신은 채널코퍼레이션의 '비즈니스 컨시어지' 정신을 구현하는 테크 전문 쇼핑 가이드 챗봇입니다.
+    """Gemini 답변 생성용 프롬프트"""
+    prompt = f"""당신은 채널코퍼레이션의 '비즈니스 컨시어지' 정신을 구현하는 테크 전문 쇼핑 가이드 챗봇입니다.
 친절하고 전문적인 톤으로 사용자에게 도움을 제공하세요.
 
 대화 맥락:
@@ -916,9 +601,9 @@ def generate_response_with_gemini(
 
 사용자 입력: {user_input}
 """
-        
-        if spec_info and recommended_products:
-            prompt += f"""
+    
+    if spec_info and recommended_products:
+        prompt += f"""
 검색된 시스템 사양 정보:
 {json.dumps(spec_info, ensure_ascii=False, indent=2)}
 
@@ -927,49 +612,325 @@ def generate_response_with_gemini(
 
 위 정보를 바탕으로 전문적이고 친절한 답변을 생성해주세요.
 """
-        elif recommended_products:
-            # spec_info는 없지만 추천 상품이 있는 경우 (추가 대화)
-            prompt += f"""
+    elif recommended_products:
+        # spec_info는 없지만 추천 상품이 있는 경우 (추가 대화)
+        prompt += f"""
 이전에 추천한 상품:
 {json.dumps(recommended_products, ensure_ascii=False, indent=2)}
 
 사용자의 추가 질문이나 요청에 대해 위 추천 상품 정보를 참고하여 친절하고 전문적으로 답변해주세요.
 """
-        
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        error_str = str(e)
-        # API 할당량 초과 오류 처리
-        if '429' in error_str or 'quota' in error_str.lower() or 'exceeded' in error_str.lower():
-            # 할당량 초과 시 fallback 메시지 생성
-            if recommended_products and len(recommended_products) > 0:
-                fallback_msg = f"""안녕하세요! 현재 API 할당량이 일시적으로 초과되어 자동 응답 생성에 제한이 있습니다.
+    return prompt
+
+def build_quota_fallback_message(recommended_products: Optional[List] = None) -> str:
+    """API 할당량 초과 시 보여줄 대체 답변"""
+    if recommended_products and len(recommended_products) > 0:
+        fallback_msg = f"""안녕하세요! 현재 API 할당량이 일시적으로 초과되어 자동 응답 생성에 제한이 있습니다.
 
 하지만 고객님의 요구사항에 맞춰 {len(recommended_products)}개의 추천 제품을 찾았습니다. 아래 제품들을 확인해보시고, 추가 질문이 있으시면 말씀해주세요.
 
 추천 제품:
 """
-                for i, product in enumerate(recommended_products[:3], 1):
-                    fallback_msg += f"\n{i}. {product.get('상품명', '')} - {format_price(product.get('최저가', ''))}"
-                
-                return fallback_msg
+        for i, product in enumerate(recommended_products[:3], 1):
+            fallback_msg += f"\n{i}. {product.get('상품명', '')} - {format_price(product.get('최저가', ''))}"
+        
+        return fallback_msg
+    return "죄송합니다. 현재 API 할당량이 일시적으로 초과되어 응답 생성에 제한이 있습니다. 잠시 후 다시 시도해주시거나, 다른 조건으로 검색해보시겠어요?"
+
+def generate_response_with_gemini(
+    user_input: str,
+    conversation_context: str,
+    spec_info: Optional[Dict] = None,
+    recommended_products: Optional[List] = None,
+    gemini_api_key: str = None,
+    model_name: str = 'gemini-2.5-flash'
+) -> str:
+    """Gemini를 사용하여 응답 생성"""
+    if not gemini_api_key:
+        return "API 키가 설정되지 않았습니다."
+    
+    with span('gemini_answer', model=model_name) as trace:
+        try:
+            # 모델 초기화
+            model, error = initialize_gemini_model(gemini_api_key, model_name)
+            if model is None:
+                return error or "모델을 초기화할 수 없습니다."
+            
+            prompt = build_gemini_prompt(user_input, conversation_context, spec_info, recommended_products)
+            trace.set(prompt_chars=len(prompt))
+            response_text = generate_text(model, prompt)
+            trace.set(response_chars=len(response_text))
+            return response_text
+        except Exception as e:
+            trace.set(error=type(e).__name__)
+            # API 할당량 초과 오류 처리
+            if is_quota_error(e):
+                # 할당량 초과 시 fallback 메시지 생성
+                return build_quota_fallback_message(recommended_products)
             else:
-                return "죄송합니다. 현재 API 할당량이 일시적으로 초과되어 응답 생성에 제한이 있습니다. 잠시 후 다시 시도해주시거나, 다른 조건으로 검색해보시겠어요?"
-        else:
-            return f"응답 생성 오류: {str(e)}"
+                return f"응답 생성 오류: {str(e)}"
+
+class StreamFailure(str):
+    """스트리밍이 끝까지 완료되지 못했을 때의 안내 문구 (정상 답변 조각과 구분, 캐시에 저장하지 않음)"""
+
+def stream_response_with_gemini(
+    user_input: str,
+    conversation_context: str,
+    spec_info: Optional[Dict] = None,
+    recommended_products: Optional[List] = None,
+    gemini_api_key: str = None,
+    model_name: str = 'gemini-2.5-flash'
+):
+    """Gemini 응답을 생성되는 대로 조각 단위로 반환 (오류 시 generate_response_with_gemini와 같은 안내 문구를 StreamFailure로 반환)"""
+    if not gemini_api_key:
+        yield StreamFailure("API 키가 설정되지 않았습니다.")
+        return
+    
+    with span('gemini_stream', model=model_name) as trace:
+        response_chars = 0
+        try:
+            # 모델 초기화
+            model, error = initialize_gemini_model(gemini_api_key, model_name)
+            if model is None:
+                yield StreamFailure(error or "모델을 초기화할 수 없습니다.")
+                return
+            
+            prompt = build_gemini_prompt(user_input, conversation_context, spec_info, recommended_products)
+            trace.set(prompt_chars=len(prompt))
+            for chunk in stream_text(model, prompt):
+                # 첫 조각까지 걸린 시간 (사용자가 답변이 시작되는 것을 보는 시점)
+                if not response_chars:
+                    trace.set(first_chunk_ms=round(trace.elapsed_ms(), 3))
+                response_chars += len(chunk)
+                yield chunk
+            trace.set(response_chars=response_chars)
+        except Exception as e:
+            trace.set(error=type(e).__name__, response_chars=response_chars)
+            # API 할당량 초과 오류 처리 (일부 조각이 이미 전달되었어도 실패로 표시)
+            if is_quota_error(e):
+                yield StreamFailure(build_quota_fallback_message(recommended_products))
+            else:
+                yield StreamFailure(f"응답 생성 오류: {str(e)}")
+
+def parse_batched_response(response_text: str, product_count: int) -> Optional[Tuple[str, Dict]]:
+    """일괄 응답 JSON 검증 후 (답변, {상품 인덱스: 설명}) 반환 (형식이 맞지 않으면 None)"""
+    data = parse_json_response(response_text)
+    if not isinstance(data, dict):
+        return None
+    
+    answer = data.get('answer')
+    if not isinstance(answer, str) or not answer.strip():
+        return None
+    
+    descriptions = data.get('descriptions')
+    if not isinstance(descriptions, dict):
+        descriptions = {}
+    
+    product_descriptions = {}
+    for key, description in descriptions.items():
+        try:
+            index = int(key)
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < product_count and isinstance(description, str) and description.strip():
+            product_descriptions[index] = description.strip()
+    
+    return answer.strip(), product_descriptions
+
+def generate_batched_response_with_gemini(
+    user_input: str,
+    conversation_context: str,
+    spec_info: Optional[Dict],
+    recommended_products: List[Dict],
+    gemini_api_key: str,
+    model_name: str = 'gemini-2.5-flash'
+) -> Optional[Tuple[str, Dict]]:
+    """한 번의 호출로 전체 답변과 상품별 설명을 JSON으로 생성 (실패 시 None - 기존 방식으로 대체)"""
+    if not gemini_api_key or not recommended_products:
+        return None
+    
+    with span('gemini_batched', model=model_name, products=len(recommended_products)) as trace:
+        model, error = initialize_gemini_model(gemini_api_key, model_name)
+        if model is None:
+            return None
+        
+        prompt = build_gemini_prompt(user_input, conversation_context, spec_info, recommended_products)
+        prompt += f"""
+추가로, 추천 상품 각각에 대해 이 제품이 사용자 요구사항에 왜 적합한지 2-3문장으로 간략하고 전문적인 설명을 작성해주세요.
+
+반드시 아래 형식의 JSON 객체 하나로만 응답하세요 (descriptions의 키는 추천 상품 목록의 0부터 시작하는 순서 번호, 0~{len(recommended_products) - 1}):
+{{"answer": "전체 답변", "descriptions": {{"0": "첫 번째 상품 설명", "1": "두 번째 상품 설명"}}}}
+"""
+        trace.set(prompt_chars=len(prompt))
+        
+        try:
+            response_text = generate_text(model, prompt, generation_config={'response_mime_type': 'application/json'})
+        except Exception as e:
+            trace.set(error=type(e).__name__)
+            if is_quota_error(e):
+                # 할당량 초과 시 추가 호출 없이 대체 답변 사용
+                return build_quota_fallback_message(recommended_products), {i: None for i in range(len(recommended_products))}
+            return None
+        
+        trace.set(response_chars=len(response_text))
+        parsed = parse_batched_response(response_text, len(recommended_products))
+        trace.set(parsed=parsed is not None)
+        return parsed
+
+def build_description_prompt(product: Dict) -> str:
+    """추천 상품 설명 생성용 프롬프트"""
+    return f"""다음 제품에 대해 2-3문장으로 간략하고 전문적인 설명을 작성해주세요.
+사용자 요구사항:
+- 용도: {st.session_state.user_usage}
+- 소프트웨어: {st.session_state.user_software}
+- 예산: {format_price(st.session_state.user_budget) if st.session_state.user_budget else '제한 없음'}
+- 제품 타입: {st.session_state.user_intent}
+
+제품 정보:
+- 상품명: {product.get('상품명', '')}
+- 가격: {format_price(product.get('최저가', ''))}
+- 스펙: {str(product.get('상세스펙', ''))[:300]}
+
+이 제품이 사용자 요구사항에 왜 적합한지, 주요 특징과 장점을 간략히 설명해주세요. 친절하고 전문적인 톤으로 작성해주세요."""
+
+def start_product_descriptions(products: List[Dict], indices: Optional[List[int]] = None) -> Dict:
+    """추천 상품 설명 요청을 공유 스레드 풀에서 동시에 시작 ({future: 상품 순번} 반환)"""
+    if indices is None:
+        indices = list(range(len(products)))
+    if not st.session_state.gemini_api_key or not products or not indices:
+        return {}
+    
+    model, error = initialize_gemini_model(
+        st.session_state.gemini_api_key,
+        st.session_state.get('gemini_model', 'gemini-2.5-flash')
+    )
+    if model is None:
+        return {}
+    
+    # 호출당 타임아웃은 submit_generation에서 적용
+    return {
+        submit_generation(model, build_description_prompt(products[i])): i
+        for i in indices
+    }
+
+def collect_product_descriptions(futures: Dict, products: List[Dict], placeholder=None) -> Dict:
+    """완료되는 순서대로 상품 설명을 모아 placeholder의 제품 카드에 채워 넣음"""
+    product_descriptions = {}
+    if not futures:
+        return product_descriptions
+    
+    with span('product_descriptions', requests=len(futures)) as trace:
+        if placeholder is not None:
+            with placeholder.container():
+                st.info(f"📝 **상품 설명을 생성하는 중입니다... (0/{len(futures)})**")
+        
+        quota_exceeded = False
+        try:
+            for future in as_completed(futures, timeout=GEMINI_CALL_TIMEOUT_SECONDS + 5):
+                i = futures[future]
+                try:
+                    product_descriptions[i] = future.result().strip()
+                except Exception as e:
+                    # API 할당량 초과 시 해당 설명은 건너뛰고 스펙 기반 설명 사용
+                    if is_quota_error(e):
+                        quota_exceeded = True
+                    product_descriptions[i] = None
+                
+                # 완료된 설명부터 제품 카드에 표시
+                if placeholder is not None:
+                    with placeholder.container():
+                        st.info(f"📝 **상품 설명을 생성하는 중입니다... ({len(product_descriptions)}/{len(futures)})**")
+                        st.markdown(
+                            generate_products_html(
+                                products,
+                                product_descriptions,
+                                st.session_state.user_software,
+                                st.session_state.user_usage
+                            ),
+                            unsafe_allow_html=True,
+                        )
+        except FuturesTimeoutError:
+            # 시간 안에 끝나지 않은 설명은 포기 (스펙 기반 설명으로 대체)
+            for future, i in futures.items():
+                if not future.done():
+                    future.cancel()
+                    product_descriptions[i] = None
+        
+        if quota_exceeded and placeholder is not None:
+            with placeholder.container():
+                st.warning("⚠️ API 할당량이 초과되어 일부 상품 설명을 생성하지 못했습니다. 제품 정보는 정상적으로 표시됩니다.")
+        
+        trace.set(
+            completed=sum(1 for description in product_descriptions.values() if description),
+            response_chars=sum(len(description) for description in product_descriptions.values() if description),
+        )
+        return product_descriptions
+
+def generate_product_descriptions(products: List[Dict], placeholder=None, indices: Optional[List[int]] = None) -> Dict:
+    """추천 상품 설명을 동시에 생성 (indices가 주어지면 해당 순번의 상품만)"""
+    futures = start_product_descriptions(products, indices)
+    return collect_product_descriptions(futures, products, placeholder)
+
+def is_fallback_response(bot_response: str, recommended_products: Optional[List] = None) -> bool:
+    """모델 답변이 아닌 오류/지연/할당량 초과 안내 문구인지 확인 (캐시에 저장하지 않음)"""
+    if not bot_response or bot_response == build_quota_fallback_message(recommended_products):
+        return True
+    return bot_response.startswith(('응답 생성 오류', 'API 키가', '모델을 초기화', '죄송합니다.'))
+
+def is_cacheable_recommendation(spec_info: Dict, recommended_products: List[Dict], bot_response: str,
+                                product_descriptions: Dict) -> bool:
+    """추천 결과를 다른 대화에 재사용해도 되는지 확인 (검색 실패, 오류/할당량 안내 문구, 빠진 설명이 있으면 제외)"""
+    if not recommended_products or not bot_response:
+        return False
+    if not (spec_info or {}).get('description', '').strip():
+        return False
+    if is_fallback_response(bot_response, recommended_products):
+        return False
+    return all(product_descriptions.get(i) for i in range(len(recommended_products)))
+
+def render_streaming_response(chunks, placeholder, escape: bool = False) -> Tuple[str, bool]:
+    """스트리밍 응답 조각을 받는 대로 봇 말풍선에 표시하고 (전체 텍스트, 정상 완료 여부) 반환"""
+    response_text = ''
+    completed = True
+    for chunk in chunks:
+        if isinstance(chunk, StreamFailure):
+            completed = False
+            # 중간에 실패한 경우 받은 답변과 안내 문구를 구분
+            if response_text:
+                chunk = '\n\n' + chunk
+        response_text += chunk
+        shown_text = escape_html(response_text) if escape else response_text
+        placeholder.markdown(
+            f'<div class="chat-message bot-message">{shown_text}▌</div>',
+            unsafe_allow_html=True,
+        )
+    return response_text, completed
 
 # 메인 UI (챗봇 위젯 모드)
 # 타이틀과 구분선은 CSS로 숨김 처리됨
 
-# 상품 데이터 자동 로드 (없으면 다시 시도)
-if st.session_state.products_df is None:
-    st.session_state.products_df = load_products_data()
+def collect_cache_metrics() -> None:
+    """메트릭 조회 시점의 캐시 적중률과 저장 항목 수 갱신"""
+    for name, stats, size_key in (
+        ('recommendation', recommendation_cache.stats(), 'size'),
+        ('answer', answer_cache.stats(), 'entries'),
+        ('spec_parse', spec_parse_cache.stats(), 'size'),
+    ):
+        cache_hit_ratio.set(stats['hit_rate'], cache=name)
+        cache_entries.set(stats[size_key], cache=name)
+
+# 메트릭 서버 (METRICS_PORT가 설정된 경우, 프로세스당 한 번만 시작되고 재실행 시에는 그대로 유지)
+registry.register_collector('caches', collect_cache_metrics)
+start_metrics_server()
+
+# 상품 데이터 로드 (프로세스 공유 카탈로그 - 파일이 바뀌면 자동으로 다시 로드됨, 세션마다 CSV를 다시 읽지 않음)
+products_catalog = get_catalog(PRODUCTS_CSV_PATH)
+products_df = products_catalog.df if products_catalog is not None else None
 
 # 상품 데이터 확인 (간단한 표시만, 챗봇 위젯 모드에서는 불필요한 메시지 최소화)
-if st.session_state.products_df is None:
+if products_df is None:
     st.warning("⚠️ 상품 데이터 파일(electronics_data.csv)을 찾을 수 없습니다.")
-elif len(st.session_state.products_df) == 0:
+elif len(products_df) == 0:
     st.warning("⚠️ 상품 데이터가 비어있습니다.")
 # 데이터가 있으면 조용히 사용 (메시지 표시 안 함)
 
@@ -1006,6 +967,7 @@ else:
                 st.session_state.user_portable_need = None
                 st.session_state.recommended_products = []
                 st.session_state.spec_info = None
+                st.session_state.spec_prefetch = None
                 st.session_state.chat_history = []  # 채팅 히스토리 초기화
                 
                 # 챗봇이 먼저 말을 걸도록 메시지 추가
@@ -1041,6 +1003,10 @@ else:
     user_input = st.chat_input("메시지를 입력하세요...")
     
     if user_input:
+        # 이번 입력에서 기록되는 단계별 소요 시간을 하나의 턴으로 묶음
+        new_turn()
+        chat_turns.inc()
+        
         # 사용자 메시지 추가
         st.session_state.chat_history.append({'role': 'user', 'content': user_input})
         
@@ -1099,6 +1065,12 @@ else:
             st.session_state.user_software = user_input
             st.session_state.conversation_state = 'budget_asked'
             
+            # 예산/무게/휴대성 질문에 답하는 동안 시스템 요구사항을 미리 검색
+            st.session_state.spec_prefetch = (
+                user_input,
+                start_requirements_prefetch(user_input, st.session_state.tavily_api_key)
+            )
+            
             bot_response = "알겠습니다! 예산이 얼마 정도 되시나요? (예: 100만원, 200만원, 300만원 이상 등)"
             st.session_state.chat_history.append({'role': 'bot', 'content': bot_response})
             st.rerun()
@@ -1165,32 +1137,74 @@ else:
                 progress_bar = st.progress(0)
                 status_text = st.empty()
             
-            # 1단계: 시스템 요구사항 검색
-            status_text.text("📡 1/3 단계: 시스템 요구사항 검색 중...")
-            progress_bar.progress(33)
-            spec_info = search_system_requirements(
-                st.session_state.user_software,
-                st.session_state.tavily_api_key
-            )
-            st.session_state.spec_info = spec_info  # 세션 상태에 저장
-            
-            # 2단계: 상품 매칭
-            status_text.text("🔍 2/3 단계: 최적의 제품을 찾는 중...")
-            progress_bar.progress(66)
-            recommended_products = match_products_by_spec(
-                spec_info,
-                st.session_state.products_df,
+            # 같은 조건(예산은 10만원 구간)으로 이미 추천한 결과가 있으면 검색/매칭/답변 생성 없이 재사용
+            cache_key = recommendation_cache.make_key(
                 st.session_state.user_intent,
+                st.session_state.user_usage,
+                st.session_state.user_software,
                 st.session_state.user_budget,
                 st.session_state.user_weight_preference,
                 st.session_state.user_portable_need
             )
-            st.session_state.recommended_products = recommended_products
+            catalog_version = products_catalog.version if products_catalog is not None else None
+            with span('recommendation_cache_lookup') as trace:
+                cached_recommendation = recommendation_cache.get_for_catalog(catalog_version, cache_key)
+                trace.set(cache_hit=cached_recommendation is not None)
             
-            # 3단계: 응답 생성
-            status_text.text("✍️ 3/3 단계: 전문가 답변 생성 중...")
-            progress_bar.progress(100)
-            conversation_context = f"""
+            # 미리 시작한 요구사항 검색은 캐시 사용 여부와 관계없이 이번 추천에서 소비 (다음 대화로 넘기지 않음)
+            prefetch_software, prefetch = st.session_state.spec_prefetch or (None, None)
+            st.session_state.spec_prefetch = None
+            
+            if cached_recommendation is not None:
+                if prefetch is not None:
+                    prefetch.cancel()
+                spec_info = cached_recommendation['spec_info']
+                recommended_products = [dict(product) for product in cached_recommendation['products']]
+                bot_response = cached_recommendation['answer']
+                product_descriptions = dict(cached_recommendation['descriptions'])
+                st.session_state.spec_info = spec_info
+                st.session_state.recommended_products = recommended_products
+            else:
+                # 검색 결과가 필요 없는 후보 준비(제품 타입/예산/무게)는 미리 시작한 웹 검색이 진행되는 동안 이 스레드에서 처리
+                match_candidates = prepare_match_candidates(
+                    products_df,
+                    st.session_state.user_intent,
+                    st.session_state.user_usage,
+                    st.session_state.user_budget,
+                    st.session_state.user_weight_preference,
+                    products_catalog.index if products_catalog is not None else None
+                )
+
+                # 1단계: 시스템 요구사항 검색 (소프트웨어 질문 단계에서 미리 시작한 검색이 있으면 그 결과 사용)
+                status_text.text("📡 1/3 단계: 시스템 요구사항 검색 중...")
+                progress_bar.progress(33)
+                if prefetch_software != st.session_state.user_software:
+                    prefetch = None
+                spec_info = search_system_requirements(
+                    st.session_state.user_software,
+                    st.session_state.tavily_api_key,
+                    prefetch
+                )
+                st.session_state.spec_info = spec_info  # 세션 상태에 저장
+
+                # 2단계: 상품 매칭 (검색 결과가 도착하면 준비된 후보만 채점)
+                status_text.text("🔍 2/3 단계: 최적의 제품을 찾는 중...")
+                progress_bar.progress(66)
+                recommended_products = rank_match_candidates(
+                    match_candidates,
+                    spec_info,
+                    st.session_state.user_intent,
+                    st.session_state.user_usage,
+                    st.session_state.user_budget,
+                    st.session_state.user_weight_preference,
+                    st.session_state.user_portable_need
+                )
+                st.session_state.recommended_products = recommended_products
+
+                # 3단계: 응답 생성 (전문가 답변과 상품 설명을 동시에 요청)
+                status_text.text("✍️ 3/3 단계: 전문가 답변 생성 중...")
+                progress_bar.progress(100)
+                conversation_context = f"""
 사용자 의도: {st.session_state.user_intent}
 용도: {st.session_state.user_usage}
 소프트웨어: {st.session_state.user_software}
@@ -1198,65 +1212,85 @@ else:
 무게 선호도: {st.session_state.user_weight_preference if st.session_state.user_weight_preference else '무관'}
 휴대용 필요: {'예' if st.session_state.user_portable_need else '아니오'}
 """
-            
-            bot_response = generate_response_with_gemini(
-                user_input,
-                conversation_context,
-                spec_info,
-                recommended_products,
-                st.session_state.gemini_api_key,
-                st.session_state.get('gemini_model', 'gemini-2.5-flash')
-            )
+
+                # 일괄 응답 모드: 답변과 상품 설명을 한 번의 호출로 요청
+                batched_response = None
+                answer_completed = True  # 스트리밍이 중간에 실패하면 False (캐시에 저장하지 않음)
+                if GEMINI_BATCHED_RESPONSE and recommended_products:
+                    batched_response = generate_batched_response_with_gemini(
+                        user_input,
+                        conversation_context,
+                        spec_info,
+                        recommended_products,
+                        st.session_state.gemini_api_key,
+                        st.session_state.get('gemini_model', 'gemini-2.5-flash')
+                    )
+
+                if batched_response is not None:
+                    bot_response, product_descriptions = batched_response
+                    # 응답에서 빠진 상품 설명만 개별적으로 생성
+                    missing_indices = [i for i in range(len(recommended_products)) if i not in product_descriptions]
+                    if missing_indices:
+                        desc_loading = st.empty()
+                        product_descriptions.update(
+                            generate_product_descriptions(recommended_products, desc_loading, missing_indices)
+                        )
+                        desc_loading.empty()
+                else:
+                    # 기존 방식: 답변 1회 + 상품별 설명 N회를 동시에 요청
+                    description_futures = start_product_descriptions(recommended_products)
+
+                    if GEMINI_STREAMING:
+                        # 설명이 생성되는 동안 답변은 받는 대로 화면에 표시
+                        answer_placeholder = st.empty()
+                        bot_response, answer_completed = render_streaming_response(
+                            stream_response_with_gemini(
+                                user_input,
+                                conversation_context,
+                                spec_info,
+                                recommended_products,
+                                st.session_state.gemini_api_key,
+                                st.session_state.get('gemini_model', 'gemini-2.5-flash')
+                            ),
+                            answer_placeholder,
+                            escape=True
+                        )
+                    else:
+                        answer_future = submit_task(
+                            bind_turn(generate_response_with_gemini),
+                            user_input,
+                            conversation_context,
+                            spec_info,
+                            recommended_products,
+                            st.session_state.gemini_api_key,
+                            st.session_state.get('gemini_model', 'gemini-2.5-flash')
+                        )
+
+                    # 제품 설명 수집 (답변 생성과 병렬로 진행됨)
+                    desc_loading = st.empty()
+                    product_descriptions = collect_product_descriptions(description_futures, recommended_products, desc_loading)
+                    desc_loading.empty()
+
+                    if not GEMINI_STREAMING:
+                        try:
+                            bot_response = answer_future.result(timeout=GEMINI_CALL_TIMEOUT_SECONDS + 5)
+                        except FuturesTimeoutError:
+                            bot_response = "죄송합니다. 답변 생성이 지연되고 있습니다. 아래 추천 제품을 먼저 확인해주세요."
+
+                # 다음 같은 조건의 대화에서 재사용할 수 있도록 저장
+                if answer_completed and is_cacheable_recommendation(spec_info, recommended_products, bot_response,
+                                                                    product_descriptions):
+                    recommendation_cache.set_for_catalog(catalog_version, cache_key, {
+                        'spec_info': spec_info,
+                        'products': [dict(product) for product in recommended_products],
+                        'answer': bot_response,
+                        'descriptions': dict(product_descriptions),
+                    })
             
             # 로딩 표시 제거
             loading_placeholder.empty()
             
-            # 설명과 제품 카드를 하나의 메시지로 통합
             if recommended_products and len(recommended_products) > 0:
-                # 제품 설명 생성
-                product_descriptions = {}
-                if st.session_state.gemini_api_key:
-                    desc_loading = st.empty()
-                    with desc_loading.container():
-                        st.info(f"📝 **상품 설명을 생성하는 중입니다... (0/{len(recommended_products)})**")
-                    
-                    for i, product in enumerate(recommended_products):
-                        with desc_loading.container():
-                            st.info(f"📝 **상품 설명을 생성하는 중입니다... ({i+1}/{len(recommended_products)})**")
-                            try:
-                                model, error = initialize_gemini_model(
-                                    st.session_state.gemini_api_key,
-                                    st.session_state.get('gemini_model', 'gemini-2.5-flash')
-                                )
-                                if model:
-                                    description_prompt = f"""다음 제품에 대해 2-3문장으로 간략하고 전문적인 설명을 작성해주세요.
-사용자 요구사항:
-- 용도: {st.session_state.user_usage}
-- 소프트웨어: {st.session_state.user_software}
-- 예산: {format_price(st.session_state.user_budget) if st.session_state.user_budget else '제한 없음'}
-- 제품 타입: {st.session_state.user_intent}
-
-제품 정보:
-- 상품명: {product.get('상품명', '')}
-- 가격: {format_price(product.get('최저가', ''))}
-- 스펙: {str(product.get('상세스펙', ''))[:300]}
-
-이 제품이 사용자 요구사항에 왜 적합한지, 주요 특징과 장점을 간략히 설명해주세요. 친절하고 전문적인 톤으로 작성해주세요."""
-                                    
-                                    response = model.generate_content(description_prompt)
-                                    product_descriptions[i] = response.text.strip()
-                                else:
-                                    product_descriptions[i] = None
-                            except Exception as e:
-                                error_str = str(e)
-                                if '429' in error_str or 'quota' in error_str.lower() or 'exceeded' in error_str.lower():
-                                    with desc_loading.container():
-                                        st.warning("⚠️ API 할당량이 초과되어 상품 설명 생성을 중단했습니다. 제품 정보는 정상적으로 표시됩니다.")
-                                    break
-                                product_descriptions[i] = None
-                    
-                    desc_loading.empty()
-                
                 # 제품 카드 HTML 생성
                 products_html = generate_products_html(
                     recommended_products,
@@ -1355,11 +1389,12 @@ else:
                     
                     recommended_products = match_products_by_spec(
                         spec_info,
-                        st.session_state.products_df,
+                        products_df,
                         st.session_state.user_intent,
                         st.session_state.user_budget,
                         st.session_state.user_weight_preference,
-                        st.session_state.user_portable_need
+                        st.session_state.user_portable_need,
+                        products_catalog.index if products_catalog is not None else None
                     )
                     st.session_state.recommended_products = recommended_products
                     
@@ -1379,14 +1414,28 @@ else:
                     
                     # 제품이 있는지 확인
                     if recommended_products and len(recommended_products) > 0:
-                        bot_response = generate_response_with_gemini(
-                            user_input,
-                            conversation_context,
-                            spec_info,
-                            recommended_products,
-                            st.session_state.gemini_api_key,
-                            st.session_state.get('gemini_model', 'gemini-2.5-flash')
-                        )
+                        if GEMINI_STREAMING:
+                            bot_response, _ = render_streaming_response(
+                                stream_response_with_gemini(
+                                    user_input,
+                                    conversation_context,
+                                    spec_info,
+                                    recommended_products,
+                                    st.session_state.gemini_api_key,
+                                    st.session_state.get('gemini_model', 'gemini-2.5-flash')
+                                ),
+                                st.empty(),
+                                escape=True
+                            )
+                        else:
+                            bot_response = generate_response_with_gemini(
+                                user_input,
+                                conversation_context,
+                                spec_info,
+                                recommended_products,
+                                st.session_state.gemini_api_key,
+                                st.session_state.get('gemini_model', 'gemini-2.5-flash')
+                            )
                         
                         # 기존 제품 메시지 제거
                         st.session_state.chat_history = [msg for msg in st.session_state.chat_history if msg.get('type') != 'products']
@@ -1452,10 +1501,25 @@ else:
                 loading_placeholder = st.empty()
                 
                 try:
-                    with loading_placeholder.container():
-                        st.info("💬 **답변을 생성하는 중입니다. 잠시만 기다려주세요...**")
+                    # 같은 추천 상품에 대해 비슷한 질문을 이미 받았으면 저장된 답변 재사용
+                    answer_scope = product_set_key(
+                        st.session_state.recommended_products,
+                        st.session_state.user_usage,
+                        normalize_software_name(st.session_state.user_software or ''),
+                        st.session_state.user_budget,
+                        st.session_state.user_weight_preference,
+                        st.session_state.user_portable_need
+                    )
+                    product_names = [p.get('상품명', '') for p in st.session_state.recommended_products or []]
+                    with span('answer_cache_lookup', chars=len(user_input)) as trace:
+                        bot_response = answer_cache.lookup(answer_scope, user_input, product_names)
+                        trace.set(cache_hit=bot_response is not None)
                     
-                    conversation_context = f"""
+                    if bot_response is None:
+                        with loading_placeholder.container():
+                            st.info("💬 **답변을 생성하는 중입니다. 잠시만 기다려주세요...**")
+                        
+                        conversation_context = f"""
 사용자 의도: {st.session_state.user_intent}
 용도: {st.session_state.user_usage}
 소프트웨어: {st.session_state.user_software}
@@ -1470,15 +1534,35 @@ else:
 {json.dumps(st.session_state.recommended_products, ensure_ascii=False, indent=2)}
 """
                     
-                    # Gemini로 응답 생성
-                    bot_response = generate_response_with_gemini(
-                        user_input,
-                        conversation_context,
-                        None,  # spec_info는 이미 추천에 사용됨
-                        st.session_state.recommended_products,
-                        st.session_state.gemini_api_key,
-                        st.session_state.get('gemini_model', 'gemini-2.5-flash')
-                    )
+                        # Gemini로 응답 생성
+                        answer_completed = True  # 스트리밍이 중간에 실패하면 False (캐시에 저장하지 않음)
+                        if GEMINI_STREAMING:
+                            # 첫 조각이 도착하면 로딩 표시 자리에 답변을 이어서 표시
+                            bot_response, answer_completed = render_streaming_response(
+                                stream_response_with_gemini(
+                                    user_input,
+                                    conversation_context,
+                                    None,  # spec_info는 이미 추천에 사용됨
+                                    st.session_state.recommended_products,
+                                    st.session_state.gemini_api_key,
+                                    st.session_state.get('gemini_model', 'gemini-2.5-flash')
+                                ),
+                                loading_placeholder
+                            )
+                        else:
+                            bot_response = generate_response_with_gemini(
+                                user_input,
+                                conversation_context,
+                                None,  # spec_info는 이미 추천에 사용됨
+                                st.session_state.recommended_products,
+                                st.session_state.gemini_api_key,
+                                st.session_state.get('gemini_model', 'gemini-2.5-flash')
+                            )
+                        
+                        # 끝까지 생성된 답변만 저장 (오류/할당량 안내 문구, 중간에 끊긴 답변 제외)
+                        if answer_completed and not is_fallback_response(bot_response,
+                                                                         st.session_state.recommended_products):
+                            answer_cache.store(answer_scope, user_input, bot_response, product_names)
                     
                     # 로딩 표시 제거 (응답 생성 후)
                     loading_placeholder.empty()
@@ -1512,52 +1596,10 @@ else:
             len(st.session_state.recommended_products) > 0 and
             not any(msg.get('type') == 'products' for msg in st.session_state.chat_history)):
             
-            # 각 상품에 대한 설명 생성
-            product_descriptions = {}
-            if st.session_state.gemini_api_key and len(st.session_state.recommended_products) > 0:
-                desc_loading = st.empty()
-                with desc_loading.container():
-                    st.info(f"📝 **상품 설명을 생성하는 중입니다... (0/{len(st.session_state.recommended_products)})**")
-                
-                for i, product in enumerate(st.session_state.recommended_products):
-                    with desc_loading.container():
-                        st.info(f"📝 **상품 설명을 생성하는 중입니다... ({i+1}/{len(st.session_state.recommended_products)})**")
-                        try:
-                            model, error = initialize_gemini_model(
-                                st.session_state.gemini_api_key,
-                                st.session_state.get('gemini_model', 'gemini-2.5-flash')
-                            )
-                            if model:
-                                description_prompt = f"""다음 제품에 대해 2-3문장으로 간략하고 전문적인 설명을 작성해주세요.
-사용자 요구사항:
-- 용도: {st.session_state.user_usage}
-- 소프트웨어: {st.session_state.user_software}
-- 예산: {format_price(st.session_state.user_budget) if st.session_state.user_budget else '제한 없음'}
-- 제품 타입: {st.session_state.user_intent}
-
-제품 정보:
-- 상품명: {product.get('상품명', '')}
-- 가격: {format_price(product.get('최저가', ''))}
-- 스펙: {str(product.get('상세스펙', ''))[:300]}
-
-이 제품이 사용자 요구사항에 왜 적합한지, 주요 특징과 장점을 간략히 설명해주세요. 친절하고 전문적인 톤으로 작성해주세요."""
-                                
-                                response = model.generate_content(description_prompt)
-                                product_descriptions[i] = response.text.strip()
-                            else:
-                                product_descriptions[i] = None
-                        except Exception as e:
-                            error_str = str(e)
-                            # API 할당량 초과 시 설명 생성 건너뛰기
-                            if '429' in error_str or 'quota' in error_str.lower() or 'exceeded' in error_str.lower():
-                                # 할당량 초과 시 나머지 설명 생성 중단
-                                with desc_loading.container():
-                                    st.warning("⚠️ API 할당량이 초과되어 상품 설명 생성을 중단했습니다. 제품 정보는 정상적으로 표시됩니다.")
-                                break
-                            product_descriptions[i] = None
-                
-                # 설명 생성 완료 후 로딩 표시 제거
-                desc_loading.empty()
+            # 각 상품에 대한 설명 생성 (동시에 요청)
+            desc_loading = st.empty()
+            product_descriptions = generate_product_descriptions(st.session_state.recommended_products, desc_loading)
+            desc_loading.empty()
             
             # 제품 카드 HTML 생성
             products_html = generate_products_html(
@@ -1589,5 +1631,6 @@ else:
                 st.session_state.user_portable_need = None
                 st.session_state.recommended_products = []
                 st.session_state.spec_info = None
+                st.session_state.spec_prefetch = None
                 st.session_state.chat_history = []
                 st.rerun()
\ No newline at end of file
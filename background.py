@@ -0,0 +1,13 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Gemini 호출이 아닌 백그라운드 작업(시스템 요구사항 웹 검색 미리 시작 등)용 스레드 풀 크기
+BACKGROUND_MAX_WORKERS = int(os.getenv('BACKGROUND_MAX_WORKERS', '4'))
+
+# 프로세스 공유 스레드 풀 (Gemini 호출 풀과 따로 두어 웹 검색이 Gemini 동시 호출 수를 차지하지 않도록 함)
+_executor = ThreadPoolExecutor(max_workers=BACKGROUND_MAX_WORKERS, thread_name_prefix='background')
+
+
+def submit_background(fn, *args, **kwargs) -> Future:
+    """백그라운드 스레드 풀에서 Gemini 호출이 아닌 작업을 비동기로 시작"""
+    return _executor.submit(fn, *args, **kwargs)
@@ -0,0 +1,230 @@
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# 추천 파이프라인 오프라인 벤치마크
+# 사용법: python benchmark.py [--sizes 1000 10000 100000] [--iterations 200] [--json 결과.json]
+# Tavily/Gemini는 로컬 스텁으로 대체하므로 네트워크와 API 키 없이 실행됩니다.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_ITERATIONS = 200
+
+# 벤치마크용 대화 입력
+SAMPLE_INPUTS = [
+    '노트북 추천해줘', '게임용 데스크탑 찾고 있어요', '가벼운 랩탑 있나요?', '사무용 컴퓨터',
+    '영상 편집용 PC', '안녕하세요', '200만원 이하 notebook', '배터리 오래가는 거',
+]
+SAMPLE_SPEC_INFOS = [
+    {},
+    {'cpu': 'Intel Core i5-9400', 'ram': 8, 'gpu': 'NVIDIA GeForce GTX 1060'},
+    {'cpu': 'AMD Ryzen 5 3600', 'ram': 16, 'gpu': 'RTX 3060'},
+    {'cpu': 'intel core i7-12700k', 'ram': 32, 'gpu': 'Radeon RX 6600'},
+]
+SAMPLE_CONDITIONS = {
+    'product_type': ['노트북', 'PC', '데스크탑'],
+    'user_usage': ['게임용', '작업용', '사무용', None],
+    'budget': [None, 500000, 1000000, 1500000, 3000000],
+    'weight_preference': [None, '가벼운', '보통', '무거워도됨'],
+    'portable_need': [None, True, False],
+}
+
+# 스텁 Tavily 검색 결과
+STUB_SEARCH_RESULTS = [
+    {'content': '최소 사양: CPU: Intel Core i5-4590 3.3GHz, RAM: 8GB RAM, GPU: NVIDIA GeForce GTX 970 4GB'},
+    {'content': '권장 사양 프로세서: AMD Ryzen 5 1600 코어, 16GB 메모리, 그래픽: Radeon RX 580 8GB'},
+    {'content': '저장 공간 50GB 이상의 SSD 권장'},
+]
+
+
+class StubTavilySearch:
+    """고정된 검색 결과를 돌려주는 Tavily 대체 객체"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def invoke(self, query):
+        return [dict(result) for result in STUB_SEARCH_RESULTS]
+
+
+class StubGeminiModel:
+    """프롬프트 길이에 비례한 고정 답변을 돌려주는 Gemini 대체 객체"""
+
+    class _Response:
+        def __init__(self, text):
+            self.text = text
+
+    def generate_content(self, prompt, **kwargs):
+        return self._Response(f"추천 제품을 확인해보세요. (프롬프트 {len(prompt)}자)")
+
+
+def quiet_streamlit_logs():
+    """bare mode 경고(ScriptRunContext 없음) 숨김 (Streamlit 로거는 처음 사용할 때 생성되므로 import 후에도 호출)"""
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith('streamlit'):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+
+def import_app():
+    """Streamlit 없이(bare mode) app 모듈을 불러오고 외부 API를 스텁으로 교체"""
+    os.chdir(BASE_DIR)
+    sys.path.insert(0, BASE_DIR)
+    os.environ.setdefault('SPEC_CACHE_PATH', os.path.join(tempfile.mkdtemp(prefix='benchmark-'), 'spec_cache.sqlite3'))
+    os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+    os.environ.setdefault('TAVILY_API_KEY', 'benchmark')
+
+    import streamlit  # noqa: F401
+    quiet_streamlit_logs()
+    import app
+    quiet_streamlit_logs()
+    app.TavilySearchResults = StubTavilySearch
+    app.get_spec_cache = lambda: None  # 검색 단계는 매번 결과 파싱까지 측정
+    app.initialize_gemini_model = lambda api_key, model_name='gemini-2.5-flash': (StubGeminiModel(), None)
+    return app
+
+
+def build_synthetic_catalog(base_df: pd.DataFrame, size: int, seed: int = 0) -> pd.DataFrame:
+    """실제 상품 데이터를 복제하여 size개 상품의 카탈로그 생성 (가격/상품명/스펙을 조금씩 변형)"""
+    rng = np.random.default_rng(seed)
+    rows = base_df.sample(n=size, replace=True, random_state=seed).reset_index(drop=True)
+    prices = rows['최저가'].map(lambda value: str(value).replace(',', ''))
+    prices = pd.to_numeric(prices, errors='coerce') * rng.uniform(0.7, 1.3, size)
+    rows['최저가'] = prices.round(-3).map(lambda value: f"{int(value):,}" if pd.notna(value) else '')
+    suffix = pd.Series([f" #{i}" for i in range(size)])
+    rows['상품명'] = rows['상품명'].astype(str) + suffix
+    # 스펙 문자열도 상품마다 달라야 파싱 캐시 없이 새로 크롤링한 데이터와 같은 조건이 됨
+    rows['상세스펙'] = rows['상세스펙'].fillna('').astype(str) + suffix
+    return rows
+
+
+def measure(fn: Callable, args_list: List[tuple]) -> Dict:
+    """인자 목록으로 fn을 반복 호출하여 지연 시간 분포(ms)와 최대 메모리 측정"""
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # 메모리는 추적 오버헤드가 지연 시간에 섞이지 않도록 별도로 한 번 측정
+    tracemalloc.start()
+    fn(*args_list[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    values = np.array(timings)
+    return {
+        'calls': len(values),
+        'mean_ms': float(values.mean()),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p90_ms': float(np.percentile(values, 90)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(values.max()),
+        'peak_kb': peak / 1024,
+    }
+
+
+def run_benchmark(app, catalog_df: pd.DataFrame, iterations: int, seed: int = 0) -> Dict:
+    """한 카탈로그에 대해 단계별 벤치마크 실행"""
+    from catalog import ProductCatalog
+    from spec_parser import _parse_spec_uncached, parse_spec, spec_parse_cache
+
+    rng = random.Random(seed)
+    results = {}
+
+    # 카탈로그 로드 (스펙 파싱 + 피처 컬럼 + 역색인)
+    spec_parse_cache.clear()
+    results['catalog_build'] = measure(lambda df: ProductCatalog(df), [(catalog_df,)])
+    spec_parse_cache.clear()
+    catalog = ProductCatalog(catalog_df)
+    results['catalog_build']['df_memory_kb'] = catalog.df.memory_usage(deep=True).sum() / 1024
+
+    specs = catalog.df['상세스펙'].astype(str).tolist()
+    sample_specs = [(rng.choice(specs),) for _ in range(iterations)]
+    results['detect_intent'] = measure(app.detect_intent, [(rng.choice(SAMPLE_INPUTS),) for _ in range(iterations)])
+    results['parse_spec_uncached'] = measure(_parse_spec_uncached, sample_specs)
+    results['parse_spec_cached'] = measure(parse_spec, sample_specs)
+    results['search_system_requirements'] = measure(
+        app.search_system_requirements, [('배틀그라운드', 'benchmark')] * iterations
+    )
+
+    # 매칭 (user_usage는 세션 상태에서 읽음)
+    match_args = []
+    for _ in range(iterations):
+        conditions = {key: rng.choice(values) for key, values in SAMPLE_CONDITIONS.items()}
+        match_args.append((rng.choice(SAMPLE_SPEC_INFOS), conditions))
+
+    def match(spec_info, conditions):
+        app.st.session_state['user_usage'] = conditions['user_usage']
+        return app.match_products_by_spec(
+            spec_info, catalog.df, conditions['product_type'], conditions['budget'],
+            conditions['weight_preference'], conditions['portable_need'], catalog.index
+        )
+
+    results['match_products_by_spec'] = measure(match, match_args)
+
+    # 화면 렌더링과 답변 생성 (매칭 결과 사용)
+    recommendations = [match(*args) for args in match_args]
+    results['generate_products_html'] = measure(
+        app.generate_products_html, [(products, None, '배틀그라운드', '게임용') for products in recommendations]
+    )
+    results['generate_response_with_gemini'] = measure(
+        app.generate_response_with_gemini,
+        [('추천해줘', '용도: 게임용', STUB_SEARCH_RESULTS[0], products, 'benchmark') for products in recommendations]
+    )
+    return results
+
+
+def print_results(label: str, size: int, results: Dict) -> None:
+    """단계별 결과 표 출력"""
+    print("=" * 96)
+    print(f"{label} ({size:,}개 상품)")
+    print("=" * 96)
+    print(f"{'단계':<32}{'호출':>7}{'평균ms':>10}{'p50ms':>10}{'p90ms':>10}{'p99ms':>10}{'최대ms':>10}{'메모리KB':>10}")
+    for stage, stats in results.items():
+        print(f"{stage:<32}{stats['calls']:>7}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}"
+              f"{stats['p90_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['max_ms']:>10.3f}{stats['peak_kb']:>10.0f}")
+    df_memory = results['catalog_build'].get('df_memory_kb')
+    if df_memory is not None:
+        print(f"카탈로그 DataFrame 메모리: {df_memory / 1024:.1f}MB")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='추천 파이프라인 오프라인 벤치마크')
+    parser.add_argument('--csv', default=os.path.join(BASE_DIR, 'electronics_data.csv'), help='기준 상품 데이터 CSV')
+    parser.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES, help='합성 카탈로그 상품 수')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='단계별 반복 횟수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='결과를 저장할 JSON 파일 경로')
+    args = parser.parse_args()
+
+    app = import_app()
+    from catalog import read_products_csv
+    base_df = read_products_csv(args.csv)
+
+    report = {'csv': args.csv, 'iterations': args.iterations, 'runs': []}
+    catalogs = [('원본 카탈로그', base_df)]
+    catalogs += [('합성 카탈로그', build_synthetic_catalog(base_df, size, args.seed)) for size in args.sizes]
+    for label, catalog_df in catalogs:
+        results = run_benchmark(app, catalog_df, args.iterations, args.seed)
+        print_results(label, len(catalog_df), results)
+        report['runs'].append({'catalog': label, 'size': len(catalog_df), 'stages': results})
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장 완료: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
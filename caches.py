@@ -0,0 +1,255 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Hashable, Optional
+
+# 시스템 요구사항 캐시 설정 (환경 변수로 조정 가능)
+SPEC_CACHE_PATH = os.getenv('SPEC_CACHE_PATH', os.path.join('.cache', 'spec_cache.sqlite3'))
+SPEC_CACHE_TTL_SECONDS = float(os.getenv('SPEC_CACHE_TTL_HOURS', '168')) * 3600  # 기본 7일
+SPEC_CACHE_MAX_ENTRIES = int(os.getenv('SPEC_CACHE_MAX_ENTRIES', '1000'))
+
+# 추천 결과 캐시 설정 (메모리, 프로세스 공유)
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '3600'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '256'))
+RESPONSE_CACHE_BUDGET_STEP = 100000  # 예산은 10만원 단위 구간으로 묶어서 비교
+
+# 같은 소프트웨어를 가리키는 별칭 (공백/대소문자 정리 후 비교)
+SOFTWARE_ALIASES = {
+    '롤': '리그오브레전드',
+    'lol': '리그오브레전드',
+    'leagueoflegends': '리그오브레전드',
+    '배그': '배틀그라운드',
+    'pubg': '배틀그라운드',
+    'battlegrounds': '배틀그라운드',
+    '배틀그라운드pubg': '배틀그라운드',
+    '옵치': '오버워치',
+    'overwatch': '오버워치',
+    'overwatch2': '오버워치2',
+    'valorant': '발로란트',
+    '발로': '발로란트',
+    '마크': '마인크래프트',
+    'minecraft': '마인크래프트',
+    '프리미어': '프리미어프로',
+    'premiere': '프리미어프로',
+    'premierepro': '프리미어프로',
+    'adobepremierepro': '프리미어프로',
+    '포샵': '포토샵',
+    'photoshop': '포토샵',
+    'adobephotoshop': '포토샵',
+    '에프터이펙트': '애프터이펙트',
+    'aftereffects': '애프터이펙트',
+    'adobeaftereffects': '애프터이펙트',
+}
+
+
+def normalize_software_name(name: str) -> str:
+    """소프트웨어 이름 정규화 (유니코드/대소문자/공백/기호 정리 후 별칭 통합)"""
+    if not name:
+        return ''
+    normalized = unicodedata.normalize('NFKC', str(name)).lower()
+    normalized = re.sub(r'[\s\-_.·:/]+', '', normalized)
+    return SOFTWARE_ALIASES.get(normalized, normalized)
+
+
+class SpecCache:
+    """SQLite 파일 기반 시스템 요구사항 캐시 (TTL 만료 + LRU 개수 제한)
+
+    모든 세션과 프로세스가 같은 파일을 공유하며 재시작 후에도 유지됩니다.
+    """
+
+    def __init__(self, path: str = SPEC_CACHE_PATH, ttl_seconds: float = SPEC_CACHE_TTL_SECONDS,
+                 max_entries: int = SPEC_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS spec_cache ('
+                ' key TEXT PRIMARY KEY,'
+                ' software TEXT,'
+                ' spec_json TEXT NOT NULL,'
+                ' created_at REAL NOT NULL,'
+                ' last_access REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_spec_cache_last_access ON spec_cache (last_access)')
+
+    @contextmanager
+    def _connect(self):
+        """호출마다 새 연결 사용 (Streamlit 세션 스레드 간 연결 공유 방지), 정상 종료 시 커밋"""
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, software_name: str) -> Optional[Dict]:
+        """캐시된 spec_info 반환 (없거나 만료되었으면 None)"""
+        key = normalize_software_name(software_name)
+        if not key:
+            return None
+        now = time.time()
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute('SELECT spec_json, created_at FROM spec_cache WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    return None
+                spec_json, created_at = row
+                if now - created_at > self.ttl_seconds:
+                    conn.execute('DELETE FROM spec_cache WHERE key = ?', (key,))
+                    return None
+                conn.execute('UPDATE spec_cache SET last_access = ? WHERE key = ?', (now, key))
+        except sqlite3.Error:
+            # 캐시 오류는 무시하고 원래 경로(웹 검색)로 진행
+            return None
+        try:
+            return json.loads(spec_json)
+        except ValueError:
+            return None
+
+    def set(self, software_name: str, spec_info: Dict) -> None:
+        """spec_info 저장 후 최대 개수를 넘으면 가장 오래 사용하지 않은 항목부터 삭제"""
+        key = normalize_software_name(software_name)
+        if not key:
+            return
+        now = time.time()
+        spec_json = json.dumps(spec_info, ensure_ascii=False)
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO spec_cache (key, software, spec_json, created_at, last_access) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (key, software_name, spec_json, now, now)
+                )
+                conn.execute(
+                    'DELETE FROM spec_cache WHERE key IN ('
+                    ' SELECT key FROM spec_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)',
+                    (self.max_entries,)
+                )
+        except sqlite3.Error:
+            pass
+
+    def clear(self) -> None:
+        """캐시 전체 삭제"""
+        with self._lock, self._connect() as conn:
+            conn.execute('DELETE FROM spec_cache')
+
+
+_spec_cache: Optional[SpecCache] = None
+_spec_cache_lock = threading.Lock()
+
+
+def get_spec_cache() -> Optional[SpecCache]:
+    """프로세스 공유 시스템 요구사항 캐시 반환 (파일을 열 수 없으면 None - 캐시 없이 동작)"""
+    global _spec_cache
+    if _spec_cache is None:
+        with _spec_cache_lock:
+            if _spec_cache is None:
+                try:
+                    _spec_cache = SpecCache()
+                except (OSError, sqlite3.Error):
+                    return None
+    return _spec_cache
+
+
+class TTLCache:
+    """메모리 기반 LRU 캐시 (항목별 TTL 만료, 스레드 안전)"""
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # key -> (저장 시각, 값)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        """값 반환 (없거나 만료되었으면 None)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl_seconds is not None and time.time() - entry[0] > self.ttl_seconds:
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value) -> None:
+        """값 저장 (최대 개수를 넘으면 가장 오래 사용하지 않은 항목부터 삭제)"""
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict:
+        """적중/실패 횟수와 현재 크기"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._data),
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RecommendationCache(TTLCache):
+    """같은 대화 조건의 추천 결과(상품 목록, 답변, 상품 설명) 캐시
+
+    카탈로그 버전이 바뀌면 이전 결과를 모두 버립니다.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS):
+        super().__init__(max_entries, ttl_seconds)
+        self._catalog_version = None
+
+    @staticmethod
+    def make_key(intent: Optional[str], usage: Optional[str], software: Optional[str], budget: Optional[int],
+                 weight_preference: Optional[str], portable_need: Optional[bool]) -> tuple:
+        """대화 조건을 정규화한 캐시 키 (예산은 구간 단위)"""
+        budget_bucket = int(budget) // RESPONSE_CACHE_BUDGET_STEP if budget else None
+        return (intent, usage, normalize_software_name(software or ''), budget_bucket,
+                weight_preference, portable_need)
+
+    def _check_catalog_version(self, catalog_version) -> None:
+        """카탈로그 파일이 바뀌었으면 캐시 비우기"""
+        if catalog_version != self._catalog_version:
+            self.clear()
+            self._catalog_version = catalog_version
+
+    def get_for_catalog(self, catalog_version, key: tuple) -> Optional[Dict]:
+        """현재 카탈로그 버전 기준 캐시된 추천 결과 반환"""
+        self._check_catalog_version(catalog_version)
+        return self.get(key)
+
+    def set_for_catalog(self, catalog_version, key: tuple, value: Dict) -> None:
+        """현재 카탈로그 버전 기준으로 추천 결과 저장"""
+        self._check_catalog_version(catalog_version)
+        self.set(key, value)
+
+
+# 프로세스 공유 추천 결과 캐시
+recommendation_cache = RecommendationCache()
@@ -0,0 +1,296 @@
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from spec_parser import parse_spec, resolve_spec_text
+
+# 기본 상품 데이터 파일 (crawler.py가 생성)
+DEFAULT_CATALOG_PATH = 'electronics_data.csv'
+
+# 크롤러 CSV 컬럼명 -> 앱에서 사용하는 컬럼명
+COLUMN_MAPPING = {
+    '가격': '최저가',
+    '스펙': '상세스펙',
+    '상품 상세 URL': 'URL',
+    '상세 페이지 스펙': '상세페이지스펙',  # 증분 갱신 시 상세 페이지에서 수집한 스펙 (incremental.DETAIL_SPEC_FIELD)
+}
+
+# 제품 타입 판별 키워드 (소문자, 부분 문자열 기준 - '인치.*kg'만 정규식)
+LAPTOP_NAME_TERMS = ('노트북', '랩탑', 'laptop')
+LAPTOP_SPEC_TERMS = ('노트북', '랩탑', 'laptop', '인치', 'kg', '배터리')
+DESKTOP_NAME_TERMS = ('데스크탑', 'pc', '컴퓨터', '미니pc')
+DESKTOP_SPEC_TERMS = ('데스크탑', '미니pc')
+DESKTOP_EXCLUDE_SPEC_TERMS = ('노트북', '랩탑', 'laptop', '인치.*kg')
+
+# 역색인에 포함할 추가 키워드 (타입 판별 외 조회용)
+EXTRA_INDEX_TERMS = ('rtx', 'gtx', 'radeon', '외장그래픽', '내장그래픽')
+
+# 사용자가 고르는 제품 타입 -> 역색인 타입
+PRODUCT_TYPE_ALIASES = {'노트북': 'laptop', 'PC': 'desktop', '데스크탑': 'desktop'}
+
+# 외장 그래픽으로 간주하는 GPU 타입
+DISCRETE_GPU_TYPES = ('rtx', 'gtx', 'radeon', 'external')
+
+# 카탈로그 로드 시 생성되는 스펙 피처 컬럼
+FEATURE_COLUMNS = [
+    'cpu_brand', 'cpu_generation', 'cpu_model', 'cpu_score',
+    'gpu_type', 'gpu_model', 'gpu_score',
+    'ram_gb', 'storage_gb', 'display_inch', 'weight_kg', 'price_int',
+    'is_laptop', 'is_desktop', 'has_discrete_gpu',
+    'integrated_only', 'gpu_keyword',
+    'spec_has_rtx', 'spec_has_gtx', 'spec_has_external', 'spec_has_intel', 'spec_has_amd',
+]
+
+
+def read_products_csv(path: str) -> pd.DataFrame:
+    """CSV 파일을 읽어 앱에서 사용하는 컬럼명으로 정리"""
+    df = pd.read_csv(path, encoding='utf-8-sig')
+    column_mapping = {src: dst for src, dst in COLUMN_MAPPING.items() if src in df.columns}
+    if column_mapping:
+        df = df.rename(columns=column_mapping)
+    return df
+
+
+def parse_price(value) -> Optional[int]:
+    """가격 값을 정수로 변환 (예: '1,234,000' -> 1234000, 실패 시 None)"""
+    try:
+        return int(float(str(value).replace(',', '')))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    """숫자 문자열/정수를 int로 변환 (숫자가 아니면 None)"""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+class ProductIndex:
+    """상품명/상세스펙 키워드 역색인 (키워드 -> 해당 키워드가 있는 행 위치의 정렬된 배열)과 가격 정렬 색인
+
+    카탈로그 로드 시 한 번 만들고, 제품 타입 필터는 포스팅 리스트의 합집합/차집합으로,
+    가격 범위는 정렬된 가격 배열의 이진 탐색으로 계산합니다.
+    """
+
+    def __init__(self, names: pd.Series, specs: pd.Series, prices: Optional[pd.Series] = None):
+        self.size = len(names)
+        fields = {'name': names.astype(str).str.lower(), 'spec': specs.astype(str).str.lower()}
+        name_terms = set(LAPTOP_NAME_TERMS + DESKTOP_NAME_TERMS + EXTRA_INDEX_TERMS)
+        spec_terms = set(LAPTOP_SPEC_TERMS + DESKTOP_SPEC_TERMS + DESKTOP_EXCLUDE_SPEC_TERMS + EXTRA_INDEX_TERMS)
+        self._postings: Dict[tuple, np.ndarray] = {}
+        for field, terms in (('name', name_terms), ('spec', spec_terms)):
+            for term in terms:
+                matches = fields[field].str.contains(term, regex='*' in term, na=False)
+                self._postings[(field, term)] = np.flatnonzero(matches.to_numpy(dtype=bool))
+
+        # 제품 타입별 행 위치 (상품명과 스펙 모두 확인)
+        name_laptop = self.union('name', LAPTOP_NAME_TERMS)
+        name_desktop = self.union('name', DESKTOP_NAME_TERMS)
+        spec_desktop = self.union('spec', DESKTOP_SPEC_TERMS)
+        self._type_positions = {
+            'laptop': np.setdiff1d(
+                np.union1d(name_laptop, self.union('spec', LAPTOP_SPEC_TERMS)),
+                np.union1d(name_desktop, spec_desktop),
+                assume_unique=True,
+            ),
+            'desktop': np.setdiff1d(
+                np.union1d(name_desktop, spec_desktop),
+                np.union1d(name_laptop, self.union('spec', DESKTOP_EXCLUDE_SPEC_TERMS)),
+                assume_unique=True,
+            ),
+        }
+
+        # 가격 정렬 색인 (가격을 알 수 없는 상품은 따로 보관)
+        if prices is None:
+            prices = pd.Series([None] * self.size)
+        price_values = np.array([parse_price(price) for price in prices], dtype='float64')
+        known = ~np.isnan(price_values)
+        known_positions = np.flatnonzero(known)
+        self._price_order = known_positions[np.argsort(price_values[known_positions], kind='stable')]
+        self._sorted_prices = price_values[self._price_order]
+        self._unknown_price_positions = np.flatnonzero(~known)
+
+    def postings(self, field: str, term: str) -> np.ndarray:
+        """키워드가 들어 있는 행 위치 (색인에 없는 키워드면 KeyError)"""
+        return self._postings[(field, term.lower())]
+
+    def union(self, field: str, terms: Iterable[str]) -> np.ndarray:
+        """키워드 중 하나라도 들어 있는 행 위치"""
+        positions = np.empty(0, dtype=np.int64)
+        for term in terms:
+            positions = np.union1d(positions, self.postings(field, term))
+        return positions
+
+    def type_positions(self, product_type: Optional[str]) -> np.ndarray:
+        """제품 타입에 해당하는 행 위치 (타입 제한이 없으면 전체 행)"""
+        index_type = PRODUCT_TYPE_ALIASES.get(product_type, product_type)
+        positions = self._type_positions.get(index_type)
+        return positions if positions is not None else np.arange(self.size)
+
+    def price_range_positions(self, min_price: float, max_price: float, include_unknown: bool = True,
+                              within: Optional[np.ndarray] = None) -> np.ndarray:
+        """가격이 min_price 이상 max_price 이하인 행 위치 (정렬된 가격 배열에서 이진 탐색)
+
+        include_unknown이면 가격을 알 수 없는 상품도 포함하고, within이 주어지면 그 행 위치들로 제한합니다.
+        """
+        start = np.searchsorted(self._sorted_prices, min_price, side='left')
+        end = np.searchsorted(self._sorted_prices, max_price, side='right')
+        positions = np.sort(self._price_order[start:end])
+        if include_unknown:
+            positions = np.union1d(positions, self._unknown_price_positions)
+        if within is not None:
+            positions = np.intersect1d(positions, within, assume_unique=True)
+        return positions
+
+    def type_mask(self, product_type: str) -> np.ndarray:
+        """제품 타입에 해당하는 행의 불리언 마스크"""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.type_positions(product_type)] = True
+        return mask
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'ProductIndex':
+        """상품 DataFrame(상품명, 상세스펙 컬럼)에서 역색인 생성"""
+        empty = pd.Series([''] * len(df), index=df.index)
+        names = df['상품명'] if '상품명' in df.columns else empty
+        spec_col = df.get('상세스펙', df.get('스펙', empty))
+        price_col = df.get('최저가', df.get('가격', empty))
+        return cls(names, spec_col.where(spec_col.notna(), ''), price_col)
+
+
+def build_spec_features(df: pd.DataFrame, index: Optional[ProductIndex] = None) -> pd.DataFrame:
+    """상품별 상세스펙을 한 번만 파싱(parse_spec)하여 매칭에 쓰는 타입이 지정된 컬럼을 생성"""
+    empty = pd.Series([''] * len(df), index=df.index)
+    names = df['상품명'] if '상품명' in df.columns else empty
+    spec_col = df.get('상세스펙', df.get('스펙', empty))
+    price_col = df.get('최저가', df.get('가격', empty))
+    detail_col = df.get('상세페이지스펙', empty)
+
+    records = []
+    for name, spec, price, detail_spec in zip(names, spec_col, price_col, detail_col):
+        spec = parse_spec(resolve_spec_text(spec, name, detail_spec))
+        cpu = spec.cpu or {}
+        gpu = spec.gpu or {}
+        gpu_type = gpu.get('type')
+        keywords = spec.keywords
+        has_external = '외장그래픽' in keywords
+        records.append({
+            'cpu_brand': cpu.get('brand'),
+            'cpu_generation': cpu.get('generation'),
+            'cpu_model': _to_int(cpu.get('model')),
+            'cpu_score': cpu.get('score', 0),
+            'gpu_type': gpu_type,
+            'gpu_model': gpu.get('model'),
+            'gpu_score': gpu.get('score', 0),
+            'ram_gb': spec.ram_gb,
+            'storage_gb': spec.storage_gb,
+            'display_inch': spec.display_inch,
+            'weight_kg': spec.weight_kg,
+            'price_int': parse_price(price),
+            'has_discrete_gpu': gpu_type in DISCRETE_GPU_TYPES,
+            # 내장 그래픽만 있는 제품 (게임용/작업용에서 제외 대상)
+            'integrated_only': '내장그래픽' in keywords and not has_external,
+            # 외장 그래픽 관련 키워드가 하나라도 있는지
+            'gpu_keyword': has_external or any(kw in keywords for kw in ('rtx', 'gtx', 'radeon', 'rx')),
+            'spec_has_rtx': 'rtx' in keywords,
+            'spec_has_gtx': 'gtx' in keywords,
+            'spec_has_external': has_external,
+            'spec_has_intel': 'intel' in keywords,
+            'spec_has_amd': 'amd' in keywords,
+        })
+
+    features = pd.DataFrame.from_records(records, index=df.index, columns=[
+        col for col in FEATURE_COLUMNS if col not in ('is_laptop', 'is_desktop')
+    ])
+    for col in ('cpu_generation', 'cpu_model', 'cpu_score', 'gpu_model', 'gpu_score', 'ram_gb', 'storage_gb', 'price_int'):
+        features[col] = features[col].astype('Int64')
+    for col in ('display_inch', 'weight_kg'):
+        features[col] = features[col].astype('float64')
+
+    # 제품 타입 (상품명과 스펙 키워드 역색인으로 판별)
+    if index is None:
+        index = ProductIndex.from_frame(df)
+    features['is_laptop'] = index.type_mask('노트북')
+    features['is_desktop'] = index.type_mask('데스크탑')
+    return features[FEATURE_COLUMNS]
+
+
+def add_spec_features(df: pd.DataFrame, index: Optional[ProductIndex] = None) -> pd.DataFrame:
+    """상품 DataFrame에 스펙 피처 컬럼을 붙인 새 DataFrame 반환"""
+    base = df.drop(columns=[col for col in FEATURE_COLUMNS if col in df.columns])
+    return pd.concat([base, build_spec_features(base, index)], axis=1)
+
+
+def has_spec_features(df: pd.DataFrame) -> bool:
+    """DataFrame에 스펙 피처 컬럼이 모두 있는지 확인"""
+    return all(col in df.columns for col in FEATURE_COLUMNS)
+
+
+class ProductCatalog:
+    """프로세스 전체에서 공유하는 읽기 전용 상품 카탈로그
+
+    모든 Streamlit 세션이 같은 객체를 참조하므로 df를 직접 수정하면 안 됩니다.
+    df에는 원본 컬럼과 함께 로드 시 한 번 계산한 스펙 피처 컬럼(FEATURE_COLUMNS)이 들어 있고,
+    index는 df의 행 위치 기준 키워드 역색인입니다.
+    """
+
+    def __init__(self, df: pd.DataFrame, path: Optional[str] = None, mtime_ns: Optional[int] = None):
+        df = df.reset_index(drop=True)
+        self.index = ProductIndex.from_frame(df)
+        if not has_spec_features(df):
+            df = add_spec_features(df, self.index)
+        self.df = df
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.loaded_at = time.time()
+
+    @property
+    def version(self):
+        """카탈로그 버전 (파일 경로와 수정 시각) - 캐시 무효화 키로 사용"""
+        return (self.path, self.mtime_ns)
+
+    def __len__(self):
+        return len(self.df)
+
+
+# 파일 경로별 공유 카탈로그 (모듈은 프로세스당 한 번만 import되므로 세션 간 공유됨)
+_catalogs: Dict[str, ProductCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(path: str = DEFAULT_CATALOG_PATH, force_reload: bool = False) -> Optional[ProductCatalog]:
+    """공유 카탈로그 반환 (파일 mtime이 바뀌었으면 다시 로드하여 원자적으로 교체)"""
+    abs_path = os.path.abspath(path)
+    try:
+        mtime_ns = os.stat(abs_path).st_mtime_ns
+    except OSError:
+        return None
+
+    # 빠른 경로: 잠금 없이 현재 카탈로그 확인
+    catalog = _catalogs.get(abs_path)
+    if catalog is not None and catalog.mtime_ns == mtime_ns and not force_reload:
+        return catalog
+
+    with _catalogs_lock:
+        # 다른 스레드가 이미 다시 로드했을 수 있으므로 재확인
+        catalog = _catalogs.get(abs_path)
+        if catalog is not None and catalog.mtime_ns == mtime_ns and not force_reload:
+            return catalog
+
+        try:
+            df = read_products_csv(abs_path)
+        except Exception:
+            # 파일이 쓰는 중이거나 손상된 경우 이전 카탈로그를 계속 사용
+            return catalog
+
+        # 읽기 전에 확인한 mtime을 기록하므로, 읽는 도중 파일이 바뀌면 다음 호출에서 다시 로드됨
+        new_catalog = ProductCatalog(df, abs_path, mtime_ns)
+        _catalogs[abs_path] = new_catalog
+        return new_catalog
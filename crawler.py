@@ -1,6 +1,9 @@
+import os
 import time
 import random
-import csv
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -9,6 +12,71 @@ from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 import re
+from danawa_common import (
+    LINK_SELECTOR,
+    NAME_SELECTOR,
+    PRICE_FALLBACK_SELECTOR,
+    PRICE_SELECTOR,
+    PRODUCT_ITEM_SELECTORS,
+    RATING_SELECTORS,
+    REVIEW_SELECTORS,
+    SEARCH_URL,
+    SPEC_BOX_SELECTORS,
+    SPEC_ITEM_SELECTOR,
+    USER_AGENT,
+    dedupe_products,
+    is_spec_box_text,
+    parse_rating,
+    product_from_fields,
+    product_key,
+    save_products_csv,
+    specs_from_item_text,
+    specs_from_spec_items,
+)
+from incremental import refresh_catalog
+
+# 동시에 실행할 브라우저 워커 수 (워커마다 Chrome을 하나씩 띄움, 기본 1은 기존처럼 순차 크롤링)
+# 2 이상으로 늘리면 다나와 요청 빈도와 메모리 사용량이 워커 수만큼 늘어남
+CRAWLER_WORKERS = int(os.getenv('CRAWLER_WORKERS', '1'))
+# 상품 정보 추출 방식 ('bulk': 결과 페이지당 스크립트 한 번으로 일괄 추출, 'element': 상품 요소별 WebDriver 호출)
+CRAWLER_EXTRACT_MODE = os.getenv('CRAWLER_EXTRACT_MODE', 'bulk')
+# 증분 갱신 ('1'이면 기존 CSV를 덮어쓰지 않고 pcode 기준으로 반영, 새 상품/바뀐 상품만 상세 페이지 방문)
+CRAWLER_INCREMENTAL = os.getenv('CRAWLER_INCREMENTAL', '') == '1'
+
+# 결과 페이지의 모든 상품 필드를 한 번에 수집하는 스크립트 (요소를 찾지 못한 필드는 null)
+BULK_EXTRACT_SCRIPT = """
+    const itemSelectors = arguments[0];
+    const selectors = arguments[1];
+    const text = (el) => el ? (el.innerText || '').trim() : null;
+    const first = (item, selector) => {
+        try { return item.querySelector(selector); } catch (e) { return null; }
+    };
+    const all = (item, selector) => {
+        try { return Array.from(item.querySelectorAll(selector)); } catch (e) { return []; }
+    };
+    
+    let items = [];
+    for (const selector of itemSelectors) {
+        items = Array.from(document.querySelectorAll(selector));
+        if (items.length) break;
+    }
+    
+    return items.map((item) => {
+        const nameElem = first(item, selectors.name) || first(item, 'a');
+        const linkElem = first(item, selectors.link);
+        return {
+            name: text(nameElem),
+            url: linkElem ? (linkElem.href || linkElem.getAttribute('href') || '') : '',
+            price: text(first(item, selectors.price)),
+            prices: all(item, selectors.priceFallback).map(text),
+            ratings: selectors.ratings.map((selector) => text(first(item, selector))),
+            reviews: selectors.reviews.map((selector) => text(first(item, selector))),
+            specBoxes: selectors.specBoxes.map((selector) => text(first(item, selector))),
+            itemText: item.innerText || '',
+            specItems: all(item, selectors.specItems).map(text),
+        };
+    });
+"""
 
 
 class DanawaCrawler:
@@ -16,14 +84,14 @@ class DanawaCrawler:
         """다나와 크롤러 초기화"""
         self.driver = None
         self.setup_driver()
-        self.base_url = "https://search.danawa.com/dsearch.php?query="
+        self.base_url = SEARCH_URL
         
     def setup_driver(self):
         """Chrome 드라이버 설정 (stealth 모드 적용)"""
         chrome_options = Options()
         
         # User-Agent 설정 (최신 Chrome User-Agent)
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36')
+        chrome_options.add_argument(f'user-agent={USER_AGENT}')
         
         # Stealth 모드 설정 (강화)
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
@@ -125,8 +193,8 @@ class DanawaCrawler:
         wait_time = random.uniform(5, 10)
         time.sleep(wait_time)
         
-    def search_products(self, keyword, max_items=70):
-        """키워드로 상품 검색 및 데이터 수집"""
+    def search_products(self, keyword, max_items=70, seen_keys=None):
+        """키워드로 상품 검색 및 데이터 수집 (seen_keys: 다른 키워드에서 이미 수집한 상품 키, 함께 갱신)"""
         print(f"\n[{keyword}] 검색 시작...")
         
         # URL 인코딩 (한글 키워드 처리)
@@ -194,6 +262,7 @@ class DanawaCrawler:
             return []
         
         products_data = []
+        seen_keys = set() if seen_keys is None else seen_keys
         page = 1
         
         # 페이지 로딩 대기 (다나와 페이지 구조)
@@ -245,10 +314,15 @@ class DanawaCrawler:
                 
                 self.wait_random()
                 
-                # 상품 리스트 가져오기 (다나와 선택자)
-                product_items = self.driver.find_elements(By.CSS_SELECTOR, ".main_prodlist > li, .product_list > .product_item, .prod_list li")
-                if not product_items:
-                    product_items = self.driver.find_elements(By.CSS_SELECTOR, "li.prod_item, .product_item, .item")
+                # 상품 리스트 가져오기 (일괄 추출 모드는 한 번의 스크립트 실행으로 모든 상품 필드를 가져옴)
+                page_fields = self.extract_products_bulk() if CRAWLER_EXTRACT_MODE == 'bulk' else None
+                if page_fields is not None:
+                    product_items = page_fields
+                else:
+                    # 상품 요소별로 WebDriver 호출 (다나와 선택자)
+                    product_items = self.driver.find_elements(By.CSS_SELECTOR, PRODUCT_ITEM_SELECTORS[0])
+                    if not product_items:
+                        product_items = self.driver.find_elements(By.CSS_SELECTOR, PRODUCT_ITEM_SELECTORS[1])
                 
                 for idx, item in enumerate(product_items):
                     if len(products_data) >= max_items:
@@ -256,9 +330,14 @@ class DanawaCrawler:
                         
                     try:
                         # 검색 결과 페이지에서 직접 스펙 추출 (상세 페이지 방문 불필요)
-                        visit_detail = False
-                        product_data = self.extract_product_info(item, visit_detail=visit_detail)
-                        if product_data and product_data not in products_data:
+                        if page_fields is not None:
+                            product_data = product_from_fields(item)
+                        else:
+                            visit_detail = False
+                            product_data = self.extract_product_info(item, visit_detail=visit_detail)
+                        # pcode(없으면 상품명) 기준 중복 제외 (가격 표기만 다른 같은 상품 포함)
+                        if product_data and product_key(product_data) not in seen_keys:
+                            seen_keys.add(product_key(product_data))
                             products_data.append(product_data)
                             print(f"    [{len(products_data)}] {product_data['상품명'][:30]}...")
                             
@@ -362,13 +441,37 @@ class DanawaCrawler:
         print(f"[{keyword}] 검색 완료: {len(products_data)}개 수집")
         return products_data
     
+    def extract_products_bulk(self):
+        """현재 결과 페이지의 모든 상품 필드를 한 번의 execute_script로 가져옴 (실패 시 None - 요소별 추출로 대체)"""
+        try:
+            page_fields = self.driver.execute_script(
+                BULK_EXTRACT_SCRIPT,
+                PRODUCT_ITEM_SELECTORS,
+                {
+                    'name': NAME_SELECTOR,
+                    'link': LINK_SELECTOR,
+                    'price': PRICE_SELECTOR,
+                    'priceFallback': PRICE_FALLBACK_SELECTOR,
+                    'ratings': RATING_SELECTORS,
+                    'reviews': REVIEW_SELECTORS,
+                    'specBoxes': SPEC_BOX_SELECTORS,
+                    'specItems': SPEC_ITEM_SELECTOR,
+                }
+            )
+        except Exception as e:
+            print(f"  일괄 추출 실패, 요소별 추출로 진행: {e}")
+            return None
+        if not isinstance(page_fields, list):
+            return None
+        return page_fields
+    
     def extract_product_info(self, item, visit_detail=False):
         """개별 상품 정보 추출 (다나와 구조)"""
         try:
             # 상품명 (다나와 선택자)
             product_name = ""
             try:
-                name_elem = item.find_element(By.CSS_SELECTOR, ".prod_name, .link_prod, .name, a.prod_name")
+                name_elem = item.find_element(By.CSS_SELECTOR, NAME_SELECTOR)
                 product_name = name_elem.text.strip()
             except:
                 try:
@@ -383,7 +486,7 @@ class DanawaCrawler:
             # 상품 URL (다나와)
             product_url = ""
             try:
-                link_elem = item.find_element(By.CSS_SELECTOR, "a.prod_name, .link_prod, a")
+                link_elem = item.find_element(By.CSS_SELECTOR, LINK_SELECTOR)
                 product_url = link_elem.get_attribute("href")
                 if product_url and not product_url.startswith("http"):
                     product_url = "https://www.danawa.com" + product_url
@@ -394,14 +497,14 @@ class DanawaCrawler:
             price = ""
             try:
                 # 다나와는 여러 쇼핑몰 가격을 보여주므로 최저가 추출
-                price_elem = item.find_element(By.CSS_SELECTOR, ".price_sect, .low_price, .price, .prod_price")
+                price_elem = item.find_element(By.CSS_SELECTOR, PRICE_SELECTOR)
                 price_text = price_elem.text.strip()
                 # 숫자만 추출
                 price = re.sub(r'[^\d]', '', price_text)
             except:
                 # 여러 가격이 있는 경우
                 try:
-                    price_elems = item.find_elements(By.CSS_SELECTOR, ".price, .low_price")
+                    price_elems = item.find_elements(By.CSS_SELECTOR, PRICE_FALLBACK_SELECTOR)
                     if price_elems:
                         prices = []
                         for p in price_elems:
@@ -418,20 +521,11 @@ class DanawaCrawler:
             rating = ""
             try:
                 # 여러 선택자 시도
-                rating_selectors = [
-                    ".rating, .star, .score",
-                    ".review_rating, .prod_rating",
-                    "[class*='rating']",
-                    "[class*='star']",
-                    ".grade, .point"
-                ]
-                for selector in rating_selectors:
+                for selector in RATING_SELECTORS:
                     try:
                         rating_elem = item.find_element(By.CSS_SELECTOR, selector)
-                        rating_text = rating_elem.text.strip()
-                        rating_match = re.search(r'[\d.]+', rating_text)
-                        if rating_match:
-                            rating = rating_match.group()
+                        rating = parse_rating(rating_elem.text)
+                        if rating:
                             break
                     except:
                         continue
@@ -442,17 +536,10 @@ class DanawaCrawler:
             review_count = ""
             try:
                 # 여러 선택자 시도
-                review_selectors = [
-                    ".review, .review_count, .comment_count",
-                    "[class*='review']",
-                    "[class*='comment']",
-                    ".review_num, .prod_review"
-                ]
-                for selector in review_selectors:
+                for selector in REVIEW_SELECTORS:
                     try:
                         review_elem = item.find_element(By.CSS_SELECTOR, selector)
-                        review_text = review_elem.text.strip()
-                        review_count = re.sub(r'[^\d]', '', review_text)
+                        review_count = re.sub(r'[^\d]', '', review_elem.text.strip())
                         if review_count:
                             break
                     except:
@@ -465,26 +552,12 @@ class DanawaCrawler:
             try:
                 # 다나와 검색 결과 페이지의 스펙 정보 찾기
                 # 실제 구조: .spec-box 또는 .spec-box.spec-box--full
-                spec_selectors = [
-                    ".spec-box.spec-box--full",  # 전체 스펙이 보이는 경우
-                    ".spec-box",  # 기본 스펙 박스
-                    ".spec_list"  # 스펙 리스트
-                ]
-                
-                for selector in spec_selectors:
+                for selector in SPEC_BOX_SELECTORS:
                     try:
                         spec_elem = item.find_element(By.CSS_SELECTOR, selector)
                         spec_text = spec_elem.text.strip()
                         # 의미있는 스펙 정보인지 확인
-                        if (spec_text and len(spec_text) > 10 and 
-                            '원' not in spec_text and
-                            '배송' not in spec_text and
-                            '할인' not in spec_text and
-                            '쿠팡' not in spec_text and
-                            '닫기' not in spec_text and
-                            ('/' in spec_text or '인치' in spec_text or 'kg' in spec_text or 'GB' in spec_text or 
-                             'cm' in spec_text or 'Hz' in spec_text or '해상도' in spec_text or '밝기' in spec_text or
-                             'CPU' in spec_text or '램' in spec_text or '그래픽' in spec_text)):
+                        if is_spec_box_text(spec_text):
                             specs = spec_text
                             break
                     except:
@@ -494,52 +567,16 @@ class DanawaCrawler:
                 if not specs:
                     try:
                         # 전체 아이템의 텍스트에서 스펙 정보 추출
-                        item_text = item.text
-                        # 스펙 패턴 찾기 (예: "노트북 / 39.6cm(15.6인치) / 1.75kg" 같은 형식)
-                        lines = item_text.split('\n')
-                        spec_parts = []
-                        for line in lines:
-                            line = line.strip()
-                            # 스펙으로 보이는 라인 찾기
-                            if (line and len(line) > 5 and
-                                '원' not in line and
-                                '배송' not in line and
-                                '할인' not in line and
-                                '쿠팡' not in line and
-                                ('/' in line or '인치' in line or 'kg' in line or 'GB' in line or 'cm' in line or 
-                                 'Hz' in line or '해상도' in line or '밝기' in line or 'CPU' in line or '램' in line or
-                                 '그래픽' in line or '배터리' in line or '용도' in line)):
-                                spec_parts.append(line)
-                        
-                        if spec_parts:
-                            # 중복 제거 및 정리
-                            unique_specs = []
-                            seen = set()
-                            for spec in spec_parts:
-                                if spec not in seen and len(spec) > 5:
-                                    seen.add(spec)
-                                    unique_specs.append(spec)
-                            if unique_specs:
-                                specs = " / ".join(unique_specs[:30])  # 최대 30개까지만
+                        specs = specs_from_item_text(item.text)
                     except:
                         pass
                 
                 # 여전히 스펙을 찾지 못한 경우 리스트 항목들 찾기
                 if not specs:
                     try:
-                        spec_items = item.find_elements(By.CSS_SELECTOR, 
-                            ".spec_list li, .spec_info li, .prod_spec li, dl.spec_list dt, dl.spec_list dd, .summary_info li")
+                        spec_items = item.find_elements(By.CSS_SELECTOR, SPEC_ITEM_SELECTOR)
                         if spec_items:
-                            spec_parts = []
-                            for spec_item in spec_items:
-                                spec_text = spec_item.text.strip()
-                                if (spec_text and len(spec_text) > 3 and 
-                                    '원' not in spec_text and
-                                    '배송' not in spec_text and
-                                    '할인' not in spec_text):
-                                    spec_parts.append(spec_text)
-                            if spec_parts:
-                                specs = " / ".join(spec_parts[:20])
+                            specs = specs_from_spec_items([spec_item.text for spec_item in spec_items])
                     except:
                         pass
                         
@@ -682,31 +719,32 @@ class DanawaCrawler:
         
         return ""
     
+    def fetch_detail_specs(self, products):
+        """상품별 상세 페이지 스펙 수집 (상품 키 -> 스펙, 실패한 상품은 제외)"""
+        detail_specs = {}
+        for i, product in enumerate(products, 1):
+            specs = self.extract_specs_from_detail_page(product['상품 상세 URL'])
+            if specs:
+                detail_specs[product_key(product)] = specs
+            print(f"  상세 스펙 [{i}/{len(products)}] {product['상품명'][:30]}... {'완료' if specs else '실패'}")
+        return detail_specs
+    
     def crawl(self, keywords, items_per_keyword=70):
-        """메인 크롤링 함수"""
+        """메인 크롤링 함수 (키워드 사이에 중복되는 상품은 먼저 검색한 키워드에만 포함)"""
         all_products = []
+        seen_keys = set()
         
         for keyword in keywords:
-            products = self.search_products(keyword, items_per_keyword)
+            products = self.search_products(keyword, items_per_keyword, seen_keys)
             all_products.extend(products)
             self.wait_random()
         
         return all_products
     
-    def save_to_csv(self, products, filename='electronics_data.csv'):
+    @staticmethod
+    def save_to_csv(products, filename='electronics_data.csv'):
         """수집된 데이터를 CSV 파일로 저장"""
-        if not products:
-            print("저장할 데이터가 없습니다.")
-            return
-        
-        fieldnames = ['상품명', '가격', '별점', '리뷰 수', '스펙', '상품 상세 URL']
-        
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(products)
-        
-        print(f"\n데이터 저장 완료: {filename} ({len(products)}개 항목)")
+        save_products_csv(products, filename)
     
     def close(self):
         """드라이버 종료"""
@@ -715,14 +753,129 @@ class DanawaCrawler:
             print("브라우저 종료 완료")
 
 
+class CrawlScheduler:
+    """여러 브라우저 워커로 키워드를 나누어 동시에 크롤링 (워커마다 별도 Chrome 드라이버, 워커별 대기 시간 유지)"""
+    
+    def __init__(self, workers=CRAWLER_WORKERS, crawler_factory=DanawaCrawler):
+        self.workers = max(1, workers)
+        self.crawler_factory = crawler_factory
+        self.crawlers = []
+        self._lock = threading.Lock()
+    
+    def _run_worker(self, worker_id, keyword_queue, items_per_keyword, results):
+        """키워드 큐가 빌 때까지 하나씩 꺼내 검색 (워커 전용 드라이버 사용)"""
+        # 워커들이 동시에 첫 요청을 보내지 않도록 시작 시각을 분산
+        time.sleep(worker_id * random.uniform(3, 6))
+        
+        try:
+            crawler = self.crawler_factory()
+        except Exception as e:
+            print(f"[워커 {worker_id}] 브라우저 시작 실패: {e}")
+            return
+        with self._lock:
+            self.crawlers.append(crawler)
+        
+        try:
+            while True:
+                try:
+                    keyword = keyword_queue.get_nowait()
+                except queue.Empty:
+                    break
+                print(f"[워커 {worker_id}] '{keyword}' 담당")
+                try:
+                    results[keyword] = crawler.search_products(keyword, items_per_keyword)
+                except Exception as e:
+                    print(f"[워커 {worker_id}] '{keyword}' 크롤링 실패: {e}")
+                    results[keyword] = []
+                # 같은 워커의 다음 키워드 전 대기 (봇 감지 우회)
+                if not keyword_queue.empty():
+                    crawler.wait_random()
+        finally:
+            crawler.close()
+            with self._lock:
+                self.crawlers.remove(crawler)
+    
+    def crawl(self, keywords, items_per_keyword=70):
+        """키워드를 워커에 나누어 크롤링 후 키워드 순서대로 결과 병합 (키워드 사이 중복 상품은 앞 키워드에만 포함)
+        
+        다나와 검색 결과의 다음 페이지는 같은 브라우저 세션에서 버튼을 눌러 이동하므로
+        한 키워드의 페이지들은 한 워커가 이어서 처리합니다.
+        워커들은 서로 수집한 상품을 모르므로, 앞 키워드와 겹쳐 빠진 만큼은 병합 후 다시 검색하여 채웁니다
+        (순차 크롤링(DanawaCrawler.crawl)과 같은 개수).
+        """
+        keyword_queue = queue.Queue()
+        for keyword in keywords:
+            keyword_queue.put(keyword)
+        
+        results = {}
+        worker_count = min(self.workers, len(keywords))
+        print(f"브라우저 워커 {worker_count}개로 크롤링 시작")
+        with ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix='crawler') as executor:
+            for worker_id in range(worker_count):
+                executor.submit(self._run_worker, worker_id, keyword_queue, items_per_keyword, results)
+        
+        all_products = []
+        seen_keys = set()
+        topup_crawler = None
+        try:
+            for keyword in keywords:
+                products = results.get(keyword, [])
+                unique_products = dedupe_products(products, seen_keys)
+                # 목표 개수를 채웠던 키워드만 보충 (결과가 원래 부족했던 키워드는 더 찾을 상품이 없음)
+                shortage = items_per_keyword - len(unique_products) if len(products) >= items_per_keyword else 0
+                if shortage > 0:
+                    topup_crawler = topup_crawler or self._start_topup_crawler()
+                    if topup_crawler is not None:
+                        print(f"'{keyword}' 앞 키워드와 겹친 {shortage}개 보충 검색")
+                        try:
+                            unique_products.extend(topup_crawler.search_products(keyword, shortage, seen_keys))
+                        except Exception as e:
+                            print(f"'{keyword}' 보충 검색 실패: {e}")
+                all_products.extend(unique_products)
+        finally:
+            if topup_crawler is not None:
+                topup_crawler.close()
+                with self._lock:
+                    self.crawlers.remove(topup_crawler)
+        return all_products
+    
+    def _start_topup_crawler(self):
+        """보충 검색용 드라이버 시작 (워커 드라이버는 이미 종료됨, 실패하면 None)"""
+        try:
+            crawler = self.crawler_factory()
+        except Exception as e:
+            print(f"보충 검색용 브라우저 시작 실패: {e}")
+            return None
+        with self._lock:
+            self.crawlers.append(crawler)
+        return crawler
+    
+    def close(self):
+        """실행 중인 모든 워커의 드라이버 종료 (중단 시 호출)"""
+        with self._lock:
+            crawlers = list(self.crawlers)
+        for crawler in crawlers:
+            try:
+                crawler.close()
+            except Exception:
+                pass
+
+
+def fetch_detail_specs(products, crawler=None):
+    """상세 페이지 스펙 수집 (브라우저 크롤러가 없으면 새로 띄웠다가 종료)"""
+    detail_crawler = crawler or DanawaCrawler()
+    try:
+        return detail_crawler.fetch_detail_specs(products)
+    finally:
+        if detail_crawler is not crawler:
+            detail_crawler.close()
+
+
 def main():
     """메인 실행 함수"""
     crawler = None
     
     try:
-        # 크롤러 초기화
-        crawler = DanawaCrawler()
-        
         # 수집할 키워드 및 개수
         keywords = ['노트북', '데스크탑']
         items_per_keyword = 100
@@ -733,14 +886,24 @@ def main():
         print(f"키워드: {keywords}")
         print(f"키워드당 수집 개수: {items_per_keyword}개")
         print(f"예상 총 수집 개수: {len(keywords) * items_per_keyword}개")
+        print(f"브라우저 워커 수: {CRAWLER_WORKERS}개")
+        print(f"증분 갱신: {'사용' if CRAWLER_INCREMENTAL else '사용 안 함'}")
         print("=" * 50)
         
-        # 크롤링 실행
+        # 크롤링 실행 (워커가 2개 이상이면 키워드를 나누어 동시에 크롤링)
+        if CRAWLER_WORKERS > 1:
+            crawler = CrawlScheduler(CRAWLER_WORKERS)
+        else:
+            crawler = DanawaCrawler()
         all_products = crawler.crawl(keywords, items_per_keyword)
         
-        # CSV 파일로 저장
-        if all_products:
-            crawler.save_to_csv(all_products)
+        # CSV 파일로 저장 (증분 갱신이면 기존 카탈로그에 반영)
+        if all_products and CRAWLER_INCREMENTAL:
+            detail_crawler = crawler if isinstance(crawler, DanawaCrawler) else None
+            refresh_catalog(all_products, lambda products: fetch_detail_specs(products, detail_crawler))
+            print(f"\n총 {len(all_products)}개의 상품 데이터를 수집했습니다.")
+        elif all_products:
+            DanawaCrawler.save_to_csv(all_products)
             print(f"\n총 {len(all_products)}개의 상품 데이터를 수집했습니다.")
         else:
             print("\n수집된 데이터가 없습니다.")
@@ -0,0 +1,208 @@
+import csv
+import os
+import re
+import urllib.parse
+
+# 크롤러 공통 설정 (브라우저 모드와 HTTP 모드가 같은 선택자/추출 규칙/저장 형식 사용)
+SEARCH_URL = "https://search.danawa.com/dsearch.php?query="
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36'
+
+# 저장 CSV 컬럼 (순서대로 기록)
+PRODUCT_FIELDNAMES = ['상품명', '가격', '별점', '리뷰 수', '스펙', '상품 상세 URL']
+
+# 다나와 검색 결과 선택자 (상품 목록은 앞의 선택자로 찾지 못하면 뒤의 선택자 사용)
+PRODUCT_ITEM_SELECTORS = [
+    ".main_prodlist > li, .product_list > .product_item, .prod_list li",
+    "li.prod_item, .product_item, .item"
+]
+NAME_SELECTOR = ".prod_name, .link_prod, .name, a.prod_name"
+LINK_SELECTOR = "a.prod_name, .link_prod, a"
+PRICE_SELECTOR = ".price_sect, .low_price, .price, .prod_price"
+PRICE_FALLBACK_SELECTOR = ".price, .low_price"
+RATING_SELECTORS = [
+    ".rating, .star, .score",
+    ".review_rating, .prod_rating",
+    "[class*='rating']",
+    "[class*='star']",
+    ".grade, .point"
+]
+REVIEW_SELECTORS = [
+    ".review, .review_count, .comment_count",
+    "[class*='review']",
+    "[class*='comment']",
+    ".review_num, .prod_review"
+]
+SPEC_BOX_SELECTORS = [
+    ".spec-box.spec-box--full",  # 전체 스펙이 보이는 경우
+    ".spec-box",  # 기본 스펙 박스
+    ".spec_list"  # 스펙 리스트
+]
+SPEC_ITEM_SELECTOR = ".spec_list li, .spec_info li, .prod_spec li, dl.spec_list dt, dl.spec_list dd, .summary_info li"
+
+
+def is_spec_box_text(spec_text):
+    """스펙 박스 텍스트가 의미있는 스펙 정보인지 확인 (가격/배송/할인 문구 제외)"""
+    return bool(
+        spec_text and len(spec_text) > 10 and
+        '원' not in spec_text and
+        '배송' not in spec_text and
+        '할인' not in spec_text and
+        '쿠팡' not in spec_text and
+        '닫기' not in spec_text and
+        ('/' in spec_text or '인치' in spec_text or 'kg' in spec_text or 'GB' in spec_text or
+         'cm' in spec_text or 'Hz' in spec_text or '해상도' in spec_text or '밝기' in spec_text or
+         'CPU' in spec_text or '램' in spec_text or '그래픽' in spec_text)
+    )
+
+
+def specs_from_item_text(item_text):
+    """상품 전체 텍스트에서 스펙으로 보이는 줄만 모아 결합 (예: "노트북 / 39.6cm(15.6인치) / 1.75kg")"""
+    spec_parts = []
+    for line in item_text.split('\n'):
+        line = line.strip()
+        # 스펙으로 보이는 라인 찾기
+        if (line and len(line) > 5 and
+            '원' not in line and
+            '배송' not in line and
+            '할인' not in line and
+            '쿠팡' not in line and
+            ('/' in line or '인치' in line or 'kg' in line or 'GB' in line or 'cm' in line or
+             'Hz' in line or '해상도' in line or '밝기' in line or 'CPU' in line or '램' in line or
+             '그래픽' in line or '배터리' in line or '용도' in line)):
+            spec_parts.append(line)
+    
+    # 중복 제거 및 정리
+    unique_specs = []
+    seen = set()
+    for spec in spec_parts:
+        if spec not in seen and len(spec) > 5:
+            seen.add(spec)
+            unique_specs.append(spec)
+    return " / ".join(unique_specs[:30])  # 최대 30개까지만
+
+
+def specs_from_spec_items(spec_texts):
+    """스펙 리스트 항목 텍스트 결합 (가격/배송/할인 문구 제외)"""
+    spec_parts = []
+    for spec_text in spec_texts:
+        spec_text = (spec_text or '').strip()
+        if (spec_text and len(spec_text) > 3 and
+            '원' not in spec_text and
+            '배송' not in spec_text and
+            '할인' not in spec_text):
+            spec_parts.append(spec_text)
+    return " / ".join(spec_parts[:20])
+
+
+def parse_rating(rating_text):
+    """별점 텍스트에서 숫자 추출 (없으면 빈 문자열)"""
+    rating_match = re.search(r'[\d.]+', (rating_text or '').strip())
+    return rating_match.group() if rating_match else ''
+
+
+def product_from_fields(fields):
+    """일괄 추출한 상품 필드로 상품 정보 생성 (extract_product_info와 같은 규칙, 필수 정보가 없으면 None)"""
+    product_name = (fields.get('name') or '').strip()
+    if not product_name:
+        return None
+    
+    product_url = fields.get('url') or ''
+    if product_url and not product_url.startswith("http"):
+        product_url = "https://www.danawa.com" + product_url
+    
+    # 가격 (최저가 영역이 없으면 여러 가격 중 최저가)
+    if fields.get('price') is not None:
+        price = re.sub(r'[^\d]', '', fields['price'])
+    else:
+        prices = [re.sub(r'[^\d]', '', price_text or '') for price_text in fields.get('prices') or []]
+        prices = [int(price_num) for price_num in prices if price_num]
+        price = str(min(prices)) if prices else ''
+    
+    # 별점/리뷰 수 (선택자 순서대로 처음 찾은 값)
+    rating = ''
+    for rating_text in fields.get('ratings') or []:
+        if rating_text is not None:
+            rating = parse_rating(rating_text)
+            if rating:
+                break
+    review_count = ''
+    for review_text in fields.get('reviews') or []:
+        if review_text is not None:
+            review_count = re.sub(r'[^\d]', '', review_text)
+            if review_count:
+                break
+    
+    # 스펙 (스펙 박스 → 전체 텍스트 → 스펙 리스트 항목 순서)
+    specs = next((spec_text for spec_text in fields.get('specBoxes') or [] if is_spec_box_text(spec_text)), '')
+    if not specs:
+        specs = specs_from_item_text(fields.get('itemText') or '')
+    if not specs and fields.get('specItems'):
+        specs = specs_from_spec_items(fields['specItems'])
+    
+    # 필수 정보가 없는 경우 제외
+    if not price:
+        return None
+    
+    return {
+        '상품명': product_name,
+        '가격': price,
+        '별점': rating,
+        '리뷰 수': review_count,
+        '스펙': specs,
+        '상품 상세 URL': product_url
+    }
+
+
+def product_code(product_url):
+    """다나와 상품 URL에서 상품 코드(pcode) 추출 (없으면 None)"""
+    if not product_url:
+        return None
+    codes = urllib.parse.parse_qs(urllib.parse.urlparse(product_url).query).get('pcode')
+    return codes[0] if codes and codes[0] else None
+
+
+def normalize_name(product_name):
+    """상품명 비교용 정규화 (대소문자/연속 공백 차이 무시)"""
+    return ' '.join((product_name or '').lower().split())
+
+
+def product_key(product):
+    """상품 식별 키 (pcode가 있으면 'pcode:코드', 없으면 'name:정규화한 상품명')"""
+    code = product_code(product.get('상품 상세 URL'))
+    if code:
+        return f"pcode:{code}"
+    return f"name:{normalize_name(product.get('상품명'))}"
+
+
+def dedupe_products(products, seen_keys=None):
+    """상품 키 기준 중복 제거 (처음 나온 상품 유지, seen_keys를 넘기면 이미 수집한 키도 제외하고 갱신)"""
+    seen_keys = set() if seen_keys is None else seen_keys
+    unique_products = []
+    for product in products:
+        key = product_key(product)
+        if key not in seen_keys:
+            seen_keys.add(key)
+            unique_products.append(product)
+    return unique_products
+
+
+def load_products_csv(filename='electronics_data.csv'):
+    """저장된 상품 CSV 읽기 (파일이 없으면 빈 목록)"""
+    if not os.path.exists(filename):
+        return []
+    with open(filename, newline='', encoding='utf-8-sig') as csvfile:
+        return [dict(row) for row in csv.DictReader(csvfile)]
+
+
+def save_products_csv(products, filename='electronics_data.csv', fieldnames=PRODUCT_FIELDNAMES):
+    """수집된 데이터를 CSV 파일로 저장 (행에 없는 컬럼은 빈 칸, fieldnames에 없는 값은 저장하지 않음)"""
+    if not products:
+        print("저장할 데이터가 없습니다.")
+        return
+    
+    with open(filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(products)
+    
+    print(f"\n데이터 저장 완료: {filename} ({len(products)}개 항목)")
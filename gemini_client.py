@@ -0,0 +1,207 @@
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import google.generativeai as genai
+
+from metrics import llm_calls, llm_errors
+
+# list_models() 결과 캐시 유지 시간 (초)
+AVAILABLE_MODELS_TTL_SECONDS = 600
+
+# list_models() 호출 실패 시 사용할 기본 모델 목록
+DEFAULT_MODELS = ['gemini-2.5-flash', 'gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-pro']
+
+# Gemini 호출 동시 실행 설정 (프로세스 전체에서 공유하는 스레드 풀 크기, 호출당 타임아웃)
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+GEMINI_CALL_TIMEOUT_SECONDS = float(os.getenv('GEMINI_CALL_TIMEOUT_SECONDS', '30'))
+
+# 프로세스 공유 모델 레지스트리 (모듈은 한 번만 import되므로 Streamlit 재실행/세션 간 유지됨)
+_registry_lock = threading.RLock()
+_configured_api_key: Optional[str] = None
+_models: Dict[Tuple[str, str], object] = {}  # (api_key, 모델 이름) -> GenerativeModel
+_resolved_model_names: Dict[Tuple[str, str], str] = {}  # (api_key, 선호 모델) -> 실제 사용 모델 이름
+_available_models: Dict[str, Tuple[float, List[str]]] = {}  # api_key -> (조회 시각, 모델 목록)
+
+
+def _configure(gemini_api_key: str) -> None:
+    """API 키가 바뀐 경우에만 genai.configure 호출"""
+    global _configured_api_key
+    if _configured_api_key != gemini_api_key:
+        genai.configure(api_key=gemini_api_key)
+        _configured_api_key = gemini_api_key
+
+
+def get_available_models(gemini_api_key: str) -> List[str]:
+    """사용 가능한 Gemini 모델 목록 가져오기 (API 키별로 TTL 동안 캐시)"""
+    cached = _available_models.get(gemini_api_key)
+    if cached and time.time() - cached[0] < AVAILABLE_MODELS_TTL_SECONDS:
+        return cached[1]
+
+    try:
+        with _registry_lock:
+            _configure(gemini_api_key)
+            models = genai.list_models()
+        available = []
+        for model in models:
+            if 'generateContent' in model.supported_generation_methods:
+                model_name = model.name.replace('models/', '')
+                available.append(model_name)
+        _available_models[gemini_api_key] = (time.time(), available)
+        return available
+    except Exception as e:
+        return list(DEFAULT_MODELS)
+
+
+def _create_model(gemini_api_key: str, model_name: str):
+    """모델 객체 생성 후 레지스트리에 저장 (이미 있으면 재사용)"""
+    key = (gemini_api_key, model_name)
+    model = _models.get(key)
+    if model is None:
+        model = genai.GenerativeModel(model_name)
+        _models[key] = model
+    return model
+
+
+def initialize_gemini_model(gemini_api_key: str, preferred_model: str = 'gemini-2.5-flash'):
+    """Gemini 모델 초기화 (여러 방법 시도, 한 번 찾은 모델은 프로세스 전체에서 재사용)"""
+    if not gemini_api_key:
+        return None, "API 키가 설정되지 않았습니다."
+
+    # 빠른 경로: 이미 확인된 모델이면 바로 반환
+    resolved_name = _resolved_model_names.get((gemini_api_key, preferred_model))
+    if resolved_name:
+        model = _models.get((gemini_api_key, resolved_name))
+        if model is not None:
+            return model, None
+
+    with _registry_lock:
+        _configure(gemini_api_key)
+
+        # 시도할 모델 이름 목록 (우선순위 순)
+        model_names_to_try = [
+            preferred_model,
+            f'models/{preferred_model}',
+            'gemini-2.5-flash',
+            'models/gemini-2.5-flash',
+            'gemini-1.5-flash',
+            'models/gemini-1.5-flash',
+            'gemini-1.5-pro',
+            'models/gemini-1.5-pro',
+            'gemini-pro',
+            'models/gemini-pro',
+        ]
+
+        # 중복 제거
+        model_names_to_try = list(dict.fromkeys(model_names_to_try))
+
+        last_error = None
+        for model_name in model_names_to_try:
+            try:
+                model = _create_model(gemini_api_key, model_name)
+                _resolved_model_names[(gemini_api_key, preferred_model)] = model_name
+                return model, None
+            except Exception as e:
+                last_error = e
+                continue
+
+        # 모든 모델 시도 실패 시, 사용 가능한 모델 목록 확인
+        try:
+            available_models = get_available_models(gemini_api_key)
+            if available_models:
+                # 사용 가능한 첫 번째 모델 시도
+                for available_model in available_models:
+                    try:
+                        model = _create_model(gemini_api_key, available_model)
+                        _resolved_model_names[(gemini_api_key, preferred_model)] = available_model
+                        return model, None
+                    except:
+                        continue
+        except:
+            pass
+
+    error_msg = f"모델을 초기화할 수 없습니다. 시도한 모델: {', '.join(model_names_to_try[:3])}... 마지막 오류: {str(last_error)}"
+    return None, error_msg
+
+
+# Gemini 호출용 공유 스레드 풀 (모든 세션의 동시 호출 수를 제한)
+_executor = ThreadPoolExecutor(max_workers=GEMINI_MAX_CONCURRENCY, thread_name_prefix='gemini')
+
+
+def is_quota_error(error: Exception) -> bool:
+    """API 할당량 초과(429) 오류인지 확인"""
+    error_str = str(error)
+    return '429' in error_str or 'quota' in error_str.lower() or 'exceeded' in error_str.lower()
+
+
+def _count_llm_error(kind: str, error: Exception) -> None:
+    """Gemini 호출 실패 메트릭 기록 (할당량 초과는 따로 집계)"""
+    llm_errors.inc(kind=kind, reason='quota' if is_quota_error(error) else 'error')
+
+
+def generate_text(model, prompt: str, timeout: float = GEMINI_CALL_TIMEOUT_SECONDS,
+                  generation_config: Optional[Dict] = None) -> str:
+    """프롬프트로 텍스트 생성 (호출당 타임아웃 적용)"""
+    kwargs = {'request_options': {'timeout': timeout}}
+    if generation_config:
+        kwargs['generation_config'] = generation_config
+    llm_calls.inc(kind='generate')
+    try:
+        response = model.generate_content(prompt, **kwargs)
+        return response.text
+    except Exception as e:
+        _count_llm_error('generate', e)
+        raise
+
+
+def stream_text(model, prompt: str, timeout: float = GEMINI_CALL_TIMEOUT_SECONDS):
+    """프롬프트로 텍스트를 스트리밍 생성 (도착하는 조각을 순서대로 반환)"""
+    llm_calls.inc(kind='stream')
+    try:
+        response = model.generate_content(prompt, stream=True, request_options={'timeout': timeout})
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # 안전 필터 등으로 텍스트가 없는 조각은 건너뜀
+                continue
+            if text:
+                yield text
+    except Exception as e:
+        _count_llm_error('stream', e)
+        raise
+
+
+def parse_json_response(response_text: str):
+    """모델 응답에서 JSON 파싱 (```json 코드 블록 허용, 실패 시 None)"""
+    if not response_text:
+        return None
+    text = response_text.strip()
+    fenced = re.match(r'^```(?:json)?\s*(.*?)\s*```$', text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    try:
+        return json.loads(text)
+    except ValueError:
+        # 앞뒤에 설명 문장이 붙은 경우 첫 번째 JSON 객체만 추출
+        start, end = text.find('{'), text.rfind('}')
+        if start != -1 and end > start:
+            try:
+                return json.loads(text[start:end + 1])
+            except ValueError:
+                return None
+        return None
+
+
+def submit_generation(model, prompt: str, timeout: float = GEMINI_CALL_TIMEOUT_SECONDS) -> Future:
+    """공유 스레드 풀에서 텍스트 생성을 비동기로 시작"""
+    return _executor.submit(generate_text, model, prompt, timeout)
+
+
+def submit_task(fn, *args, **kwargs) -> Future:
+    """공유 스레드 풀에서 임의의 Gemini 관련 작업을 비동기로 시작"""
+    return _executor.submit(fn, *args, **kwargs)
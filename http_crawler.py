@@ -0,0 +1,285 @@
+import argparse
+import os
+import random
+import re
+import time
+import urllib.parse
+
+import requests
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from danawa_common import (
+    LINK_SELECTOR,
+    NAME_SELECTOR,
+    PRICE_FALLBACK_SELECTOR,
+    PRICE_SELECTOR,
+    PRODUCT_ITEM_SELECTORS,
+    RATING_SELECTORS,
+    REVIEW_SELECTORS,
+    SEARCH_URL,
+    SPEC_BOX_SELECTORS,
+    SPEC_ITEM_SELECTOR,
+    USER_AGENT,
+    dedupe_products,
+    product_from_fields,
+    product_key,
+    save_products_csv,
+)
+from incremental import refresh_catalog
+
+# HTTP 크롤링 설정 (환경 변수로 조정 가능)
+HTTP_CRAWL_DELAY_RANGE = (
+    float(os.getenv('HTTP_CRAWL_DELAY_MIN', '1')),
+    float(os.getenv('HTTP_CRAWL_DELAY_MAX', '3')),
+)  # 요청 사이 대기 시간 (초)
+HTTP_TIMEOUT_SECONDS = float(os.getenv('HTTP_TIMEOUT_SECONDS', '15'))
+HTTP_MAX_PAGES = int(os.getenv('HTTP_MAX_PAGES', '10'))  # 키워드당 최대 결과 페이지 수
+
+# innerText처럼 줄을 나누는 블록 요소
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'fieldset', 'figcaption',
+    'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav',
+    'ol', 'p', 'pre', 'section', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul',
+}
+SKIP_TAGS = {'script', 'style', 'noscript', 'template'}
+
+
+def element_text(elem):
+    """요소의 표시 텍스트 (브라우저 innerText와 비슷하게 블록 요소마다 줄바꿈, 줄 안의 공백 정리)"""
+    parts = []
+
+    def walk(node):
+        tag = node.tag if isinstance(node.tag, str) else None
+        if tag in SKIP_TAGS:
+            return
+        if tag in BLOCK_TAGS:
+            parts.append('\n')
+        if tag and node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if tag in BLOCK_TAGS:
+            parts.append('\n')
+
+    walk(elem)
+    lines = (re.sub(r'\s+', ' ', line).strip() for line in ''.join(parts).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def _first(item, selector):
+    """선택자에 맞는 첫 번째 하위 요소 (없으면 None)"""
+    matches = item.cssselect(selector)
+    return matches[0] if matches else None
+
+
+def _text(elem):
+    """요소 텍스트 (요소가 없으면 None - 브라우저 일괄 추출 결과와 같은 형식)"""
+    return element_text(elem) if elem is not None else None
+
+
+def extract_page_fields(page_html, base_url=SEARCH_URL):
+    """검색 결과 HTML에서 상품별 필드 추출 (브라우저 모드의 일괄 추출 스크립트와 같은 형식)"""
+    root = lxml_html.fromstring(page_html)
+
+    items = []
+    for selector in PRODUCT_ITEM_SELECTORS:
+        items = root.cssselect(selector)
+        if items:
+            break
+
+    page_fields = []
+    for item in items:
+        name_elem = _first(item, NAME_SELECTOR)
+        if name_elem is None:
+            name_elem = _first(item, 'a')
+        link_elem = _first(item, LINK_SELECTOR)
+        href = link_elem.get('href') if link_elem is not None else ''
+        page_fields.append({
+            'name': _text(name_elem),
+            'url': urllib.parse.urljoin(base_url, href) if href else '',
+            'price': _text(_first(item, PRICE_SELECTOR)),
+            'prices': [element_text(elem) for elem in item.cssselect(PRICE_FALLBACK_SELECTOR)],
+            'ratings': [_text(_first(item, selector)) for selector in RATING_SELECTORS],
+            'reviews': [_text(_first(item, selector)) for selector in REVIEW_SELECTORS],
+            'specBoxes': [_text(_first(item, selector)) for selector in SPEC_BOX_SELECTORS],
+            'itemText': element_text(item),
+            'specItems': [element_text(elem) for elem in item.cssselect(SPEC_ITEM_SELECTOR)],
+        })
+    return page_fields
+
+
+def parse_products(page_html, base_url=SEARCH_URL):
+    """검색 결과 HTML을 상품 정보 목록으로 변환 (필수 정보가 없는 상품 제외)"""
+    products = []
+    for fields in extract_page_fields(page_html, base_url):
+        product_data = product_from_fields(fields)
+        if product_data:
+            products.append(product_data)
+    return products
+
+
+class DanawaHttpCrawler:
+    """브라우저 없이 HTTP 요청과 HTML 파서로 다나와 검색 결과를 수집하는 크롤러
+
+    결과 목록이 자바스크립트로만 그려지는 페이지는 상품을 찾지 못하므로 브라우저 모드(crawler.py)로 대체합니다.
+    """
+
+    def __init__(self, delay_range=HTTP_CRAWL_DELAY_RANGE, timeout=HTTP_TIMEOUT_SECONDS):
+        self.delay_range = delay_range
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+            'Referer': 'https://www.danawa.com/',
+        })
+        # keep-alive 연결 재사용 + 일시적인 오류(429/5xx)는 간격을 늘려 재시도
+        retry = Retry(total=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=('GET',))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def wait_random(self):
+        """요청 사이 랜덤 대기 (서버 부하/봇 감지 방지)"""
+        time.sleep(random.uniform(*self.delay_range))
+
+    def search_url(self, keyword, page=1):
+        """검색 결과 페이지 URL"""
+        url = f"{SEARCH_URL}{urllib.parse.quote(keyword)}"
+        if page > 1:
+            url += f"&page={page}"
+        return url
+
+    def fetch_page(self, keyword, page=1):
+        """검색 결과 페이지 HTML 가져오기"""
+        response = self.session.get(self.search_url(keyword, page), timeout=self.timeout)
+        response.raise_for_status()
+        if not response.encoding or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = response.apparent_encoding
+        return response.text
+
+    def search_products(self, keyword, max_items=70, seen_keys=None):
+        """키워드로 상품 검색 및 데이터 수집 (첫 페이지에서 상품을 찾지 못하면 None - 브라우저 모드 필요)
+
+        seen_keys는 다른 키워드에서 이미 수집한 상품 키 (함께 갱신)
+        """
+        print(f"\n[{keyword}] HTTP 검색 시작...")
+        products_data = []
+        seen_keys = set() if seen_keys is None else seen_keys
+        keyword_keys = set()
+
+        for page in range(1, HTTP_MAX_PAGES + 1):
+            if len(products_data) >= max_items:
+                break
+            if page > 1:
+                self.wait_random()
+
+            try:
+                page_html = self.fetch_page(keyword, page)
+            except requests.RequestException as e:
+                print(f"  페이지 {page} 요청 실패: {e}")
+                break
+
+            page_products = parse_products(page_html, self.search_url(keyword, page))
+            if not page_products:
+                if page == 1:
+                    print("  결과 목록을 HTML에서 찾을 수 없습니다. (브라우저 모드 필요)")
+                    return None
+                break
+
+            # 같은 페이지가 반복되면(페이지 파라미터 미지원) 종료
+            page_keys = {product_key(product) for product in page_products}
+            if page_keys <= keyword_keys:
+                break
+            keyword_keys |= page_keys
+            for product_data in page_products:
+                if len(products_data) >= max_items:
+                    break
+                key = product_key(product_data)
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+                products_data.append(product_data)
+                print(f"    [{len(products_data)}] {product_data['상품명'][:30]}...")
+
+        print(f"[{keyword}] HTTP 검색 완료: {len(products_data)}개 수집")
+        return products_data
+
+    def crawl(self, keywords, items_per_keyword=70):
+        """키워드별 HTTP 크롤링 (결과 목록을 찾지 못한 키워드는 브라우저 모드로 수집, 키워드 사이 중복 상품 제외)"""
+        all_products = []
+        browser_keywords = []
+        seen_keys = set()
+
+        for i, keyword in enumerate(keywords):
+            if i > 0:
+                self.wait_random()
+            products = self.search_products(keyword, items_per_keyword, seen_keys)
+            if products is None:
+                browser_keywords.append(keyword)
+            else:
+                all_products.extend(products)
+
+        if browser_keywords:
+            # 브라우저 모드는 필요할 때만 불러옴 (Selenium/Chrome 없이도 HTTP 모드 사용 가능)
+            from crawler import CRAWLER_WORKERS, CrawlScheduler
+            print(f"\n브라우저 모드로 수집: {browser_keywords}")
+            scheduler = CrawlScheduler(CRAWLER_WORKERS)
+            try:
+                all_products.extend(dedupe_products(scheduler.crawl(browser_keywords, items_per_keyword), seen_keys))
+            finally:
+                scheduler.close()
+
+        return all_products
+
+    def close(self):
+        """HTTP 세션 종료"""
+        self.session.close()
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='다나와 HTTP 크롤러 (브라우저 없이 검색 결과 HTML 파싱)')
+    parser.add_argument('--keywords', nargs='*', default=['노트북', '데스크탑'], help='검색 키워드')
+    parser.add_argument('--items', type=int, default=100, help='키워드당 수집 개수')
+    parser.add_argument('--output', default='electronics_data.csv', help='저장할 CSV 파일')
+    parser.add_argument('--html', nargs='*', help='저장해 둔 검색 결과 HTML 파일 파싱 (네트워크 사용 안 함)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='기존 CSV에 pcode 기준으로 반영 (새 상품/바뀐 상품만 브라우저로 상세 페이지 방문)')
+    args = parser.parse_args()
+
+    if args.html:
+        all_products = []
+        seen_keys = set()
+        for path in args.html:
+            with open(path, encoding='utf-8') as f:
+                all_products.extend(dedupe_products(parse_products(f.read()), seen_keys))
+        save_products_csv(all_products, args.output)
+        return
+
+    crawler = DanawaHttpCrawler()
+    try:
+        all_products = crawler.crawl(args.keywords, args.items)
+        if all_products and args.incremental:
+            # 상세 스펙은 브라우저 모드의 상세 페이지 추출 함수로 수집
+            from crawler import fetch_detail_specs
+            refresh_catalog(all_products, fetch_detail_specs, args.output)
+            print(f"\n총 {len(all_products)}개의 상품 데이터를 수집했습니다.")
+        elif all_products:
+            save_products_csv(all_products, args.output)
+            print(f"\n총 {len(all_products)}개의 상품 데이터를 수집했습니다.")
+        else:
+            print("\n수집된 데이터가 없습니다.")
+    except KeyboardInterrupt:
+        print("\n\n사용자에 의해 중단되었습니다.")
+    finally:
+        crawler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import time
+
+from danawa_common import PRODUCT_FIELDNAMES, load_products_csv, product_key, save_products_csv
+from spec_parser import has_core_specs, resolve_spec_text
+
+# 증분 갱신 상태 파일 (상품 키별 해시/최초·최근 수집 시각/상세 스펙 수집 여부)
+CRAWL_STATE_PATH = os.getenv('CRAWL_STATE_PATH', 'crawl_state.json')
+# 이 기간(일) 동안 검색 결과에 나오지 않은 상품은 카탈로그에서 제거 (0이면 제거하지 않음)
+CRAWL_STALE_DAYS = float(os.getenv('CRAWL_STALE_DAYS', '30'))
+
+# 상세 스펙에 영향을 주는 목록 필드 (가격/별점/리뷰 수만 바뀐 경우는 상세 페이지를 다시 방문하지 않음)
+CONTENT_FIELDS = ['상품명', '스펙']
+
+# 상세 페이지 스펙 컬럼 ('키:값' 형식이라 목록 스펙('스펙' 컬럼)과 따로 저장, 카탈로그는 목록 스펙에 빠진 CPU/RAM/그래픽 보완에 사용)
+DETAIL_SPEC_FIELD = '상세 페이지 스펙'
+CATALOG_FIELDNAMES = PRODUCT_FIELDNAMES + [DETAIL_SPEC_FIELD]
+
+
+def content_hash(product):
+    """상품 목록 정보 중 상세 스펙과 관련된 필드의 해시"""
+    content = '\x1f'.join((product.get(field) or '').strip() for field in CONTENT_FIELDS)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def listing_has_core_specs(product):
+    """목록 스펙(없으면 상품명)만으로 CPU/RAM/그래픽 정보를 모두 알 수 있는지 (상세 페이지 방문 불필요)"""
+    return has_core_specs(resolve_spec_text(product.get('스펙'), product.get('상품명')))
+
+
+def load_state(path=CRAWL_STATE_PATH):
+    """증분 갱신 상태 읽기 (파일이 없거나 깨졌으면 빈 상태)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def save_state(state, path=CRAWL_STATE_PATH):
+    """증분 갱신 상태 저장 (임시 파일에 쓴 뒤 교체하여 중단되어도 기존 상태 유지)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class IncrementalCatalog:
+    """기존 카탈로그 CSV와 상태 파일을 기준으로 새로 수집한 상품을 반영 (pcode 기준 upsert)
+
+    새 상품이나 상품명/목록 스펙이 바뀐 상품 중 목록 스펙에 CPU/RAM/그래픽 정보가 빠진 상품만 상세 페이지 방문 대상이 되고,
+    가격/별점/리뷰 수만 바뀐 상품은 이전에 수집한 상세 스펙을 그대로 사용합니다.
+    """
+
+    def __init__(self, csv_path='electronics_data.csv', state_path=CRAWL_STATE_PATH, stale_days=CRAWL_STALE_DAYS):
+        self.csv_path = csv_path
+        self.state_path = state_path
+        self.stale_days = stale_days
+        self.state = load_state(state_path)
+        self.rows = {product_key(row): row for row in load_products_csv(csv_path)}
+        # 상태 파일 없이 저장된 기존 행은 목록 정보만 있는 최신 상품으로 등록 (내용이 바뀔 때만 상세 페이지 방문)
+        now = time.time()
+        for key, row in self.rows.items():
+            self.state.setdefault(key, {
+                'hash': content_hash(row), 'first_seen': now, 'last_seen': now, 'detail': False, 'listing_only': True,
+            })
+
+    def _is_current(self, key, product):
+        """저장된 행을 그대로 쓸 수 있는지 (해시 일치 + 상세 스펙 수집 완료 또는 목록 정보만 쓰는 행)"""
+        entry = self.state.get(key)
+        return bool(
+            entry and entry.get('hash') == content_hash(product) and key in self.rows
+            and (entry.get('detail') or entry.get('listing_only'))
+        )
+
+    def needs_detail(self, products):
+        """상세 페이지를 방문해야 하는 상품 목록 (새 상품, 내용이 바뀐 상품, 상세 스펙 수집에 실패했던 상품)
+
+        목록 스펙만으로 CPU/RAM/그래픽 정보를 알 수 있는 상품은 방문하지 않음
+        """
+        pending = {}
+        for product in products:
+            key = product_key(product)
+            if (key not in pending and not self._is_current(key, product) and product.get('상품 상세 URL')
+                    and not listing_has_core_specs(product)):
+                pending[key] = product
+        return list(pending.values())
+
+    def upsert(self, products, detail_specs=None):
+        """수집한 상품을 카탈로그에 반영하고 오래 보이지 않은 상품 제거
+
+        detail_specs는 상품 키별 상세 페이지 스펙 (needs_detail 대상만 포함, DETAIL_SPEC_FIELD 컬럼에 저장)
+        """
+        detail_specs = detail_specs or {}
+        now = time.time()
+        stats = {'new': 0, 'changed': 0, 'unchanged': 0, 'removed': 0}
+
+        seen = set()
+        for product in products:
+            key = product_key(product)
+            if key in seen:
+                continue
+            seen.add(key)
+            entry = self.state.get(key)
+            current = self._is_current(key, product)
+            row = dict(product)
+            if detail_specs.get(key):
+                row[DETAIL_SPEC_FIELD] = detail_specs[key]
+            elif current:
+                row[DETAIL_SPEC_FIELD] = self.rows[key].get(DETAIL_SPEC_FIELD, '')
+
+            if entry is None:
+                stats['new'] += 1
+            elif current:
+                stats['unchanged'] += 1
+            else:
+                stats['changed'] += 1
+
+            self.rows[key] = row
+            self.state[key] = {
+                'hash': content_hash(product),
+                'first_seen': entry.get('first_seen', now) if entry else now,
+                'last_seen': now,
+                'detail': bool(detail_specs.get(key)) or (current and bool(entry.get('detail'))),
+                'listing_only': not detail_specs.get(key) and (
+                    listing_has_core_specs(product) or (current and bool(entry.get('listing_only')))
+                ),
+            }
+
+        if self.stale_days > 0:
+            cutoff = now - self.stale_days * 86400
+            for key in [key for key, entry in self.state.items() if entry.get('last_seen', 0) < cutoff]:
+                del self.state[key]
+                if self.rows.pop(key, None) is not None:
+                    stats['removed'] += 1
+        return stats
+
+    def save(self):
+        """카탈로그 CSV와 상태 파일 저장"""
+        save_products_csv(list(self.rows.values()), self.csv_path, CATALOG_FIELDNAMES)
+        save_state(self.state, self.state_path)
+
+
+def refresh_catalog(products, fetch_detail_specs, csv_path='electronics_data.csv', state_path=CRAWL_STATE_PATH):
+    """증분 갱신 실행 (fetch_detail_specs는 상품 목록을 받아 {상품 키: 상세 스펙}을 돌려주는 함수)"""
+    catalog = IncrementalCatalog(csv_path, state_path)
+    pending = catalog.needs_detail(products)
+    print(f"\n증분 갱신: 수집 {len(products)}개 중 상세 페이지 방문 {len(pending)}개")
+    detail_specs = fetch_detail_specs(pending) if pending else {}
+    stats = catalog.upsert(products, detail_specs)
+    catalog.save()
+    print(f"신규 {stats['new']}개, 변경 {stats['changed']}개, 유지 {stats['unchanged']}개, 제거 {stats['removed']}개")
+    return stats
@@ -0,0 +1,236 @@
+import bisect
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from tracing import add_span_listener
+
+# 메트릭 HTTP 서버 설정 (METRICS_PORT가 비어 있으면 서버를 띄우지 않음)
+METRICS_PORT = os.getenv('METRICS_PORT', '')
+METRICS_ADDRESS = os.getenv('METRICS_ADDRESS', '0.0.0.0')
+
+# 단계별 지연 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value: float) -> str:
+    """샘플 값 문자열 (정수는 소수점 없이)"""
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """라벨 문자열 ({name="value",...}, 값의 역슬래시/따옴표/줄바꿈 이스케이프)"""
+    if not labels:
+        return ''
+    parts = []
+    for name, value in labels.items():
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{escaped}"')
+    return '{' + ','.join(parts) + '}'
+
+
+class _Metric:
+    """라벨 조합별 값을 보관하는 메트릭 기본 클래스 (스레드 안전)"""
+
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        """라벨 값 튜플 (정의한 라벨과 다르면 ValueError)"""
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} 라벨이 맞지 않습니다: {sorted(labels)} != {sorted(self.label_names)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """(샘플 이름, 라벨, 값) 목록"""
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, dict(zip(self.label_names, key)), value) for key, value in sorted(items)]
+
+
+class Counter(_Metric):
+    """증가만 하는 누적 값 (요청 수, 오류 수 등)"""
+
+    metric_type = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """현재 값 (캐시 크기, 적중률 등)"""
+
+    metric_type = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """구간별 누적 개수와 합계 (지연 시간 분포)"""
+
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            items = [(key, (list(counts), total)) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, (counts, total) in sorted(items):
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                samples.append((f'{self.name}_bucket', {**labels, 'le': _format_value(bound)}, cumulative))
+            samples.append((f'{self.name}_sum', labels, total))
+            samples.append((f'{self.name}_count', labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """메트릭 목록과 조회 시점에 값을 채우는 수집 함수 모음 (Prometheus 텍스트 형식으로 출력)"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        """같은 이름의 메트릭이 이미 있으면 기존 것을 반환 (Streamlit 재실행 시 중복 등록 방지)"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def register_collector(self, name: str, collector: Callable[[], None]) -> None:
+        """출력 직전에 호출할 수집 함수 등록 (게이지 갱신용, 같은 이름은 교체)"""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def render(self) -> str:
+        """전체 메트릭을 Prometheus 텍스트 형식으로 출력"""
+        with self._lock:
+            collectors = list(self._collectors.values())
+            metrics = list(self._metrics.values())
+        for collector in collectors:
+            try:
+                collector()
+            except Exception:
+                # 수집 실패는 해당 값만 갱신하지 않음
+                pass
+
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.metric_type}')
+            for sample_name, labels, value in metric.samples():
+                lines.append(f'{sample_name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+# 프로세스 공유 메트릭
+registry = MetricsRegistry()
+
+chat_turns = registry.counter('chatbot_turns_total', '처리한 사용자 입력 수')
+llm_calls = registry.counter('chatbot_llm_calls_total', 'Gemini 호출 수', ['kind'])
+llm_errors = registry.counter('chatbot_llm_errors_total', 'Gemini 호출 실패 수 (reason=quota는 429 할당량 초과)',
+                              ['kind', 'reason'])
+tavily_requests = registry.counter('chatbot_tavily_requests_total', 'Tavily 검색 호출 수 (캐시 적중 제외)', ['result'])
+stage_duration = registry.histogram('chatbot_stage_duration_seconds', '단계별 소요 시간', ['stage'])
+stage_errors = registry.counter('chatbot_stage_errors_total', '오류가 발생한 단계 수', ['stage'])
+cache_lookups = registry.counter('chatbot_cache_lookups_total', '캐시 조회 수', ['stage', 'result'])
+cache_hit_ratio = registry.gauge('chatbot_cache_hit_ratio', '프로세스 시작 후 캐시 적중률', ['cache'])
+cache_entries = registry.gauge('chatbot_cache_entries', '캐시에 저장된 항목 수', ['cache'])
+
+
+def observe_span(record: Dict) -> None:
+    """tracing 스팬 기록을 단계별 지연 시간/오류/캐시 적중 메트릭에 반영"""
+    stage = record.get('stage')
+    stage_duration.observe(record.get('duration_ms', 0) / 1000, stage=stage)
+    if 'error' in record:
+        stage_errors.inc(stage=stage)
+    if 'cache_hit' in record:
+        cache_lookups.inc(stage=stage, result='hit' if record['cache_hit'] else 'miss')
+
+
+add_span_listener(observe_span)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics 요청에 메트릭 텍스트 응답"""
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 수집 요청마다 표준 에러에 접근 로그를 남기지 않음
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: str = METRICS_PORT, address: str = METRICS_ADDRESS) -> Optional[ThreadingHTTPServer]:
+    """메트릭 HTTP 서버를 백그라운드 스레드로 시작 (프로세스당 한 번, 포트 미설정/사용 중이면 None)"""
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((address, int(port)), _MetricsHandler)
+            except (OSError, ValueError):
+                # 포트를 열 수 없어도 챗봇은 계속 동작
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+    return _server
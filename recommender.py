@@ -0,0 +1,259 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# 외장 그래픽 GPU 타입 (요구사항이 없을 때 게임용 가산점 대상)
+GAMING_GPU_TYPES = ['rtx', 'gtx', 'radeon']
+
+# 외장 그래픽이 필수인 용도
+GPU_REQUIRED_USAGES = ['게임용', '작업용']
+
+# 채점 전 후보 제외 기준
+LIGHT_WEIGHT_LIMIT_KG = 2.0  # 가벼운 노트북을 원할 때 이 무게를 넘는 제품 제외
+MAX_BUDGET_RATIO = 1.5  # 예산의 이 비율을 넘는 제품 제외
+
+
+def _float_column(features: pd.DataFrame, column: str) -> np.ndarray:
+    """nullable 숫자 컬럼을 float 배열로 변환 (결측값은 NaN)"""
+    return features[column].to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _bool_column(features: pd.DataFrame, column: str) -> np.ndarray:
+    """불리언 컬럼을 bool 배열로 변환"""
+    return features[column].to_numpy(dtype=bool)
+
+
+def _truthy(values: np.ndarray) -> np.ndarray:
+    """값이 있고 0이 아닌 항목 (파이썬의 `if value:`와 동일한 판정)"""
+    return ~np.isnan(values) & (values != 0)
+
+
+def prefilter_candidates(features: pd.DataFrame, product_type: Optional[str], user_usage: Optional[str] = None,
+                         budget: Optional[int] = None, weight_preference: Optional[str] = None,
+                         min_candidates: int = 3, required_only: bool = False) -> np.ndarray:
+    """채점 전에 추천될 수 없는 상품을 제외하는 불리언 마스크
+
+    게임용/작업용의 내장 그래픽 전용 제품은 항상 제외하고, 무게/예산 조건은 남는 후보가
+    min_candidates개보다 적으면 무게 -> 예산 순서로 완화합니다(required_only면 적용하지 않음).
+    값을 모르는 항목은 제외하지 않습니다.
+    """
+    mask = np.ones(len(features), dtype=bool)
+    if user_usage in GPU_REQUIRED_USAGES:
+        mask &= ~_bool_column(features, 'integrated_only')
+    if required_only:
+        return mask
+
+    # 완화 가능한 조건 (뒤에 있는 조건부터 완화)
+    relaxable = []
+    if budget:
+        price = _float_column(features, 'price_int')
+        relaxable.append(~(price > budget * MAX_BUDGET_RATIO))
+    if product_type == '노트북' and weight_preference == '가벼운':
+        weight = _float_column(features, 'weight_kg')
+        relaxable.append(~(weight > LIGHT_WEIGHT_LIMIT_KG))
+
+    while relaxable:
+        candidates = mask & np.logical_and.reduce(relaxable)
+        if candidates.sum() >= min_candidates:
+            return candidates
+        relaxable.pop()
+    return mask
+
+
+def _apply_mask(features: pd.DataFrame, mask: np.ndarray) -> pd.DataFrame:
+    """마스크에 해당하는 행 (모두 해당하면 복사 없이 그대로 반환)"""
+    return features if mask.all() else features[mask]
+
+
+def prefilter_stages(features: pd.DataFrame, product_type: Optional[str], user_usage: Optional[str] = None,
+                     budget: Optional[int] = None, weight_preference: Optional[str] = None,
+                     top_k: int = 3, within_budget: Optional[pd.DataFrame] = None) -> List[pd.DataFrame]:
+    """채점 전에 조건에 맞지 않는 상품을 제외한 후보 목록을 시도 순서대로 반환
+
+    예산은 후보를 자르는 기준이 아니라 점수(score_products)로 반영하므로, 예산보다 훨씬 싼 상품도
+    점수가 높으면 추천될 수 있습니다(MAX_BUDGET_RATIO를 넘는 상품만 제외).
+    within_budget은 가격 색인으로 MAX_BUDGET_RATIO 초과 상품을 미리 뺀 features의 부분 집합(같은 행 순서)이며,
+    주어지면 예산 조건을 가격 컬럼 마스크로 다시 계산하지 않습니다.
+    """
+    # 걸러진 후보로 추천을 다 채우지 못할 때를 대비해 필수 조건(내장 그래픽 전용 제외)만 남긴 후보도 준비
+    required_mask = prefilter_candidates(features, product_type, user_usage, required_only=True)
+    if budget and within_budget is not None:
+        # 예산 조건은 이미 적용됨 - 무게 조건부터 완화하고, 그래도 후보가 부족하면 예산 조건도 완화
+        budget_mask = prefilter_candidates(within_budget, product_type, user_usage, None, weight_preference, top_k)
+        if budget_mask.sum() >= top_k:
+            first_stage = _apply_mask(within_budget, budget_mask)
+        else:
+            first_stage = _apply_mask(features, required_mask)
+    else:
+        # 내장 그래픽 전용, 무게/예산 초과 상품 제외 (후보가 부족하면 완화)
+        first_stage = _apply_mask(
+            features, prefilter_candidates(features, product_type, user_usage, budget, weight_preference, top_k)
+        )
+
+    stages = [first_stage]
+    if len(first_stage) != len(features):
+        stages.append(_apply_mask(features, required_mask))
+    return stages
+
+
+def score_products(features: pd.DataFrame, required_cpu: Optional[Dict], required_ram: Optional[int],
+                   required_gpu: Optional[Dict], product_type: Optional[str], user_usage: Optional[str] = None,
+                   budget: Optional[int] = None, weight_preference: Optional[str] = None,
+                   portable_need: Optional[bool] = None) -> np.ndarray:
+    """스펙 피처 컬럼으로 모든 상품의 매칭 점수를 한 번에 계산 (행 순서대로 int 배열 반환)"""
+    n = len(features)
+    score = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return score
+
+    # CPU 매칭 (요구사항과 비교)
+    if required_cpu:
+        cpu_brand = features['cpu_brand'].to_numpy(dtype=object)
+        has_cpu = pd.notna(cpu_brand)
+        same_brand = has_cpu & (cpu_brand == required_cpu['brand'])
+        score += np.where(same_brand, 20, 0)  # 같은 브랜드
+
+        required_generation = required_cpu.get('generation')
+        if required_generation:
+            generation = _float_column(features, 'cpu_generation')
+            known_generation = same_brand & _truthy(generation)
+            generation_ok = known_generation & (generation >= required_generation)
+            score += np.where(generation_ok, 30, 0)  # 요구사항 이상의 세대
+            score += np.where(known_generation & ~generation_ok, 5, 0)  # 세대가 낮지만 같은 브랜드
+
+            required_model = required_cpu.get('model')
+            if required_model:
+                model = _float_column(features, 'cpu_model')
+                known_model = generation_ok & _truthy(model)
+                score += np.where(known_model & (model >= required_model), 20, 0)  # 요구사항 이상의 모델
+                score += np.where(known_model & (model < required_model), 10, 0)  # 모델은 낮지만 세대는 높음
+
+        # 다른 브랜드지만 성능 점수로 비교
+        cpu_score = _float_column(features, 'cpu_score')
+        score += np.where(has_cpu & ~same_brand & (cpu_score >= required_cpu.get('score', 0)), 15, 0)
+
+        # 제품 CPU를 못 찾은 경우 키워드 매칭
+        keyword_column = {'intel': 'spec_has_intel', 'amd': 'spec_has_amd'}.get(required_cpu['brand'])
+        if keyword_column:
+            score += np.where(~has_cpu & _bool_column(features, keyword_column), 5, 0)
+
+    # RAM 매칭
+    if required_ram:
+        ram = _float_column(features, 'ram_gb')
+        known_ram = _truthy(ram)
+        enough_ram = known_ram & (ram >= required_ram)
+        score += np.where(enough_ram, 30, 0)  # 요구사항 이상
+        score += np.where(enough_ram & (ram >= required_ram * 1.5), 10, 0)  # 여유 있음
+        score += np.where(known_ram & ~enough_ram, 5, 0)  # 부족하지만 있음
+
+    # GPU 매칭 (가장 중요)
+    gpu_type = features['gpu_type'].to_numpy(dtype=object)
+    has_gpu = pd.notna(gpu_type)
+    if required_gpu:
+        same_type = has_gpu & (gpu_type == required_gpu['type'])
+        score += np.where(same_type, 40, 0)  # 같은 타입 (RTX, GTX 등)
+
+        required_model = required_gpu.get('model')
+        if required_model:
+            gpu_model = _float_column(features, 'gpu_model')
+            known_model = same_type & _truthy(gpu_model)
+            score += np.where(known_model & (gpu_model >= required_model), 30, 0)  # 요구사항 이상의 모델
+            score += np.where(known_model & (gpu_model < required_model), 10, 0)  # 모델은 낮지만 같은 타입
+
+        # 다른 타입이지만 성능 점수로 비교
+        gpu_score = _float_column(features, 'gpu_score')
+        score += np.where(has_gpu & ~same_type & (gpu_score >= required_gpu.get('score', 0)), 20, 0)
+
+        # 제품 GPU를 못 찾은 경우 스펙 키워드로 판단
+        fallback = np.where(_bool_column(features, 'spec_has_external'), 10, 0)
+        if required_gpu['type'] in ('rtx', 'gtx'):
+            fallback = np.where(_bool_column(features, f"spec_has_{required_gpu['type']}"), 15, fallback)
+        score += np.where(~has_gpu, fallback, 0)
+    elif user_usage == '게임용':
+        # GPU 요구사항은 없지만 외장 그래픽이 있는 경우 (게임용)
+        score += np.where(np.isin(gpu_type, GAMING_GPU_TYPES), 20, 0)
+
+    # 게임용/작업용인 경우 외장 그래픽 필수 체크
+    if user_usage in GPU_REQUIRED_USAGES:
+        has_discrete_gpu = _bool_column(features, 'has_discrete_gpu')
+        score += np.where(has_discrete_gpu, 15, 0)  # 외장 그래픽 보너스
+        score += np.where(~has_discrete_gpu & _bool_column(features, 'integrated_only'), -100, 0)
+
+    # 예산 점수 조정
+    if budget:
+        price = _float_column(features, 'price_int')
+        known_price = ~np.isnan(price)
+        within = known_price & (price <= budget)
+        over = known_price & (price > budget)
+        with np.errstate(invalid='ignore'):
+            # 예산 내면 가산점 (50-70%가 가성비 구간)
+            price_ratio = price / budget
+            within_points = np.select(
+                [price_ratio >= 0.9, price_ratio >= 0.7, price_ratio >= 0.5],
+                [10, 15, 20],
+                default=10,
+            )
+            # 예산 초과시 감점
+            over_ratio = (price - budget) / budget
+            over_points = np.select([over_ratio <= 0.1, over_ratio <= 0.2], [-5, -15], default=-30)
+        score += np.where(within, within_points, 0)
+        score += np.where(over, over_points, 0)
+
+    if product_type == '노트북':
+        weight = _float_column(features, 'weight_kg')
+        known_weight = ~np.isnan(weight)
+
+        # 무게 선호도 (노트북만)
+        if weight_preference == '가벼운':
+            weight_points = np.select([weight <= 1.5, weight <= 2.0], [20, 10], default=-10)
+            score += np.where(known_weight, weight_points, 0)
+        elif weight_preference == '보통':
+            score += np.where(known_weight & (weight >= 1.5) & (weight <= 2.5), 10, 0)
+        elif weight_preference == '무거워도됨':
+            score += np.where(known_weight, 5, 0)  # 무게 무관
+
+        # 휴대용 필요 여부 (노트북만)
+        if portable_need:
+            # 가벼운 제품 선호
+            score += np.where(known_weight, np.select([weight <= 1.5, weight <= 2.0], [15, 5], default=0), 0)
+        elif portable_need is not None:
+            # 휴대용 불필요하면 무게 무관
+            score += 5
+
+    return score
+
+
+def select_top_k(scores: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """점수 상위 k개 위치 반환 (전체 정렬 없이 argpartition 사용, 동점이면 원래 순서 유지)"""
+    positions = np.arange(len(scores)) if mask is None else np.flatnonzero(mask)
+    if len(positions) == 0 or k <= 0:
+        return positions[:0]
+
+    candidate_scores = scores[positions]
+    if len(positions) > k:
+        # k번째 점수 이상인 후보만 남김 (경계 동점은 모두 포함하여 안정 정렬과 같은 결과 보장)
+        kth_score = -np.partition(-candidate_scores, k - 1)[k - 1]
+        keep = candidate_scores >= kth_score
+        positions = positions[keep]
+        candidate_scores = candidate_scores[keep]
+
+    order = np.lexsort((positions, -candidate_scores))
+    return positions[order][:k]
+
+
+def select_recommendations(features: pd.DataFrame, scores: np.ndarray, user_usage: Optional[str] = None,
+                           top_k: int = 3) -> np.ndarray:
+    """점수와 용도 조건으로 추천할 상품 위치 선택 (features는 prefilter_candidates로 걸러진 후보)"""
+    if user_usage in GPU_REQUIRED_USAGES:
+        # 외장 그래픽 키워드가 있거나 점수가 높은 제품 우선 (외장 그래픽이 있을 가능성)
+        preferred = _bool_column(features, 'gpu_keyword') | (scores > 50)
+        if preferred.any():
+            return select_top_k(scores, top_k, preferred)
+        return select_top_k(scores, top_k, scores > 0)
+
+    # 점수가 0보다 큰 제품 우선, 없으면 점수 순
+    positive = scores > 0
+    if positive.any():
+        return select_top_k(scores, top_k, positive)
+    return select_top_k(scores, top_k)
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# 의미 기반 답변 캐시 설정 (환경 변수로 조정 가능)
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.8'))  # 코사인 유사도 기준
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv('SEMANTIC_CACHE_TTL_SECONDS', '3600'))
+SEMANTIC_CACHE_MAX_SCOPES = int(os.getenv('SEMANTIC_CACHE_MAX_SCOPES', '256'))  # 추천 상품 조합 수
+SEMANTIC_CACHE_MAX_ENTRIES_PER_SCOPE = 50  # 상품 조합별 저장 질문 수
+
+# 해시 n-gram 벡터 설정
+EMBEDDING_DIM = 1024
+NGRAM_SIZES = (1, 2, 3)
+
+
+def normalize_question(text: str) -> str:
+    """질문 정규화 (유니코드/대소문자 정리, 공백과 문장부호 제거)"""
+    normalized = unicodedata.normalize('NFKC', str(text or '')).lower()
+    return re.sub(r'[\s\W_]+', '', normalized)
+
+
+# 서수 표현 -> 숫자 ('두번째 제품'과 '2번 제품'을 같은 상품 지칭으로 취급)
+ORDINAL_WORDS = {
+    '첫': '1', '두': '2', '둘': '2', '세': '3', '셋': '3', '네': '4', '넷': '4', '다섯': '5',
+    '여섯': '6', '일곱': '7', '여덟': '8', '아홉': '9', '열': '10',
+    'first': '1', 'second': '2', 'third': '3', 'fourth': '4', 'fifth': '5',
+    'sixth': '6', 'seventh': '7', 'eighth': '8', 'ninth': '9', 'tenth': '10',
+}
+NUMBER_PATTERN = re.compile(
+    r'(\d+)|(첫|둘|셋|넷|다섯|여섯|일곱|여덟|아홉|열|두|세|네)\s*(?:번\s*)?째'
+    r'|\b(first|second|third|fourth|fifth|sixth|seventh|eighth|ninth|tenth)\b'
+)
+# 상품명에서 상품 지칭으로 보지 않는 짧은 토큰 길이
+MIN_NAME_TOKEN_LENGTH = 2
+
+
+def question_numbers(text: str) -> tuple:
+    """질문에 들어 있는 숫자/서수 목록 (예: '1번이랑 두번째' -> ('1', '2'), '2nd' -> ('2',))"""
+    normalized = unicodedata.normalize('NFKC', str(text or '')).lower()
+    numbers = []
+    for match in NUMBER_PATTERN.finditer(normalized):
+        digits, korean, english = match.groups()
+        numbers.append(digits or ORDINAL_WORDS[korean or english])
+    return tuple(numbers)
+
+
+def mentioned_products(text: str, product_names: List[str]) -> tuple:
+    """질문에서 이름(모델명 등 다른 상품과 겹치지 않는 단어)으로 지칭한 상품 번호 목록 (1부터)"""
+    token_sets = [
+        {normalize_question(token) for token in str(name or '').split()} for name in product_names
+    ]
+    token_sets = [{token for token in tokens if len(token) >= MIN_NAME_TOKEN_LENGTH} for tokens in token_sets]
+    normalized = normalize_question(text)
+    mentioned = []
+    for i, tokens in enumerate(token_sets):
+        others = set().union(*(other for j, other in enumerate(token_sets) if j != i))
+        if any(token in normalized for token in tokens - others):
+            mentioned.append(i + 1)
+    return tuple(mentioned)
+
+
+def question_guard_key(text: str, product_names: Optional[List[str]] = None) -> tuple:
+    """유사도와 별개로 일치해야 하는 질문 속 지칭 (숫자/서수, 이름으로 지칭한 상품)"""
+    return question_numbers(text), mentioned_products(text, product_names or [])
+
+
+def embed_text(text: str) -> np.ndarray:
+    """문자 n-gram을 해시하여 정규화된 고정 길이 벡터 생성 (네트워크/모델 불필요)"""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    normalized = normalize_question(text)
+    for n in NGRAM_SIZES:
+        for i in range(len(normalized) - n + 1):
+            # 프로세스마다 달라지는 hash() 대신 crc32 사용
+            bucket = zlib.crc32(normalized[i:i + n].encode('utf-8')) % EMBEDDING_DIM
+            vector[bucket] += n  # 긴 n-gram일수록 가중치 높게
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def product_set_key(products: Optional[List[Dict]], *context) -> str:
+    """추천 상품 조합(과 추가 조건)을 식별하는 해시 키"""
+    parts = [f"{p.get('상품명', '')}|{p.get('URL', '')}" for p in (products or [])]
+    parts.extend(str(value) for value in context)
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+class SemanticCache:
+    """추천 상품 조합별로 비슷한 질문의 답변을 재사용하는 메모리 캐시 (스레드 안전)"""
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, ttl_seconds: float = SEMANTIC_CACHE_TTL_SECONDS,
+                 max_scopes: int = SEMANTIC_CACHE_MAX_SCOPES,
+                 max_entries_per_scope: int = SEMANTIC_CACHE_MAX_ENTRIES_PER_SCOPE):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_scopes = max_scopes
+        self.max_entries_per_scope = max_entries_per_scope
+        self.hits = 0
+        self.misses = 0
+        # scope -> [(저장 시각, 질문 벡터, 질문 속 지칭, 답변)]
+        self._scopes: 'OrderedDict[str, List[tuple]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live_entries(self, scope: str) -> List[tuple]:
+        """만료된 항목을 제거한 scope의 항목 목록 (잠금 안에서 호출)"""
+        entries = self._scopes.get(scope)
+        if not entries:
+            return []
+        now = time.time()
+        entries = [entry for entry in entries if now - entry[0] <= self.ttl_seconds]
+        if entries:
+            self._scopes[scope] = entries
+            self._scopes.move_to_end(scope)
+        else:
+            del self._scopes[scope]
+        return entries
+
+    def lookup(self, scope: str, question: str, product_names: Optional[List[str]] = None) -> Optional[str]:
+        """같은 scope에서 유사도가 기준 이상인 가장 비슷한 질문의 답변 반환 (없으면 None)
+
+        '1번'과 '두번째', '그램'과 '갤럭시북'처럼 지칭하는 상품만 다른 질문은 비슷해 보여도 다른 질문이므로
+        숫자/서수와 이름으로 지칭한 상품(product_names 기준)이 같은 항목만 비교합니다.
+        """
+        vector = embed_text(question)
+        guard_key = question_guard_key(question, product_names)
+        with self._lock:
+            entries = [entry for entry in self._live_entries(scope) if entry[2] == guard_key]
+            if entries and vector.any():
+                similarities = np.stack([entry[1] for entry in entries]) @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    self.hits += 1
+                    return entries[best][3]
+            self.misses += 1
+            return None
+
+    def store(self, scope: str, question: str, answer: str, product_names: Optional[List[str]] = None) -> None:
+        """질문과 답변 저장 (상품 조합 수와 조합별 질문 수는 오래된 것부터 삭제)"""
+        vector = embed_text(question)
+        if not vector.any() or not answer:
+            return
+        with self._lock:
+            entries = self._live_entries(scope)
+            entries.append((time.time(), vector, question_guard_key(question, product_names), answer))
+            self._scopes[scope] = entries[-self.max_entries_per_scope:]
+            self._scopes.move_to_end(scope)
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+
+    def clear(self) -> None:
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._scopes.clear()
+
+    def stats(self) -> Dict:
+        """적중/실패 횟수, 적중률, 저장된 질문 수"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'scopes': len(self._scopes),
+                'entries': sum(len(entries) for entries in self._scopes.values()),
+            }
+
+
+# 프로세스 공유 후속 질문 답변 캐시
+answer_cache = SemanticCache()
@@ -0,0 +1,332 @@
+import hashlib
+import os
+import re
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Pattern
+
+from caches import TTLCache
+
+# 파싱 결과 메모이제이션 크기 (스펙 문자열 해시 기준 LRU)
+SPEC_PARSE_CACHE_MAX_ENTRIES = int(os.getenv('SPEC_PARSE_CACHE_MAX_ENTRIES', '20000'))
+
+# 모든 패턴은 import 시 한 번만 컴파일 (입력은 미리 소문자로 변환하므로 패턴도 소문자 기준)
+_FLAGS = re.IGNORECASE
+
+# 스펙 문자열에 어떤 정보가 들어 있는지 확인하는 키워드 (해당 키워드가 없으면 관련 패턴은 실행하지 않음)
+SPEC_KEYWORDS = (
+    '인텔', 'intel', '코어', '세대', 'amd', '라이젠', 'ryzen',
+    'rtx', 'gtx', 'radeon', 'rx', '외장그래픽', '내장그래픽',
+    'gb', 'tb', 'kg', '인치',
+)
+
+# 인텔 CPU (우선순위 순)
+_INTEL_CPU_PATTERNS = [
+    re.compile(r'(?:인텔|intel)[\s/]*코어[\s/]*(?:i|울트라|ultra)?[\s/]*(\d+)[\s/]*(?:세대|gen)?[\s/]*(?:i|울트라|ultra)?[\s/]*(\d+)[\s/]*([a-z0-9]+)?', _FLAGS),
+    re.compile(r'코어[\s/]*(?:i|울트라|ultra)?[\s/]*(\d+)[\s/]*(?:세대|gen)?[\s/]*(?:i|울트라|ultra)?[\s/]*(\d+)[\s/]*([a-z0-9]+)?', _FLAGS),
+    re.compile(r'i(\d+)[\s/]*-[\s/]*(\d+)[\s/]*세대', _FLAGS),
+    re.compile(r'코어[\s/]*울트라[\s/]*(\d+)[\s/]*\([^)]*\)', _FLAGS),
+]
+
+# AMD CPU (우선순위 순)
+_AMD_CPU_PATTERNS = [
+    re.compile(r'(?:amd|라이젠|ryzen)[\s/]*(\d+)[\s/]*(?:zen[\s/]*(\d+))?[\s/]*([a-z0-9]+)?', _FLAGS),
+    re.compile(r'라이젠[\s/]*(\d+)[\s/]*\([^)]*\)', _FLAGS),
+]
+
+# GPU 패턴 (타입, 패턴, 기본 점수) - 우선순위 순
+_SPEC_GPU_PATTERNS = [
+    ('rtx', re.compile(r'rtx[\s/]*(\d{4,5})', _FLAGS), 1000),  # RTX는 높은 점수
+    ('gtx', re.compile(r'gtx[\s/]*(\d{3,4})', _FLAGS), 500),  # GTX는 중간 점수
+    ('radeon', re.compile(r'rx[\s/]*(\d{4})', _FLAGS), 800),
+]
+_REQUIRED_GPU_PATTERNS = [
+    ('rtx', _SPEC_GPU_PATTERNS[0][1], 1000),
+    ('gtx', _SPEC_GPU_PATTERNS[1][1], 500),
+    ('radeon', re.compile(r'(?:radeon|rx)[\s/]*(\d{4})', _FLAGS), 800),
+]
+
+# 요구사항 CPU 패턴
+_REQUIRED_INTEL_RE = re.compile(r'(?:intel|인텔)[\s/]*core[\s/]*(?:i|i-)?[\s/]*(\d+)[\s/]*-[\s/]*(\d+)([a-z]+)?', _FLAGS)
+_REQUIRED_AMD_RE = re.compile(r'(?:amd|라이젠|ryzen)[\s/]*(\d+)[\s/]*(\d{4})?', _FLAGS)
+
+# 용량/무게/화면 크기
+_GB_RE = re.compile(r'(\d+)\s*gb', _FLAGS)
+_WEIGHT_RE = re.compile(r'(\d+\.?\d*)\s*kg', _FLAGS)
+_STORAGE_RE = re.compile(r'(?:ssd|m\.2|nvme|hdd|emmc)[\s:/]*(\d+)\s*(gb|tb)|(\d+)\s*tb', _FLAGS)
+_DISPLAY_RE = re.compile(r'(\d+(?:\.\d+)?)\s*인치', _FLAGS)
+_CARD_RAM_RE = re.compile(r'(\d+)\s*GB')  # 제품 카드 표시용 (대소문자 구분)
+
+# 웹 검색 결과(시스템 요구사항 문서)에서 사양을 찾는 패턴 (우선순위 순)
+_REQUIREMENT_CPU_PATTERNS = [
+    re.compile(r'(?:CPU|프로세서)[:\s]*([A-Za-z0-9\s\-]+?)(?:GHz|코어|core|RAM|GPU|$)', _FLAGS),
+    re.compile(r'(인텔|AMD|Intel|라이젠|코어|Core)[\s\w\-]+(?:GHz|코어|core)', _FLAGS),
+]
+_REQUIREMENT_RAM_PATTERNS = [
+    re.compile(r'(\d+)\s*GB\s*(?:RAM|램|메모리)', _FLAGS),
+    re.compile(r'RAM[:\s]*(\d+)\s*GB', _FLAGS),
+]
+_REQUIREMENT_GPU_PATTERNS = [
+    re.compile(r'(?:GPU|그래픽|비디오)[:\s]*([A-Za-z0-9\s\-]+?)(?:RAM|GB|$|메모리)', _FLAGS),
+    re.compile(r'(RTX|GTX|Radeon|NVIDIA|AMD)[\s\w\d]+', _FLAGS),
+]
+
+
+# 스펙 문자열 해시 -> 파싱 결과 (프로세스 공유, 카탈로그에 없는 상품도 같은 문자열이면 다시 파싱하지 않음)
+spec_parse_cache = TTLCache(SPEC_PARSE_CACHE_MAX_ENTRIES)
+
+
+def _text_key(kind: str, text: str) -> tuple:
+    """메모이제이션 키 (긴 문자열 대신 고정 길이 해시 보관)"""
+    return (kind, hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest())
+
+
+class SpecRecord(NamedTuple):
+    """스펙 문자열 한 개에서 추출한 정보"""
+    cpu: Optional[Dict]
+    gpu: Optional[Dict]
+    ram_gb: Optional[int]
+    storage_gb: Optional[int]
+    display_inch: Optional[float]
+    weight_kg: Optional[float]
+    keywords: FrozenSet[str]  # 스펙에 들어 있는 SPEC_KEYWORDS
+
+
+def scan_keywords(spec_lower: str) -> FrozenSet[str]:
+    """소문자 스펙 문자열에 들어 있는 키워드 집합 (정규식 스캔보다 부분 문자열 검색이 빠름)"""
+    return frozenset(keyword for keyword in SPEC_KEYWORDS if keyword in spec_lower)
+
+
+def _first_match(patterns: List[Pattern], text: str):
+    """우선순위 순으로 패턴을 적용하여 처음 매칭된 결과 반환"""
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match
+    return None
+
+
+def _parse_cpu(spec_lower: str, keywords: FrozenSet[str]) -> Optional[Dict]:
+    """소문자 스펙 문자열에서 CPU 정보 추출 (관련 키워드가 없으면 패턴을 실행하지 않음)"""
+    cpu_info = {'brand': None, 'model': None, 'generation': None, 'score': 0}
+
+    # 인텔 CPU 추출 ('코어' 또는 'i7-12세대' 형식만 해당)
+    if '코어' in keywords or '세대' in keywords:
+        match = _first_match(_INTEL_CPU_PATTERNS, spec_lower)
+        if match:
+            cpu_info['brand'] = 'intel'
+            if len(match.groups()) >= 2:
+                cpu_info['generation'] = int(match.group(1)) if match.group(1).isdigit() else None
+                cpu_info['model'] = match.group(2)
+
+    # AMD CPU 추출 (인텔보다 우선)
+    if 'amd' in keywords or '라이젠' in keywords or 'ryzen' in keywords:
+        match = _first_match(_AMD_CPU_PATTERNS, spec_lower)
+        if match:
+            cpu_info['brand'] = 'amd'
+            if match.group(1).isdigit():
+                cpu_info['generation'] = int(match.group(1))
+
+    # CPU 성능 점수 계산 (세대와 모델 번호 기반)
+    if cpu_info['generation']:
+        cpu_info['score'] = cpu_info['generation'] * 10
+        if cpu_info['model'] and cpu_info['model'].isdigit():
+            cpu_info['score'] += int(cpu_info['model'])
+
+    return cpu_info if cpu_info['brand'] else None
+
+
+def _parse_gpu(text_lower: str, keywords: FrozenSet[str], patterns, allow_external: bool = True) -> Optional[Dict]:
+    """소문자 문자열에서 GPU 정보 추출 (RTX > GTX > Radeon > 외장그래픽 순)"""
+    for gpu_type, pattern, base_score in patterns:
+        match = pattern.search(text_lower)
+        if match:
+            model = int(match.group(1))
+            return {'type': gpu_type, 'model': model, 'score': base_score + model}
+
+    # 외장 그래픽 여부만 확인
+    if allow_external and '외장그래픽' in keywords:
+        return {'type': 'external', 'model': None, 'score': 100}
+    return None
+
+
+def _spec_gpu_patterns(keywords: FrozenSet[str]):
+    """스펙에 들어 있는 키워드에 해당하는 GPU 패턴만 선택"""
+    return [entry for entry in _SPEC_GPU_PATTERNS if entry[0] in keywords or (entry[0] == 'radeon' and 'rx' in keywords)]
+
+
+def _parse_ram(spec_lower: str, keywords: FrozenSet[str]) -> Optional[int]:
+    """RAM 용량 (GB 값 중 가장 큰 값)"""
+    if 'gb' not in keywords:
+        return None
+    values = [int(value) for value in _GB_RE.findall(spec_lower)]
+    return max(values) if values else None
+
+
+def _parse_storage(spec_lower: str, keywords: FrozenSet[str]) -> Optional[int]:
+    """저장 장치 용량 (GB, 첫 번째 값 - 여러 옵션이 나열된 경우 기본 옵션)"""
+    if 'gb' not in keywords and 'tb' not in keywords:
+        return None
+    match = _STORAGE_RE.search(spec_lower)
+    if not match:
+        return None
+    if match.group(1):
+        size = int(match.group(1))
+        return size * 1024 if match.group(2).lower() == 'tb' else size
+    return int(match.group(3)) * 1024
+
+
+def _parse_weight(spec_lower: str, keywords: FrozenSet[str]) -> Optional[float]:
+    """무게 (kg, 첫 번째 값)"""
+    if 'kg' not in keywords:
+        return None
+    match = _WEIGHT_RE.search(spec_lower)
+    if not match:
+        return None
+    try:
+        return float(match.group(1))
+    except ValueError:
+        return None
+
+
+def _parse_display(spec_lower: str, keywords: FrozenSet[str]) -> Optional[float]:
+    """화면 크기 (인치, 첫 번째 값)"""
+    if '인치' not in keywords:
+        return None
+    match = _DISPLAY_RE.search(spec_lower)
+    return float(match.group(1)) if match else None
+
+
+def _parse_spec_uncached(spec_text: str) -> SpecRecord:
+    """스펙 문자열을 한 번만 소문자로 바꾸고 키워드를 확인한 뒤 필요한 패턴만 적용"""
+    spec_lower = spec_text.lower()
+    keywords = scan_keywords(spec_lower)
+    return SpecRecord(
+        cpu=_parse_cpu(spec_lower, keywords),
+        gpu=_parse_gpu(spec_lower, keywords, _spec_gpu_patterns(keywords)),
+        ram_gb=_parse_ram(spec_lower, keywords),
+        storage_gb=_parse_storage(spec_lower, keywords),
+        display_inch=_parse_display(spec_lower, keywords),
+        weight_kg=_parse_weight(spec_lower, keywords),
+        keywords=keywords,
+    )
+
+
+def parse_spec(spec_text: str) -> SpecRecord:
+    """스펙 문자열 파싱 결과 (같은 문자열은 캐시된 결과 재사용 - cpu/gpu 딕셔너리는 수정하지 말 것)"""
+    text = str(spec_text or '')
+    key = _text_key('spec', text)
+    record = spec_parse_cache.get(key)
+    if record is None:
+        record = _parse_spec_uncached(text)
+        spec_parse_cache.set(key, record)
+    return record
+
+
+def extract_highlight_features(spec_text: str) -> Dict:
+    """제품 카드의 스펙 기반 간단 설명에 쓰는 특징 (원문 표기 그대로 대소문자 구분)"""
+    text = str(spec_text or '')
+    key = _text_key('highlight', text)
+    features = spec_parse_cache.get(key)
+    if features is None:
+        ram_label = None
+        if '16GB' in text or '32GB' in text:
+            ram_match = _CARD_RAM_RE.search(text)
+            if ram_match:
+                ram_label = f"{ram_match.group(1)}GB"
+        features = {
+            'discrete_gpu': '외장그래픽' in text or 'RTX' in text or 'GTX' in text,
+            'ram_label': ram_label,
+            'ssd': 'SSD' in text or 'M.2' in text,
+        }
+        spec_parse_cache.set(key, features)
+    return dict(features)
+
+
+def extract_cpu_from_spec(spec_text: str) -> Optional[Dict]:
+    """스펙 텍스트에서 CPU 정보 추출"""
+    cpu = parse_spec(spec_text).cpu
+    return dict(cpu) if cpu else None
+
+def extract_gpu_from_spec(spec_text: str) -> Optional[Dict]:
+    """스펙 텍스트에서 GPU 정보 추출"""
+    gpu = parse_spec(spec_text).gpu
+    return dict(gpu) if gpu else None
+
+def extract_ram_from_spec(spec_text: str) -> Optional[int]:
+    """스펙 텍스트에서 RAM 정보 추출 (GB)"""
+    return parse_spec(spec_text).ram_gb
+
+def parse_required_cpu(cpu_text: str) -> Optional[Dict]:
+    """요구사항 CPU 텍스트 파싱"""
+    if not cpu_text:
+        return None
+
+    cpu_lower = cpu_text.lower()
+    cpu_info = {'brand': None, 'model': None, 'generation': None, 'score': 0}
+
+    # 인텔 CPU 파싱
+    intel_match = _REQUIRED_INTEL_RE.search(cpu_lower)
+    if intel_match:
+        cpu_info['brand'] = 'intel'
+        if intel_match.group(1).isdigit():
+            cpu_info['generation'] = int(intel_match.group(1))
+        if intel_match.group(2).isdigit():
+            cpu_info['model'] = int(intel_match.group(2))
+        if cpu_info['generation']:
+            cpu_info['score'] = cpu_info['generation'] * 10
+            if cpu_info['model']:
+                cpu_info['score'] += cpu_info['model']
+        return cpu_info
+
+    # AMD CPU 파싱
+    amd_match = _REQUIRED_AMD_RE.search(cpu_lower)
+    if amd_match:
+        cpu_info['brand'] = 'amd'
+        if amd_match.group(1).isdigit():
+            cpu_info['generation'] = int(amd_match.group(1))
+        if cpu_info['generation']:
+            cpu_info['score'] = cpu_info['generation'] * 10
+        return cpu_info
+
+    return None
+
+def parse_required_gpu(gpu_text: str) -> Optional[Dict]:
+    """요구사항 GPU 텍스트 파싱"""
+    if not gpu_text:
+        return None
+    return _parse_gpu(gpu_text.lower(), frozenset(), _REQUIRED_GPU_PATTERNS, allow_external=False)
+
+def extract_weight_from_spec(spec_text: str) -> Optional[float]:
+    """스펙 텍스트에서 무게 정보 추출 (kg, 첫 번째 값)"""
+    return parse_spec(spec_text).weight_kg
+
+def extract_requirements_from_text(content: str) -> Dict:
+    """시스템 요구사항 문서에서 CPU/RAM/GPU 문구 추출 (찾지 못한 항목은 None)"""
+    cpu_match = _first_match(_REQUIREMENT_CPU_PATTERNS, content)
+    ram_match = _first_match(_REQUIREMENT_RAM_PATTERNS, content)
+    gpu_match = _first_match(_REQUIREMENT_GPU_PATTERNS, content)
+    return {
+        'cpu': cpu_match.group(0)[:100] if cpu_match else None,
+        'ram': int(ram_match.group(1)) if ram_match else None,
+        'gpu': gpu_match.group(0)[:100] if gpu_match else None,
+    }
+
+def has_core_specs(spec_text: str) -> bool:
+    """스펙 문자열에서 CPU/RAM/그래픽(외장 GPU 또는 내장그래픽) 정보를 모두 찾을 수 있는지 확인"""
+    record = parse_spec(spec_text)
+    return bool(record.cpu and record.ram_gb and (record.gpu or '내장그래픽' in record.keywords))
+
+def resolve_spec_text(spec_text, product_name, detail_spec=None) -> str:
+    """매칭에 사용할 스펙 텍스트 결정 (스펙이 비어있으면 제품명으로 대체)
+
+    detail_spec(상세 페이지 스펙)이 있으면 목록 스펙에 CPU/RAM/그래픽 정보가 빠진 경우에만 뒤에 덧붙임
+    (앞의 목록 스펙 값이 우선)
+    """
+    spec_text = str(spec_text) if spec_text is not None else ''
+    product_name = str(product_name) if product_name is not None else ''
+    # 스펙이 비어있거나 제품명과 동일한 경우, 제품명에서 스펙 정보 추출 시도
+    if not spec_text or spec_text == product_name or len(spec_text.strip()) < 10:
+        if product_name and len(product_name) > len(spec_text):
+            spec_text = product_name
+    if isinstance(detail_spec, str) and detail_spec.strip() and not has_core_specs(spec_text):
+        return f"{spec_text} / {detail_spec.strip()}" if spec_text else detail_spec.strip()
+    return spec_text
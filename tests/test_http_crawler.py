@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+pytest.importorskip('lxml')
+pytest.importorskip('requests')
+
+from danawa_common import PRODUCT_FIELDNAMES, load_products_csv, product_from_fields, save_products_csv  # noqa: E402
+from http_crawler import extract_page_fields, parse_products  # noqa: E402
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'danawa_search.html')
+
+# 브라우저 모드 일괄 추출 스크립트(BULK_EXTRACT_SCRIPT)가 돌려주는 필드
+BULK_FIELD_KEYS = {'name', 'url', 'price', 'prices', 'ratings', 'reviews', 'specBoxes', 'itemText', 'specItems'}
+
+
+@pytest.fixture(scope='module')
+def page_html():
+    with open(FIXTURE_PATH, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_page_fields_have_browser_schema(page_html):
+    page_fields = extract_page_fields(page_html)
+    assert len(page_fields) == 3
+    assert all(set(fields) == BULK_FIELD_KEYS for fields in page_fields)
+    # innerText처럼 스크립트 내용은 제외하고 블록 요소마다 줄을 나눔
+    assert 'trackingId' not in page_fields[0]['itemText']
+    assert page_fields[0]['name'] == 'LG전자 2026 그램14 14ZD95U-GX56K'
+
+
+def test_parse_products_matches_product_from_fields(page_html):
+    products = parse_products(page_html)
+    expected = [product_from_fields(fields) for fields in extract_page_fields(page_html)]
+
+    assert products == [product for product in expected if product]
+    assert all(list(product) == PRODUCT_FIELDNAMES for product in products)
+    assert products[0] == {
+        '상품명': 'LG전자 2026 그램14 14ZD95U-GX56K',
+        '가격': '1518990',
+        '별점': '4.8',
+        '리뷰 수': '1234',
+        '스펙': '노트북 / 35.5cm(14인치) / 1.12kg / 램 16GB / SSD 512GB',
+        '상품 상세 URL': 'https://prod.danawa.com/info/?pcode=103448942&keyword=%EB%85%B8%ED%8A%B8%EB%B6%81',
+    }
+    # 상대 경로 링크는 검색 페이지 기준 절대 URL로 변환
+    assert products[1]['상품 상세 URL'] == 'https://search.danawa.com/info/?pcode=205551234'
+
+
+def test_parsed_products_round_trip_through_csv(page_html, tmp_path):
+    csv_path = str(tmp_path / 'products.csv')
+    products = parse_products(page_html)
+    save_products_csv(products, csv_path)
+
+    assert load_products_csv(csv_path) == products
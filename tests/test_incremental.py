@@ -0,0 +1,131 @@
+import json
+
+import pytest
+
+from catalog import ProductCatalog, read_products_csv
+
+from danawa_common import PRODUCT_FIELDNAMES, load_products_csv, product_key, save_products_csv
+from incremental import DETAIL_SPEC_FIELD, IncrementalCatalog, refresh_catalog
+
+
+def make_product(code, name, price, spec):
+    return {
+        '상품명': name, '가격': price, '별점': '', '리뷰 수': '', '스펙': spec,
+        '상품 상세 URL': f'https://prod.danawa.com/info/?pcode={code}&keyword=x',
+    }
+
+
+class DetailFetcher:
+    """상세 페이지 방문 기록용 가짜 수집 함수"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, products):
+        self.calls.append([product['상품명'] for product in products])
+        return {product_key(product): f"CPU: {product['상품명']}" for product in products}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / 'catalog.csv'), str(tmp_path / 'state.json')
+
+
+def test_first_run_on_existing_catalog_does_not_fetch_details(paths):
+    csv_path, state_path = paths
+    save_products_csv([make_product(1, 'A', '100', 'a / 1kg'), make_product(2, 'B', '200', 'b / 2kg')], csv_path)
+    fetcher = DetailFetcher()
+
+    stats = refresh_catalog(
+        [make_product(1, 'A', '90', 'a / 1kg'), make_product(2, 'B', '200', 'b / 2kg')], fetcher, csv_path, state_path
+    )
+
+    assert fetcher.calls == []
+    assert stats['unchanged'] == 2
+    assert [row['가격'] for row in load_products_csv(csv_path)] == ['90', '200']
+
+
+def test_price_only_change_reuses_detail_specs(paths):
+    csv_path, state_path = paths
+    fetcher = DetailFetcher()
+    refresh_catalog([make_product(1, 'A', '100', 'a / 1kg')], fetcher, csv_path, state_path)
+    refresh_catalog([make_product(1, 'A', '80', 'a / 1kg')], fetcher, csv_path, state_path)
+
+    assert fetcher.calls == [['A']]
+    row, = load_products_csv(csv_path)
+    assert row['가격'] == '80'
+    assert row['스펙'] == 'a / 1kg'  # 목록 스펙 형식 유지
+    assert row[DETAIL_SPEC_FIELD] == 'CPU: A'
+    assert list(row) == PRODUCT_FIELDNAMES + [DETAIL_SPEC_FIELD]
+
+
+def test_listing_change_refetches_details(paths):
+    csv_path, state_path = paths
+    fetcher = DetailFetcher()
+    refresh_catalog([make_product(1, 'A', '100', 'a / 1kg')], fetcher, csv_path, state_path)
+    stats = refresh_catalog([make_product(1, 'A', '100', 'a / 1kg / 16GB')], fetcher, csv_path, state_path)
+
+    assert fetcher.calls == [['A'], ['A']]
+    assert stats['changed'] == 1
+    row, = load_products_csv(csv_path)
+    assert row['스펙'] == 'a / 1kg / 16GB'
+
+
+def test_failed_detail_fetch_is_retried(paths):
+    csv_path, state_path = paths
+    calls = []
+
+    def failing(products):
+        calls.append(len(products))
+        return {}
+
+    refresh_catalog([make_product(1, 'A', '100', 'a / 1kg')], failing, csv_path, state_path)
+    refresh_catalog([make_product(1, 'A', '100', 'a / 1kg')], failing, csv_path, state_path)
+    assert calls == [1, 1]
+
+
+def test_stale_products_are_removed(paths):
+    csv_path, state_path = paths
+    fetcher = DetailFetcher()
+    refresh_catalog([make_product(1, 'A', '100', 'a / 1kg'), make_product(2, 'B', '200', 'b / 2kg')],
+                    fetcher, csv_path, state_path)
+    with open(state_path, encoding='utf-8') as f:
+        state = json.load(f)
+    state['pcode:2']['last_seen'] = 0
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+
+    catalog = IncrementalCatalog(csv_path, state_path, stale_days=30)
+    stats = catalog.upsert([make_product(1, 'A', '100', 'a / 1kg')])
+    catalog.save()
+
+    assert stats['removed'] == 1
+    assert [row['상품명'] for row in load_products_csv(csv_path)] == ['A']
+
+
+def test_complete_listing_specs_skip_detail_page(paths):
+    csv_path, state_path = paths
+    fetcher = DetailFetcher()
+    complete = make_product(1, 'A', '100', '노트북 / AMD 라이젠7 / RTX 4060 / 16GB / 2.1kg')
+    refresh_catalog([complete, make_product(2, 'B', '200', 'b / 2kg')], fetcher, csv_path, state_path)
+    stats = refresh_catalog([complete], fetcher, csv_path, state_path)
+
+    assert fetcher.calls == [['B']]
+    assert stats['unchanged'] == 1
+
+
+def test_catalog_uses_detail_specs_missing_from_listing(paths):
+    csv_path, state_path = paths
+
+    def fetcher(products):
+        return {product_key(product): 'CPU: AMD 라이젠7 / 그래픽: RTX 4060 / 메모리: 16GB' for product in products}
+
+    refresh_catalog([
+        make_product(1, '게이밍 노트북 A', '1,500,000', '노트북 / 39.6cm(15.6인치) / 2.1kg'),
+        make_product(2, '게이밍 노트북 B', '1,200,000', '노트북 / AMD 라이젠5 / GTX 1650 / 8GB / 2.2kg'),
+    ], fetcher, csv_path, state_path)
+
+    features = ProductCatalog(read_products_csv(csv_path)).df
+    assert features['gpu_type'].tolist() == ['rtx', 'gtx']
+    assert features['ram_gb'].tolist() == [16, 8]
+    assert features['weight_kg'].tolist() == [2.1, 2.2]  # 목록 스펙 값 유지
@@ -0,0 +1,226 @@
+import itertools
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from catalog import ProductCatalog, read_products_csv
+from recommender import MAX_BUDGET_RATIO, prefilter_stages, score_products, select_recommendations
+from spec_parser import (
+    extract_cpu_from_spec,
+    extract_gpu_from_spec,
+    extract_ram_from_spec,
+    parse_required_cpu,
+    parse_required_gpu,
+    resolve_spec_text,
+)
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'electronics_data.csv')
+
+SPEC_INFOS = [
+    {},
+    {'cpu': 'Intel Core i5-9400', 'ram': 8, 'gpu': 'NVIDIA GeForce GTX 1060'},
+    {'cpu': 'AMD Ryzen 5 3600', 'ram': 16, 'gpu': 'RTX 3060'},
+    {'cpu': 'intel core i7-12700k', 'ram': 32, 'gpu': 'Radeon RX 6600'},
+]
+PRODUCT_TYPES = ['노트북', '데스크탑', None]
+USER_USAGES = ['게임용', '작업용', '사무용', None]
+BUDGETS = [None, 500000, 1000000, 1500000, 3000000]
+WEIGHT_PREFERENCES = [None, '가벼운', '보통', '무거워도됨']
+PORTABLE_NEEDS = [None, True, False]
+
+
+def reference_match(df, spec_info, product_type, user_usage, budget, weight_preference, portable_need):
+    """기존 행 단위 매칭 루프 (NaN 가격/빈 스펙 행도 처리하도록 보완) - (행 위치, 점수) 상위 3개"""
+    required_cpu = parse_required_cpu(spec_info.get('cpu', ''))
+    required_ram = spec_info.get('ram')
+    required_gpu = parse_required_gpu(spec_info.get('gpu', ''))
+
+    scored = []
+    for position, row in enumerate(df.to_dict('records')):
+        score = 0
+        raw_spec = row.get('상세스펙')
+        spec_text = resolve_spec_text('' if pd.isna(raw_spec) else raw_spec, row.get('상품명'))
+        spec_lower = spec_text.lower()
+        product_cpu = extract_cpu_from_spec(spec_text)
+        product_ram = extract_ram_from_spec(spec_text)
+        product_gpu = extract_gpu_from_spec(spec_text)
+
+        if required_cpu and product_cpu:
+            if required_cpu['brand'] == product_cpu['brand']:
+                score += 20
+                if product_cpu.get('generation') and required_cpu.get('generation'):
+                    if product_cpu['generation'] >= required_cpu['generation']:
+                        score += 30
+                        if product_cpu.get('model') and required_cpu.get('model'):
+                            score += 20 if int(product_cpu['model']) >= required_cpu['model'] else 10
+                    else:
+                        score += 5
+            elif product_cpu.get('score', 0) >= required_cpu.get('score', 0):
+                score += 15
+        elif required_cpu:
+            if required_cpu['brand'] in spec_lower:
+                score += 5
+
+        if required_ram and product_ram:
+            if product_ram >= required_ram:
+                score += 30
+                if product_ram >= required_ram * 1.5:
+                    score += 10
+            else:
+                score += 5
+
+        if required_gpu and product_gpu:
+            if required_gpu['type'] == product_gpu['type']:
+                score += 40
+                if product_gpu.get('model') and required_gpu.get('model'):
+                    score += 30 if product_gpu['model'] >= required_gpu['model'] else 10
+            elif product_gpu.get('score', 0) >= required_gpu.get('score', 0):
+                score += 20
+        elif required_gpu:
+            if required_gpu['type'] == 'rtx' and 'rtx' in spec_lower:
+                score += 15
+            elif required_gpu['type'] == 'gtx' and 'gtx' in spec_lower:
+                score += 15
+            elif '외장그래픽' in spec_lower:
+                score += 10
+        elif product_gpu and product_gpu['type'] in ['rtx', 'gtx', 'radeon'] and user_usage == '게임용':
+            score += 20
+
+        if user_usage in ['게임용', '작업용']:
+            if product_gpu and product_gpu['type'] in ['rtx', 'gtx', 'radeon', 'external']:
+                score += 15
+            elif '내장그래픽' in spec_lower and '외장그래픽' not in spec_lower:
+                score -= 100
+
+        if budget:
+            try:
+                price = int(float(str(row.get('최저가')).replace(',', '')))
+            except (TypeError, ValueError, OverflowError):
+                price = None
+            if price is not None:
+                if price <= budget:
+                    ratio = price / budget
+                    score += 10 if ratio >= 0.9 else 15 if ratio >= 0.7 else 20 if ratio >= 0.5 else 10
+                else:
+                    over = (price - budget) / budget
+                    score -= 5 if over <= 0.1 else 15 if over <= 0.2 else 30
+
+        weight_matches = re.findall(r'(\d+\.?\d*)\s*kg', spec_text, re.IGNORECASE)
+        weight = float(weight_matches[0]) if weight_matches else None
+        if weight_preference and product_type == '노트북' and weight is not None:
+            if weight_preference == '가벼운':
+                score += 20 if weight <= 1.5 else 10 if weight <= 2.0 else -10
+            elif weight_preference == '보통':
+                score += 10 if 1.5 <= weight <= 2.5 else 0
+            elif weight_preference == '무거워도됨':
+                score += 5
+        if portable_need is not None and product_type == '노트북':
+            if portable_need:
+                if weight is not None:
+                    score += 15 if weight <= 1.5 else 5 if weight <= 2.0 else 0
+            else:
+                score += 5
+
+        scored.append((position, score, spec_lower))
+
+    scored.sort(key=lambda item: item[1], reverse=True)
+    if user_usage in ['게임용', '작업용']:
+        preferred = [
+            item for item in scored
+            if not ('내장그래픽' in item[2] and '외장그래픽' not in item[2])
+            and (any(kw in item[2] for kw in ('외장그래픽', 'rtx', 'gtx', 'radeon', 'rx')) or item[1] > 50)
+        ]
+        if preferred:
+            return [(position, score) for position, score, _ in preferred[:3]]
+        return [(position, score) for position, score, _ in scored if score > 0][:3]
+    positive = [(position, score) for position, score, _ in scored if score > 0]
+    return positive[:3] if positive else [(position, score) for position, score, _ in scored[:3]]
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    df = read_products_csv(CSV_PATH)
+    # 기존 루프가 오류를 내던 행 (가격 없음, 스펙 없음)
+    extra = pd.DataFrame([
+        {'상품명': '가격 없는 게이밍 노트북 RTX 4060 16GB 2.1kg', '최저가': np.nan, '상세스펙': '노트북 / RTX 4060 / 16GB / 2.1kg'},
+        {'상품명': '스펙 없는 사무용 노트북', '최저가': '650,000', '상세스펙': np.nan},
+    ])
+    return ProductCatalog(pd.concat([df, extra], ignore_index=True))
+
+
+def vectorized_match(catalog, spec_info, product_type, user_usage, budget, weight_preference, portable_need):
+    """score_products/select_recommendations 결과 - (후보 내 위치, 점수) 상위 3개"""
+    candidates = catalog.df.iloc[catalog.index.type_positions(product_type)]
+    scores = score_products(
+        candidates, parse_required_cpu(spec_info.get('cpu', '')), spec_info.get('ram'),
+        parse_required_gpu(spec_info.get('gpu', '')), product_type, user_usage, budget, weight_preference, portable_need
+    )
+    positions = select_recommendations(candidates, scores, user_usage, top_k=3)
+    return candidates, [(int(position), int(scores[position])) for position in positions]
+
+
+def test_vectorized_scoring_matches_reference_loop(catalog):
+    mismatches = []
+    for spec_info, product_type, user_usage, budget, weight_preference, portable_need in itertools.product(
+        SPEC_INFOS, PRODUCT_TYPES, USER_USAGES, BUDGETS, WEIGHT_PREFERENCES, PORTABLE_NEEDS
+    ):
+        candidates, actual = vectorized_match(
+            catalog, spec_info, product_type, user_usage, budget, weight_preference, portable_need
+        )
+        expected = reference_match(candidates, spec_info, product_type, user_usage, budget, weight_preference,
+                                   portable_need)
+        if actual != expected:
+            mismatches.append((spec_info, product_type, user_usage, budget, weight_preference, portable_need))
+    assert not mismatches, f"{len(mismatches)}개 조건에서 결과가 다름: {mismatches[:3]}"
+
+
+def test_rows_without_price_or_spec_are_scored(catalog):
+    candidates, actual = vectorized_match(catalog, SPEC_INFOS[2], '노트북', '게임용', 1500000, '가벼운', True)
+    expected = reference_match(candidates, SPEC_INFOS[2], '노트북', '게임용', 1500000, '가벼운', True)
+    assert actual == expected
+    names = candidates['상품명'].tolist()
+    assert '가격 없는 게이밍 노트북 RTX 4060 16GB 2.1kg' in names
+    assert '스펙 없는 사무용 노트북' in names
+
+
+def test_budget_fit_is_scored_not_filtered():
+    # 예산(100만원)의 0.5배보다 싸지만 요구사항에 가장 잘 맞는 상품이 예산 근처 상품보다 먼저 추천되어야 함
+    df = pd.DataFrame([
+        {'상품명': '예산 안 노트북 1', '최저가': '900,000', '상세스펙': '노트북 / 인텔 코어 i5-1235U / 내장그래픽 / 8GB / 1.4kg'},
+        {'상품명': '예산 안 노트북 2', '최저가': '850,000', '상세스펙': '노트북 / 인텔 코어 i5-1135G7 / GTX 1650 / 8GB / 2.3kg'},
+        {'상품명': '예산 안 노트북 3', '최저가': '800,000', '상세스펙': '노트북 / AMD 라이젠5 5600H / GTX 1650 / 8GB / 2.2kg'},
+        {'상품명': '예산 안 노트북 4', '최저가': '1,100,000', '상세스펙': '노트북 / 인텔 코어 i5-11400H / GTX 1660 / 8GB / 2.3kg'},
+        {'상품명': '저렴한 게이밍 노트북', '최저가': '450,000', '상세스펙': '노트북 / 인텔 코어 i7-12700H / RTX 3060 / 16GB / 2.1kg'},
+    ])
+    small_catalog = ProductCatalog(df)
+    candidates = small_catalog.df.iloc[small_catalog.index.type_positions('노트북')]
+    stages = prefilter_stages(candidates, '노트북', '게임용', 1000000)
+    assert '저렴한 게이밍 노트북' in stages[0]['상품명'].tolist()
+
+    scores = score_products(
+        stages[0], parse_required_cpu('Intel Core i7-10750H'), 16, parse_required_gpu('RTX 3060'),
+        '노트북', '게임용', 1000000, None, None
+    )
+    positions = select_recommendations(stages[0], scores, '게임용', top_k=3)
+    assert stages[0].iloc[positions]['상품명'].tolist()[0] == '저렴한 게이밍 노트북'
+    assert scores[positions][0] == scores.max()
+
+
+def test_price_index_budget_cut_matches_column_mask(catalog):
+    # 가격 색인으로 예산 상한을 적용한 후보 단계가 가격 컬럼 마스크로 거른 결과와 같아야 함 (완화 순서 포함)
+    for product_type, user_usage, budget, weight_preference in itertools.product(
+        PRODUCT_TYPES, USER_USAGES, [b for b in BUDGETS if b] + [100000, 300000], WEIGHT_PREFERENCES
+    ):
+        type_positions = catalog.index.type_positions(product_type)
+        candidates = catalog.df.iloc[type_positions]
+        budget_positions = catalog.index.price_range_positions(
+            -np.inf, budget * MAX_BUDGET_RATIO, include_unknown=True, within=type_positions
+        )
+        expected = prefilter_stages(candidates, product_type, user_usage, budget, weight_preference)
+        actual = prefilter_stages(candidates, product_type, user_usage, budget, weight_preference,
+                                  within_budget=catalog.df.iloc[budget_positions])
+        assert [stage.index.tolist() for stage in actual] == [stage.index.tolist() for stage in expected], \
+            (product_type, user_usage, budget, weight_preference)
@@ -0,0 +1,37 @@
+from semantic_cache import SemanticCache, mentioned_products, question_numbers
+
+PRODUCT_NAMES = [
+    'LG전자 2026 그램14 14ZD95U-GX56K 표준노트북',
+    '삼성전자 갤럭시북4 NT750XGR 노트북',
+    'MSI GF시리즈 소드 GF76 노트북',
+]
+
+
+def test_question_numbers_maps_ordinals():
+    assert question_numbers('첫번째 제품') == ('1',)
+    assert question_numbers('두 번째랑 셋째') == ('2', '3')
+    assert question_numbers('2nd one vs the first') == ('2', '1')
+    assert question_numbers('1번이랑 2번') == ('1', '2')
+
+
+def test_mentioned_products_uses_distinctive_name_tokens():
+    assert mentioned_products('갤럭시북4 무게는?', PRODUCT_NAMES) == (2,)
+    assert mentioned_products('소드 게임 잘 돌아가?', PRODUCT_NAMES) == (3,)
+    # 모든 상품에 들어 있는 단어는 지칭으로 보지 않음
+    assert mentioned_products('노트북 배터리 얼마나 가?', PRODUCT_NAMES) == ()
+
+
+def test_lookup_does_not_reuse_answer_for_other_ordinal():
+    cache = SemanticCache(threshold=0.8)
+    cache.store('scope', '첫번째 제품 배터리 얼마나 가?', '첫 번째 제품 답변', PRODUCT_NAMES)
+
+    assert cache.lookup('scope', '두번째 제품 배터리 얼마나 가?', PRODUCT_NAMES) is None
+    assert cache.lookup('scope', '첫번째 제품 배터리 얼마나 가요?', PRODUCT_NAMES) == '첫 번째 제품 답변'
+
+
+def test_lookup_does_not_reuse_answer_for_other_named_product():
+    cache = SemanticCache(threshold=0.8)
+    cache.store('scope', '그램14 배터리 얼마나 가?', '그램 답변', PRODUCT_NAMES)
+
+    assert cache.lookup('scope', '갤럭시북4 배터리 얼마나 가?', PRODUCT_NAMES) is None
+    assert cache.lookup('scope', '그램14 배터리 얼마나 가요?', PRODUCT_NAMES) == '그램 답변'
@@ -0,0 +1,195 @@
+import argparse
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# 단계별 소요 시간 기록 파일 (JSONL, 비어 있으면 기록하지 않음)
+TRACE_LOG_PATH = os.getenv('TRACE_LOG_PATH', '')
+
+# 현재 대화 턴 ID (Streamlit 세션 스레드마다 따로 유지)
+_current_turn: contextvars.ContextVar = contextvars.ContextVar('trace_turn_id', default=None)
+
+_write_lock = threading.Lock()
+
+# 스팬이 끝날 때마다 호출할 함수 목록 (기록 파일 외의 수집기 연결용)
+_span_listeners: List[Callable[[Dict], None]] = []
+
+
+def new_turn() -> str:
+    """새 대화 턴 시작 (이후 스팬은 이 턴 ID로 묶임)"""
+    turn_id = uuid.uuid4().hex[:16]
+    _current_turn.set(turn_id)
+    return turn_id
+
+
+def current_turn() -> Optional[str]:
+    """현재 대화 턴 ID"""
+    return _current_turn.get()
+
+
+def bind_turn(fn: Callable) -> Callable:
+    """현재 대화 턴 ID를 유지한 채 다른 스레드(스레드 풀)에서 실행할 함수로 감싸기"""
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+    return wrapper
+
+
+def add_span_listener(listener: Callable[[Dict], None]) -> None:
+    """스팬 종료 시 기록(dict)을 전달받을 함수 등록"""
+    if listener not in _span_listeners:
+        _span_listeners.append(listener)
+
+
+def _write_record(record: Dict, path: str) -> None:
+    """기록 파일에 한 줄 추가 (여러 세션 스레드가 동시에 써도 줄이 섞이지 않도록 잠금)"""
+    line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+    try:
+        with _write_lock:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line)
+    except OSError:
+        # 기록 실패는 무시하고 요청 처리는 계속
+        pass
+
+
+class Span:
+    """한 단계의 시작/종료 시각과 속성(캐시 적중, 크기 등)을 기록하는 컨텍스트 매니저"""
+
+    def __init__(self, stage: str, **attributes):
+        self.stage = stage
+        self.attributes = attributes
+        self.start = None
+        self.duration_ms = None
+
+    def set(self, **attributes) -> 'Span':
+        """속성 추가 (예: cache_hit=True, bytes=1024)"""
+        self.attributes.update(attributes)
+        return self
+
+    def elapsed_ms(self) -> float:
+        """시작 후 지난 시간 (ms)"""
+        return (time.perf_counter() - self._perf_start) * 1000
+
+    def __enter__(self) -> 'Span':
+        self.start = time.time()
+        self._perf_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration_ms = self.elapsed_ms()
+        record = {
+            'turn_id': current_turn(),
+            'stage': self.stage,
+            'start': self.start,
+            'end': self.start + self.duration_ms / 1000,
+            'duration_ms': round(self.duration_ms, 3),
+            **self.attributes,
+        }
+        # 스트리밍 소비가 중간에 끝난 경우(GeneratorExit)는 오류로 보지 않음
+        if exc_type is not None and issubclass(exc_type, Exception):
+            record['error'] = exc_type.__name__
+        if TRACE_LOG_PATH:
+            _write_record(record, TRACE_LOG_PATH)
+        for listener in _span_listeners:
+            try:
+                listener(record)
+            except Exception:
+                pass
+        return False
+
+
+def span(stage: str, **attributes) -> Span:
+    """단계 스팬 생성 (with span('tavily_search') as s: ... s.set(cache_hit=True))"""
+    return Span(stage, **attributes)
+
+
+def read_records(path: str) -> List[Dict]:
+    """기록 파일의 스팬 목록 읽기 (깨진 줄은 건너뜀)"""
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def summarize(records: List[Dict]) -> Dict:
+    """단계별 호출 수, 지연 시간 분포(ms), 캐시 적중률, 오류 수 집계"""
+    by_stage = defaultdict(list)
+    for record in records:
+        by_stage[record.get('stage')].append(record)
+
+    summary = {}
+    for stage, stage_records in sorted(by_stage.items(), key=lambda item: str(item[0])):
+        durations = np.array([record.get('duration_ms', 0) for record in stage_records], dtype='float64')
+        cache_flags = [record['cache_hit'] for record in stage_records if 'cache_hit' in record]
+        summary[stage] = {
+            'count': len(stage_records),
+            'total_ms': float(durations.sum()),
+            'mean_ms': float(durations.mean()),
+            'p50_ms': float(np.percentile(durations, 50)),
+            'p90_ms': float(np.percentile(durations, 90)),
+            'p99_ms': float(np.percentile(durations, 99)),
+            'max_ms': float(durations.max()),
+            'cache_hit_rate': sum(cache_flags) / len(cache_flags) if cache_flags else None,
+            'errors': sum(1 for record in stage_records if 'error' in record),
+        }
+    return summary
+
+
+def print_summary(summary: Dict, turn_count: int) -> None:
+    """집계 결과 표 출력 (전체 시간 비중이 큰 단계부터)"""
+    grand_total = sum(stats['total_ms'] for stats in summary.values()) or 1
+    print("=" * 104)
+    print(f"대화 턴 {turn_count}개, 단계 {len(summary)}개")
+    print("=" * 104)
+    print(f"{'단계':<28}{'호출':>7}{'비중':>8}{'평균ms':>10}{'p50ms':>10}{'p90ms':>10}{'p99ms':>10}{'최대ms':>10}{'캐시적중':>8}{'오류':>6}")
+    for stage, stats in sorted(summary.items(), key=lambda item: -item[1]['total_ms']):
+        hit_rate = f"{stats['cache_hit_rate']:.0%}" if stats['cache_hit_rate'] is not None else '-'
+        print(f"{str(stage):<28}{stats['count']:>7}{stats['total_ms'] / grand_total:>8.0%}{stats['mean_ms']:>10.1f}"
+              f"{stats['p50_ms']:>10.1f}{stats['p90_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}"
+              f"{hit_rate:>8}{stats['errors']:>6}")
+
+
+def main():
+    """기록 파일 집계 (python tracing.py summarize [파일])"""
+    parser = argparse.ArgumentParser(description='단계별 소요 시간 기록 집계')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    summarize_parser = subparsers.add_parser('summarize', help='단계별 지연 시간 분포 출력')
+    summarize_parser.add_argument('path', nargs='?', default=TRACE_LOG_PATH or 'trace.jsonl', help='JSONL 기록 파일')
+    summarize_parser.add_argument('--stage', help='이 단계만 집계')
+    summarize_parser.add_argument('--json', action='store_true', help='표 대신 JSON으로 출력')
+    args = parser.parse_args()
+
+    records = read_records(args.path)
+    if args.stage:
+        records = [record for record in records if record.get('stage') == args.stage]
+    if not records:
+        print(f"기록이 없습니다: {args.path}")
+        return
+
+    summary = summarize(records)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print_summary(summary, len({record.get('turn_id') for record in records}))
+
+
+if __name__ == "__main__":
+    main()